@@ -0,0 +1,136 @@
+"""
+Benchmark for the per-key/per-bigram analytics over many sessions.
+
+Builds synthetic keystroke logs for the lessons in data/levels (random
+typos and inter-key latencies), then times:
+
+    analyze   reducing each session's log to key/bigram aggregates
+    merge     folding each session into the lifetime totals
+    save/load writing and reading the totals file
+    query     heatmap scores plus the slowest bigrams from the totals
+
+The totals are kept incrementally, so opening the heatmap after thousands of
+sessions costs one load and one query, not a rescan of every session.
+
+Usage:
+    python benchmarks/bench_analytics.py
+    python benchmarks/bench_analytics.py --sessions 5000 --max-ms 100
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+from key_analytics import KeyAnalytics, analyze_session, merge_into, METRIC_LATENCY  # noqa: E402
+from keyboard_layout import load_layout  # noqa: E402
+from keystroke_log import KeystrokeLog  # noqa: E402
+from bench_engine import load_lessons, LEVELS_DIR, TYPO_CHARS  # noqa: E402
+
+
+def synthetic_log(text, error_rate, rng):
+    """
+    Build a keystroke log that types the text with typos and jittered timing.
+
+    Returns:
+        KeystrokeLog: The session's keystrokes
+    """
+    log = KeystrokeLog()
+    now = 0
+    for position, char in enumerate(text):
+        if rng.random() < error_rate:
+            now += int(rng.uniform(80, 400) * 1e6)
+            log.append(now, position, ord(rng.choice(TYPO_CHARS)), False)
+        now += int(rng.uniform(80, 400) * 1e6)
+        log.append(now, position, ord(char), True)
+    return log
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--sessions', type=int, default=2000, help='sessions to aggregate')
+    parser.add_argument('--distinct', type=int, default=50,
+                        help='distinct synthetic logs to cycle through')
+    parser.add_argument('--error-rate', type=float, default=0.03)
+    parser.add_argument('--seed', type=int, default=1234)
+    parser.add_argument('--levels-dir', default=LEVELS_DIR)
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    parser.add_argument('--max-ms', type=float,
+                        help='exit non-zero if load + query exceeds this')
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    lessons = [text for _, text in load_lessons(args.levels_dir) if text]
+    sessions = []
+    for i in range(args.distinct):
+        text = lessons[i % len(lessons)]
+        sessions.append((text, synthetic_log(text, args.error_rate, rng)))
+    keyboard_layout = load_layout(os.path.join(ROOT, 'data', 'keyboard_layout.json'))
+
+    with tempfile.TemporaryDirectory() as directory:
+        analytics = KeyAnalytics(directory)
+        analyze_ns = 0
+        merge_ns = 0
+        keystrokes = 0
+        for i in range(args.sessions):
+            text, log = sessions[i % len(sessions)]
+            t0 = time.perf_counter_ns()
+            keys, bigrams = analyze_session(text, log)
+            t1 = time.perf_counter_ns()
+            merge_into(analytics.keys, keys)
+            merge_into(analytics.bigrams, bigrams)
+            analytics.sessions += 1
+            t2 = time.perf_counter_ns()
+            analyze_ns += t1 - t0
+            merge_ns += t2 - t1
+            keystrokes += len(log)
+
+        t0 = time.perf_counter_ns()
+        analytics.save()
+        t1 = time.perf_counter_ns()
+        reloaded = KeyAnalytics(directory)
+        reloaded.load()
+        t2 = time.perf_counter_ns()
+        reloaded.key_heat(keyboard_layout, METRIC_LATENCY)
+        reloaded.slowest_bigrams()
+        t3 = time.perf_counter_ns()
+        file_bytes = os.path.getsize(reloaded.path)
+
+    results = {
+        'sessions': args.sessions,
+        'keystrokes': keystrokes,
+        'keys': len(analytics.keys),
+        'bigrams': len(analytics.bigrams),
+        'analyze_us_per_session': analyze_ns / args.sessions / 1000.0,
+        'merge_us_per_session': merge_ns / args.sessions / 1000.0,
+        'save_ms': (t1 - t0) / 1e6,
+        'load_ms': (t2 - t1) / 1e6,
+        'query_ms': (t3 - t2) / 1e6,
+        'file_bytes': file_bytes,
+    }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{results['sessions']} sessions, {results['keystrokes']} keystrokes, "
+              f"{results['keys']} keys, {results['bigrams']} bigrams")
+        print(f"analyze   {results['analyze_us_per_session']:10.1f} us/session")
+        print(f"merge     {results['merge_us_per_session']:10.1f} us/session")
+        print(f"save      {results['save_ms']:10.2f} ms ({file_bytes} bytes)")
+        print(f"load      {results['load_ms']:10.2f} ms")
+        print(f"query     {results['query_ms']:10.2f} ms")
+
+    interactive_ms = results['load_ms'] + results['query_ms']
+    if args.max_ms is not None and interactive_ms > args.max_ms:
+        print(f"FAIL: load + query {interactive_ms:.2f} ms exceeds {args.max_ms:.2f} ms",
+              file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
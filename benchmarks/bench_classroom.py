@@ -0,0 +1,185 @@
+"""
+Loopback load test for the classroom server.
+
+Starts a ClassroomServer on 127.0.0.1 and connects simulated seats (real
+ClassroomClient instances, all on one event loop) that type at a steady rate
+and finish a session every few seconds. It also connects viewers that read
+the leaderboard and "stalled" viewers that never read, which exercises
+backpressure. Some seats are disconnected server-side along the way to
+exercise reconnect.
+
+Checks that every completed session reached the results database and reports
+event throughput, batching, reconnects, leaderboard latency and how many
+snapshots were skipped for stalled viewers.
+
+Usage:
+    python benchmarks/bench_classroom.py
+    python benchmarks/bench_classroom.py --seats 60 --seconds 20 --keys-per-sec 8
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+from classroom_server import ClassroomServer  # noqa: E402
+from classroom_client import ClassroomClient  # noqa: E402
+from bench_engine import percentile  # noqa: E402
+
+
+async def type_seat(client, args, rng, deadline):
+    """
+    Post stats at the typing rate and a completion every session_chars keys.
+
+    Returns:
+        tuple: (sessions completed, keystrokes posted)
+    """
+    chars = 0
+    keys = 0
+    sessions = 0
+    interval = 1.0 / args.keys_per_sec
+    while time.monotonic() < deadline:
+        await asyncio.sleep(interval * rng.uniform(0.5, 1.5))
+        chars += 1
+        keys += 1
+        wpm = rng.gauss(45, 10)
+        client.post_stats(1, wpm, 97.0, chars, args.session_chars)
+        if chars >= args.session_chars:
+            client.post_complete(1, wpm, 97.0, True)
+            sessions += 1
+            chars = 0
+    return sessions, keys
+
+
+async def watch(client, latencies, deadline):
+    """Sample how old each newly received leaderboard is."""
+    seen = None
+    while time.monotonic() < deadline:
+        await asyncio.sleep(0.01)
+        if client.leaderboard_time is not None and client.leaderboard_time != seen:
+            seen = client.leaderboard_time
+            latencies.append((time.time() - seen) * 1000.0)
+
+
+async def stalled_viewer(port):
+    """Connect as a viewer that never reads its socket."""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write((json.dumps({'type': 'hello', 'role': 'viewer', 'name': 'stalled'}) + '\n').encode())
+    await writer.drain()
+    return writer
+
+
+async def kick_seats(server, args, rng, deadline):
+    """Drop random seat connections server-side to force reconnects."""
+    kicked = 0
+    while time.monotonic() < deadline:
+        await asyncio.sleep(args.kick_interval)
+        seats = [c for c in server.connections if c.role == 'seat']
+        for connection in rng.sample(seats, min(args.kick_count, len(seats))):
+            connection.writer.close()
+            kicked += 1
+    return kicked
+
+
+async def run(args):
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = os.path.join(directory, 'classroom.sqlite3')
+        server = ClassroomServer(db_path, broadcast_interval=args.broadcast_interval)
+        port = await server.start('127.0.0.1', 0)
+
+        seats = [ClassroomClient('127.0.0.1', port, f"seat{i:03d}") for i in range(args.seats)]
+        viewers = [ClassroomClient('127.0.0.1', port, 'viewer', role='viewer')
+                   for _ in range(args.viewers)]
+        runners = [asyncio.create_task(client.run()) for client in seats + viewers]
+        stalled = [await stalled_viewer(port) for _ in range(args.stalled_viewers)]
+
+        start = time.monotonic()
+        deadline = start + args.seconds
+        latencies = []
+        typing = [asyncio.create_task(type_seat(client, args, random.Random(rng.random()), deadline))
+                  for client in seats]
+        watchers = [asyncio.create_task(watch(client, latencies, deadline)) for client in viewers]
+        kicker = asyncio.create_task(kick_seats(server, args, rng, deadline))
+
+        typed = await asyncio.gather(*typing)
+        completed = sum(sessions for sessions, _ in typed)
+        await asyncio.gather(*watchers)
+        kicked = await kicker
+        elapsed = time.monotonic() - start
+
+        # Let the final batches arrive, then shut everything down
+        for client in seats + viewers:
+            client._stopping.set()
+        await asyncio.gather(*runners)
+        await asyncio.sleep(args.broadcast_interval)
+        stalled_connections = [c for c in server.connections if c.name == 'stalled']
+        stalled_sent = sum(c.sent for c in stalled_connections)
+        stalled_skipped = sum(c.skipped for c in stalled_connections)
+        for writer in stalled:
+            writer.close()
+        await server.stop()
+
+        with sqlite3.connect(db_path) as connection:
+            persisted = connection.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+
+    ordered = sorted(latencies)
+    return {
+        'seats': args.seats,
+        'seconds': elapsed,
+        'events_received': server.events_received,
+        'events_per_sec': server.events_received / elapsed,
+        'batches_received': server.batches_received,
+        'events_per_batch': server.events_received / max(1, server.batches_received),
+        'keystrokes_posted': sum(keys for _, keys in typed),
+        'sessions_completed': completed,
+        'sessions_persisted': persisted,
+        'completions_dropped': sum(client.dropped for client in seats),
+        'duplicates_discarded': server.duplicates,
+        'kicked': kicked,
+        'reconnects': sum(client.connections - 1 for client in seats),
+        'leaderboard_p50_ms': percentile(ordered, 50),
+        'leaderboard_p99_ms': percentile(ordered, 99),
+        'stalled_viewer_snapshots_sent': stalled_sent,
+        'stalled_viewer_snapshots_skipped': stalled_skipped,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--seats', type=int, default=40)
+    parser.add_argument('--viewers', type=int, default=2)
+    parser.add_argument('--stalled-viewers', type=int, default=2)
+    parser.add_argument('--seconds', type=float, default=10.0)
+    parser.add_argument('--keys-per-sec', type=float, default=6.0)
+    parser.add_argument('--session-chars', type=int, default=20,
+                        help='keys per simulated session (small, to exercise completions)')
+    parser.add_argument('--broadcast-interval', type=float, default=0.5)
+    parser.add_argument('--kick-interval', type=float, default=2.0)
+    parser.add_argument('--kick-count', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=1234)
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for name, value in results.items():
+            print(f"{name:<36}{value:>12.1f}" if isinstance(value, float) else f"{name:<36}{value:>12}")
+
+    if results['sessions_persisted'] != results['sessions_completed'] - results['completions_dropped']:
+        print("FAIL: completed sessions were lost", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
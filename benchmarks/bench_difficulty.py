@@ -0,0 +1,92 @@
+"""
+Lesson difficulty scoring throughput.
+
+Scores every bundled lesson, then a synthetic corpus built by reshuffling
+their lines, against the bundled keyboard layout. Reports the cost per
+lesson and per character of a cold score, and of filtering and sorting the
+whole corpus from cached metadata (what the lesson selector does).
+
+Usage:
+    python benchmarks/bench_difficulty.py
+    python benchmarks/bench_difficulty.py --lessons 5000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+from keyboard_layout import load_layout  # noqa: E402
+from lesson_difficulty import DifficultyScorer  # noqa: E402
+from level_catalog import lesson_metadata  # noqa: E402
+
+
+def build_corpus(count, rng):
+    """Bundled lessons plus shuffled variations of them, count texts in all."""
+    levels_dir = os.path.join(ROOT, 'data', 'levels')
+    texts = []
+    for name in sorted(os.listdir(levels_dir)):
+        with open(os.path.join(levels_dir, name), 'r', encoding='utf-8') as f:
+            texts.append(f.read())
+    lines = [line for text in texts for line in text.split('\n')]
+    while len(texts) < count:
+        texts.append('\n'.join(rng.sample(lines, rng.randint(10, 60))))
+    return texts[:count]
+
+
+def run(args):
+    rng = random.Random(args.seed)
+    texts = build_corpus(args.lessons, rng)
+    scorer = DifficultyScorer(load_layout(os.path.join(ROOT, 'data', 'keyboard_layout.json')))
+    chars = sum(len(text) for text in texts)
+
+    t0 = time.perf_counter()
+    for text in texts:
+        scorer.score(text)
+    score_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    metadata = [lesson_metadata(text, scorer) for text in texts]
+    metadata_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for _ in range(args.repeat):
+        chosen = [m for m in metadata if m['difficulty'] <= 60]
+        chosen.sort(key=lambda m: m['finger_travel'], reverse=True)
+    select_s = (time.perf_counter() - t0) / args.repeat
+
+    return {
+        'lessons': len(texts),
+        'chars': chars,
+        'score_us_per_lesson': score_s / len(texts) * 1e6,
+        'score_ns_per_char': score_s / chars * 1e9,
+        'metadata_us_per_lesson': metadata_s / len(texts) * 1e6,
+        'select_ms': select_s * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--lessons', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=20, help='filter/sort repetitions')
+    parser.add_argument('--seed', type=int, default=1234)
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    args = parser.parse_args()
+
+    results = run(args)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{results['lessons']} lessons, {results['chars']} characters")
+    print(f"score:            {results['score_us_per_lesson']:8.1f} us/lesson "
+          f"({results['score_ns_per_char']:.0f} ns/char)")
+    print(f"full metadata:    {results['metadata_us_per_lesson']:8.1f} us/lesson")
+    print(f"filter + sort:    {results['select_ms']:8.2f} ms for the whole corpus (cached)")
+
+
+if __name__ == '__main__':
+    main()
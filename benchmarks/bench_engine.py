@@ -0,0 +1,223 @@
+"""
+Keystroke-replay benchmark for the Qt-free typing engine.
+
+Replays a keystroke stream through TypingEngine.process_keystroke for every
+lesson in data/levels and reports throughput and per-keystroke latency
+percentiles. Streams are synthetic (the lesson text with injected typos) or
+recorded (a JSON file mapping lesson file names to the typed string).
+With --batch the stream is fed in runs through process_keystrokes instead,
+and each key's sample is its share of the run's time.
+
+Usage:
+    python benchmarks/bench_engine.py
+    python benchmarks/bench_engine.py --error-rate 0.05 --iterations 20
+    python benchmarks/bench_engine.py --batch 32
+    python benchmarks/bench_engine.py --replay recorded.json --max-p99-us 50
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+from typing_engine import TypingEngine, KEY_COMPLETE  # noqa: E402
+
+LEVELS_DIR = os.path.join(ROOT, 'data', 'levels')
+TYPO_CHARS = 'abcdefghijklmnopqrstuvwxyz;,.'
+
+
+def load_lessons(levels_dir=LEVELS_DIR):
+    """
+    Load every lesson file in the levels directory.
+
+    Returns:
+        list: (file_name, text) tuples sorted by file name
+    """
+    lessons = []
+    for name in sorted(os.listdir(levels_dir)):
+        path = os.path.join(levels_dir, name)
+        if os.path.isfile(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                lessons.append((name, f.read()))
+    return lessons
+
+
+def synthetic_stream(text, error_rate, rng):
+    """
+    Build a keystroke stream that types the text with random typos.
+
+    Args:
+        text: Lesson text
+        error_rate: Probability of a wrong key before each correct one
+        rng: random.Random instance
+
+    Returns:
+        list: Typed characters
+    """
+    keys = []
+    for char in text:
+        if error_rate and rng.random() < error_rate:
+            typo = rng.choice(TYPO_CHARS)
+            if typo != char:
+                keys.append(typo)
+        keys.append(char)
+    return keys
+
+
+def replay(text, keys, target_wpm=40):
+    """
+    Feed a keystroke stream through a fresh engine, timing every keystroke.
+
+    Each sample covers the same per-key work TypingSession performs:
+    process_keystroke followed by the WPM/rolling WPM/accuracy recalculation.
+
+    Returns:
+        list: Per-keystroke latencies in nanoseconds
+    """
+    engine = TypingEngine(text, target_wpm)
+    engine.start()
+    samples = []
+    clock = time.perf_counter_ns
+    for char in keys:
+        t0 = clock()
+        result = engine.process_keystroke(char)
+        engine.calculate_wpm()
+        engine.calculate_rolling_wpm()
+        engine.calculate_accuracy()
+        samples.append(clock() - t0)
+        if result == KEY_COMPLETE:
+            break
+    return samples
+
+
+def replay_batched(text, keys, batch, target_wpm=40):
+    """
+    Feed a keystroke stream through process_keystrokes in runs of batch keys.
+
+    Each run is followed by one stats recalculation, as TypingSession does.
+
+    Returns:
+        list: Per-keystroke latencies in nanoseconds (run time / run length)
+    """
+    engine = TypingEngine(text, target_wpm)
+    engine.start()
+    stream = ''.join(keys)
+    samples = []
+    clock = time.perf_counter_ns
+    position = 0
+    while position < len(stream):
+        t0 = clock()
+        result, count = engine.process_keystrokes(stream[position:position + batch])
+        engine.calculate_wpm()
+        engine.calculate_rolling_wpm()
+        engine.calculate_accuracy()
+        elapsed = clock() - t0
+        samples.extend([elapsed // count] * count)
+        position += count
+        if result == KEY_COMPLETE:
+            break
+    return samples
+
+
+def percentile(sorted_samples, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_samples:
+        return 0
+    rank = int(round(pct / 100.0 * (len(sorted_samples) - 1)))
+    return sorted_samples[rank]
+
+
+def summarize(samples):
+    """
+    Reduce raw latencies to throughput and percentile figures.
+
+    Returns:
+        dict: keys, keys_per_sec and p50/p90/p99/max latency in microseconds
+    """
+    ordered = sorted(samples)
+    total_ns = sum(ordered)
+    return {
+        'keys': len(ordered),
+        'keys_per_sec': len(ordered) / (total_ns / 1e9) if total_ns else 0.0,
+        'p50_us': percentile(ordered, 50) / 1000.0,
+        'p90_us': percentile(ordered, 90) / 1000.0,
+        'p99_us': percentile(ordered, 99) / 1000.0,
+        'max_us': (ordered[-1] / 1000.0) if ordered else 0.0,
+    }
+
+
+def run(args):
+    """Run the benchmark and return (per-lesson results, overall summary)."""
+    rng = random.Random(args.seed)
+    recorded = {}
+    if args.replay:
+        with open(args.replay, 'r', encoding='utf-8') as f:
+            recorded = json.load(f)
+
+    results = []
+    all_samples = []
+    for name, text in load_lessons(args.levels_dir):
+        if not text:
+            continue
+        if recorded:
+            if name not in recorded:
+                continue
+            keys = list(recorded[name])
+        else:
+            keys = synthetic_stream(text, args.error_rate, rng)
+
+        samples = []
+        for _ in range(args.iterations):
+            if args.batch > 1:
+                samples.extend(replay_batched(text, keys, args.batch))
+            else:
+                samples.extend(replay(text, keys))
+        all_samples.extend(samples)
+        results.append((name, summarize(samples)))
+
+    return results, summarize(all_samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--levels-dir', default=LEVELS_DIR,
+                        help='directory of lesson files (default: data/levels)')
+    parser.add_argument('--replay', metavar='JSON',
+                        help='recorded streams: {"lesson file": "typed keys"}')
+    parser.add_argument('--error-rate', type=float, default=0.03,
+                        help='typo probability for synthetic streams')
+    parser.add_argument('--iterations', type=int, default=10,
+                        help='replays per lesson')
+    parser.add_argument('--batch', type=int, default=1,
+                        help='keys per process_keystrokes run (1: one process_keystroke per key)')
+    parser.add_argument('--seed', type=int, default=1234)
+    parser.add_argument('--json', action='store_true',
+                        help='print results as JSON')
+    parser.add_argument('--max-p99-us', type=float,
+                        help='exit non-zero if overall p99 latency exceeds this')
+    args = parser.parse_args()
+
+    results, overall = run(args)
+
+    if args.json:
+        print(json.dumps({'lessons': dict(results), 'overall': overall}, indent=2))
+    else:
+        header = f"{'lesson':<24}{'keys':>9}{'keys/s':>12}{'p50 us':>9}{'p90 us':>9}{'p99 us':>9}{'max us':>10}"
+        print(header)
+        print('-' * len(header))
+        for name, r in results + [('OVERALL', overall)]:
+            print(f"{name:<24}{r['keys']:>9}{r['keys_per_sec']:>12.0f}"
+                  f"{r['p50_us']:>9.2f}{r['p90_us']:>9.2f}{r['p99_us']:>9.2f}{r['max_us']:>10.2f}")
+
+    if args.max_p99_us is not None and overall['p99_us'] > args.max_p99_us:
+        print(f"FAIL: p99 {overall['p99_us']:.2f} us exceeds {args.max_p99_us:.2f} us",
+              file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Per-frame cost of ghost races.
+
+Builds synthetic runs over a long lesson and steps a GhostRace through the
+whole race at the display frame rate, timing every update. Compare the
+per-frame figures for one ghost and for several to see what each extra ghost
+adds; the index costs 4 bytes per character per run.
+
+Usage:
+    python benchmarks/bench_ghost.py
+    python benchmarks/bench_ghost.py --chars 20000 --ghosts 1 5 20
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from array import array
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+from ghost_race import GhostRace, GhostRun  # noqa: E402
+from bench_engine import percentile  # noqa: E402
+
+
+def synthetic_run(chars, wpm, rng):
+    """A run typing chars characters at about wpm, with jittery gaps."""
+    mean_gap_ms = 60000.0 / (wpm * 5)
+    times = array('I')
+    elapsed = 0.0
+    for _ in range(chars):
+        elapsed += rng.expovariate(1.0 / mean_gap_ms)
+        times.append(int(elapsed))
+    return GhostRun(times, wpm, 98.0)
+
+
+def race(runs, frame_ms):
+    """
+    Step a race to its end one frame at a time.
+
+    Returns:
+        list: Per-frame update times in nanoseconds
+    """
+    ghost_race = GhostRace(runs)
+    end_ms = max(run.duration_ms() for run in runs) + frame_ms
+    clock = time.perf_counter_ns
+    samples = []
+    elapsed = 0.0
+    while elapsed <= end_ms:
+        t0 = clock()
+        ghost_race.update(int(elapsed))
+        samples.append(clock() - t0)
+        elapsed += frame_ms
+    return samples
+
+
+def run(args):
+    rng = random.Random(args.seed)
+    runs = [synthetic_run(args.chars, rng.uniform(40, 90), rng) for _ in range(max(args.ghosts))]
+    results = {}
+    for count in args.ghosts:
+        ordered = sorted(race(runs[:count], args.frame_ms))
+        results[count] = {
+            'frames': len(ordered),
+            'p50_us': percentile(ordered, 50) / 1000.0,
+            'p99_us': percentile(ordered, 99) / 1000.0,
+            'max_us': ordered[-1] / 1000.0,
+            'index_bytes': sum(len(run.times_ms) * run.times_ms.itemsize for run in runs[:count]),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--chars', type=int, default=10000, help='lesson length')
+    parser.add_argument('--ghosts', type=int, nargs='+', default=[1, 5, 20])
+    parser.add_argument('--frame-ms', type=float, default=1000 / 60)
+    parser.add_argument('--seed', type=int, default=1234)
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    args = parser.parse_args()
+
+    results = run(args)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'ghosts':>7}{'frames':>9}{'p50 us':>9}{'p99 us':>9}{'max us':>9}{'index KB':>10}")
+    for count, r in results.items():
+        print(f"{count:>7}{r['frames']:>9}{r['p50_us']:>9.2f}{r['p99_us']:>9.2f}"
+              f"{r['max_us']:>9.1f}{r['index_bytes'] / 1024:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
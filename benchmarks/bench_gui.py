@@ -0,0 +1,329 @@
+"""
+Rendering-path benchmark with regression thresholds.
+
+Runs the main window (and its KeyboardWidget) under the offscreen Qt
+platform against a temporary home folder and types every bundled lesson in
+data/levels with synthetic key events, a few of them wrong. Each keystroke's
+frame is applied and painted before the next key, so every key costs a full
+repaint. Measured, in ms:
+
+    keyboard_paint   KeyboardWidget.paintEvent
+    frame            repaint of the whole window
+    highlight        MainWindow._highlight_text
+    chunk_switch     MainWindow._update_text_chunk while typing
+    input_to_paint   key event to the end of the repaint showing it
+
+plus the growth of the Python heap (tracemalloc) over a second pass through
+all lessons, after the first lesson has warmed everything up.
+
+The results are compared with a stored baseline. A figure regresses when it
+exceeds baseline * (1 + tolerance) plus a small absolute slack (timings
+this short jitter by tens of microseconds); the benchmark then exits with
+status 1. Timings depend on the machine, so record a baseline on the
+machine that checks it.
+
+Usage:
+    python benchmarks/bench_gui.py
+    python benchmarks/bench_gui.py --tolerance 0.5 --max-keys 200
+    python benchmarks/bench_gui.py --update-baseline
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PySide6 import __version__ as PYSIDE_VERSION  # noqa: E402
+from PySide6.QtCore import Qt, QEvent  # noqa: E402
+from PySide6.QtGui import QKeyEvent  # noqa: E402
+from PySide6.QtWidgets import QApplication  # noqa: E402
+from latency_trace import LatencyHistogram, KEYBOARD_PAINT, FRAME, HIGHLIGHT, INPUT_TO_PAINT  # noqa: E402
+from line_index import LineIndex  # noqa: E402
+
+BASELINE_PATH = os.path.join(ROOT, 'benchmarks', 'baselines', 'gui.json')
+BASELINE_VERSION = 1
+
+CHUNK_SWITCH = 'chunk_switch'
+STAGES = (KEYBOARD_PAINT, FRAME, HIGHLIGHT, CHUNK_SWITCH, INPUT_TO_PAINT)
+PERCENTILES = (50, 99)
+MEMORY_GROWTH = 'memory_growth_kb'
+
+# Absolute slack added to every limit, by unit
+SLACK_MS = 0.05
+SLACK_KB = 256
+
+WINDOW_SIZE = (1024, 768)
+FRAME_WAIT_S = 1.0
+WRONG_KEY = '\x7f'
+
+
+class GuiDriver:
+    """A main window typed into with synthetic key events."""
+
+    def __init__(self, app):
+        from level_manager import LevelManager
+        from ui.main_window import MainWindow
+
+        self.app = app
+        self.level_manager = LevelManager()
+        self.window = MainWindow(self.level_manager)
+        self.window.resize(*WINDOW_SIZE)
+        self.window.enable_latency_tracing()
+        self.tracer = self.window.latency_tracer
+        self.chunk_switches = LatencyHistogram()
+        self._typing = False
+
+        # Time chunk switches while typing (not the first chunk of a lesson)
+        update_text_chunk = self.window._update_text_chunk
+
+        def timed_update_text_chunk():
+            start = time.perf_counter_ns()
+            update_text_chunk()
+            if self._typing:
+                self.chunk_switches.record(time.perf_counter_ns() - start)
+
+        self.window._update_text_chunk = timed_update_text_chunk
+
+        self.window.show()
+        self._spin(lambda: self.window.current_session is not None and not self.window._between_lessons)
+
+    def _spin(self, done, limit_s=10.0):
+        deadline = time.perf_counter() + limit_s
+        while not done() and time.perf_counter() < deadline:
+            self.app.processEvents()
+
+    def lessons(self):
+        """
+        Every bundled lesson with its level.
+
+        Returns:
+            list: (level number, file name) in file name order
+        """
+        owner = {}
+        for level_num, level_info in self.level_manager.levels.items():
+            for file_name in level_info['files']:
+                owner[file_name] = level_num
+        return sorted(((level_num, file_name) for file_name, level_num in owner.items()),
+                      key=lambda lesson: lesson[1])
+
+    def type_lesson(self, level_num, file_name, error_rate, rng, max_keys=None):
+        """
+        Type a lesson up to (not including) its last character.
+
+        Returns:
+            int: Keystrokes typed
+        """
+        text = self.level_manager.lesson_reader(level_num, file_name)()
+        self.window._start_lesson(level_num, text, LineIndex(text))
+        session = self.window.current_session
+        frames = self.tracer.histograms[FRAME]
+        limit = len(text) - 1 if max_keys is None else min(len(text) - 1, max_keys)
+        keys = 0
+        self._typing = True
+        try:
+            while session.current_index < limit:
+                char = session.engine.get_current_char()
+                if rng.random() < error_rate:
+                    char = WRONG_KEY
+                key = Qt.Key_Return if char == '\n' else Qt.Key_Tab if char == '\t' else 0
+                self.window.keyPressEvent(QKeyEvent(QEvent.KeyPress, key, Qt.NoModifier, char))
+                keys += 1
+                # One frame per keystroke: apply its updates and wait for the repaint
+                painted = frames.count
+                self.window.update_scheduler.flush()
+                self._spin(lambda: frames.count != painted, FRAME_WAIT_S)
+        finally:
+            self._typing = False
+        return keys
+
+    def close(self):
+        self.window.close()
+
+
+def measure(args):
+    """
+    Type every lesson once for timings, then again for memory growth.
+
+    Returns:
+        dict: 'metrics' (name -> value), and the 'lessons', 'keys' and
+        'chunk_switches' of the timed pass
+    """
+    os.environ['HOME'] = tempfile.mkdtemp(prefix='typetutor-bench-')
+    app = QApplication.instance() or QApplication([])
+    driver = GuiDriver(app)
+    lessons = driver.lessons()
+    if not lessons:
+        raise RuntimeError("no lessons found in data/levels")
+
+    rng = random.Random(args.seed)
+    # Warm up (first paints, pixmap caches, imports) before anything is measured
+    driver.type_lesson(*lessons[0], args.error_rate, rng, args.max_keys)
+    driver.tracer.clear()
+    driver.chunk_switches.clear()
+
+    keys = 0
+    for level_num, file_name in lessons:
+        keys += driver.type_lesson(level_num, file_name, args.error_rate, rng, args.max_keys)
+
+    histograms = dict(driver.tracer.histograms)
+    histograms[CHUNK_SWITCH] = driver.chunk_switches
+    metrics = {}
+    for stage in STAGES:
+        for pct in PERCENTILES:
+            metrics[f'{stage}_p{pct}_ms'] = histograms[stage].percentile(pct)
+    chunk_switches = driver.chunk_switches.count
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for level_num, file_name in lessons:
+        driver.type_lesson(level_num, file_name, args.error_rate, rng, args.max_keys)
+    metrics[MEMORY_GROWTH] = (tracemalloc.get_traced_memory()[0] - before) / 1024
+    tracemalloc.stop()
+
+    driver.close()
+    return {'metrics': metrics, 'lessons': len(lessons), 'keys': keys,
+            'chunk_switches': chunk_switches}
+
+
+def environment():
+    """Describe the machine the figures were taken on."""
+    return {
+        'machine': platform.node(),
+        'platform': platform.platform(),
+        'python': platform.python_version(),
+        'pyside': PYSIDE_VERSION,
+        'qpa': os.environ.get('QT_QPA_PLATFORM'),
+    }
+
+
+def load_baseline(path):
+    """
+    Read a stored baseline.
+
+    Returns:
+        dict: The baseline, or None if there is none
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        return None
+    if baseline.get('version') != BASELINE_VERSION:
+        raise ValueError(f"unsupported baseline version {baseline.get('version')}")
+    return baseline
+
+
+def settings(args):
+    """The options that change what is typed."""
+    return {'max_keys': args.max_keys, 'error_rate': args.error_rate, 'seed': args.seed}
+
+
+def save_baseline(path, results, args):
+    """Store results as the new baseline."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    baseline = {
+        'version': BASELINE_VERSION,
+        'environment': environment(),
+        'settings': settings(args),
+        'metrics': results['metrics'],
+    }
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(baseline, f, indent=2)
+        f.write('\n')
+    os.replace(tmp_path, path)
+
+
+def compare(metrics, baseline_metrics, tolerance):
+    """
+    Check each figure against its baseline.
+
+    Returns:
+        list: (name, value, baseline, limit, regressed) for every figure in
+        both; limit and regressed are None/False without a baseline value
+    """
+    rows = []
+    for name, value in metrics.items():
+        reference = baseline_metrics.get(name)
+        if value is None or reference is None:
+            rows.append((name, value, reference, None, False))
+            continue
+        slack = SLACK_KB if name == MEMORY_GROWTH else SLACK_MS
+        limit = max(reference, 0) * (1 + tolerance) + slack
+        rows.append((name, value, reference, limit, value > limit))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='baseline JSON file')
+    parser.add_argument('--update-baseline', action='store_true',
+                        help='store these results as the baseline instead of checking them')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='allowed slowdown over the baseline as a fraction (0.25 = 25%%)')
+    parser.add_argument('--max-keys', type=int, help='keystrokes per lesson (default: whole lesson)')
+    parser.add_argument('--error-rate', type=float, default=0.03)
+    parser.add_argument('--seed', type=int, default=1234)
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    args = parser.parse_args()
+
+    try:
+        results = measure(args)
+        baseline = None if args.update_baseline else load_baseline(args.baseline)
+    except (RuntimeError, ValueError, OSError) as e:
+        print(f"FAIL: {e}", file=sys.stderr)
+        sys.exit(2)
+
+    if args.update_baseline:
+        save_baseline(args.baseline, results, args)
+
+    rows = compare(results['metrics'], baseline['metrics'] if baseline else {}, args.tolerance)
+    regressions = [row[0] for row in rows if row[4]]
+
+    if args.json:
+        print(json.dumps({
+            'environment': environment(),
+            'lessons': results['lessons'],
+            'keys': results['keys'],
+            'chunk_switches': results['chunk_switches'],
+            'metrics': results['metrics'],
+            'baseline': baseline['metrics'] if baseline else None,
+            'tolerance': args.tolerance,
+            'regressions': regressions,
+        }, indent=2))
+    else:
+        print(f"{results['lessons']} lessons, {results['keys']} keystrokes, "
+              f"{results['chunk_switches']} chunk switches")
+        header = f"{'figure':<24}{'value':>10}{'baseline':>10}{'limit':>10}"
+        print(header)
+        print('-' * len(header))
+        for name, value, reference, limit, regressed in rows:
+            cells = [f"{cell:>10.3f}" if cell is not None else f"{'-':>10}"
+                     for cell in (value, reference, limit)]
+            print(f"{name:<24}{''.join(cells)}{'  REGRESSED' if regressed else ''}")
+        if args.update_baseline:
+            print(f"Baseline written to {args.baseline}")
+        elif baseline is None:
+            print(f"No baseline at {args.baseline}; run with --update-baseline to record one")
+        else:
+            if baseline.get('environment', {}).get('machine') != platform.node():
+                print("Note: the baseline was recorded on another machine")
+            if baseline.get('settings') != settings(args):
+                print(f"Note: the baseline was recorded with other settings: {baseline.get('settings')}")
+
+    if regressions:
+        print(f"FAIL: {', '.join(regressions)} regressed beyond {args.tolerance:.0%} of the baseline",
+              file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""
+Benchmark for the session history database.
+
+Fills a temporary history with several years of synthetic sessions, then
+times recording one more session and the dashboard queries (daily and weekly
+averages, a level trend, personal-best curves). The queries read only the
+rollup tables; the same weekly averages computed by scanning the raw
+sessions table are timed for comparison.
+
+Usage:
+    python benchmarks/bench_history.py
+    python benchmarks/bench_history.py --years 5 --sessions-per-day 30 --max-ms 50
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+from session_history import SessionHistory  # noqa: E402
+
+LEVELS = (1, 2, 3, 4, 5, 100)
+
+
+def fill(history, years, sessions_per_day, rng):
+    """
+    Record synthetic sessions spread over the given number of years.
+
+    Returns:
+        int: Sessions recorded
+    """
+    start = time.time() - years * 365 * 86400
+    connection = history._connect()
+    count = 0
+    # One transaction for the bulk load; record() commits per session
+    with connection:
+        for day in range(years * 365):
+            for _ in range(sessions_per_day):
+                finished_at = start + day * 86400 + rng.uniform(0, 86400)
+                level = rng.choice(LEVELS)
+                wpm = rng.gauss(40 + day / 50.0, 8)
+                session_id = connection.execute(
+                    'INSERT INTO sessions (finished_at, level, duration_s, wpm, accuracy, burst_wpm, '
+                    'chars, keystrokes, errors, passed) VALUES (?, ?, 90, ?, 96, ?, 600, 620, 20, 1)',
+                    (finished_at, level, wpm, wpm * 1.3)).lastrowid
+                history._apply(connection, session_id, finished_at, level, wpm, 96.0, 600, 90.0, True)
+                count += 1
+    return count
+
+
+def timed(function, repeat=5):
+    """Best-of-N wall time of a call in milliseconds."""
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        function()
+        elapsed = (time.perf_counter() - t0) * 1000.0
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def raw_weekly_scan(history):
+    """Weekly averages straight from the sessions table (what rollups avoid)."""
+    return history._connect().execute(
+        "SELECT strftime('%Y-%W', finished_at, 'unixepoch', 'localtime') AS week, "
+        "COUNT(*), AVG(wpm), AVG(accuracy) FROM sessions GROUP BY week").fetchall()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--years', type=int, default=3)
+    parser.add_argument('--sessions-per-day', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=1234)
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    parser.add_argument('--max-ms', type=float,
+                        help='exit non-zero if any dashboard query exceeds this')
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as directory:
+        history = SessionHistory(os.path.join(directory, 'history.sqlite3'))
+        sessions = fill(history, args.years, args.sessions_per_day, rng)
+
+        results = {
+            'sessions': sessions,
+            'record_ms': timed(lambda: history.record(3, 45.0, 97.0, 60.0, 80.0, 600, 610, 10, True)),
+            'queries_ms': {
+                'daily_averages': timed(lambda: history.averages('day')),
+                'weekly_averages': timed(lambda: history.averages('week')),
+                'level_trend': timed(lambda: history.level_trend(3)),
+                'personal_bests': timed(lambda: history.personal_bests()),
+                'level_personal_bests': timed(lambda: history.personal_bests(3)),
+            },
+            'raw_weekly_scan_ms': timed(lambda: raw_weekly_scan(history)),
+        }
+        history.close()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{results['sessions']} sessions")
+        print(f"{'record one session':<24}{results['record_ms']:>10.2f} ms")
+        for name, ms in results['queries_ms'].items():
+            print(f"{name:<24}{ms:>10.2f} ms")
+        print(f"{'(raw weekly scan)':<24}{results['raw_weekly_scan_ms']:>10.2f} ms")
+
+    slowest = max(results['queries_ms'].values())
+    if args.max_ms is not None and slowest > args.max_ms:
+        print(f"FAIL: slowest dashboard query {slowest:.2f} ms exceeds {args.max_ms:.2f} ms",
+              file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
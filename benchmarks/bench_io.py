@@ -0,0 +1,159 @@
+"""
+UI-thread blocking at the end of a session on slow storage.
+
+Runs the main window offscreen against a temporary home folder, with
+os.fsync and os.replace slowed down to mimic a network-mounted home
+directory. Each lesson is typed to the end and the benchmark waits for the
+next one; the longest single stretch the UI thread spent in one call
+(key event or event-loop pass) in that time is the stall the typist feels.
+This runs once with the window's I/O pool and once with a stand-in that
+does the same work inline, as before the pool existed.
+
+Usage:
+    python benchmarks/bench_io.py
+    python benchmarks/bench_io.py --latency-ms 40 --sessions 5
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PySide6.QtCore import Qt, QEvent, QObject  # noqa: E402
+from PySide6.QtGui import QKeyEvent  # noqa: E402
+from PySide6.QtWidgets import QApplication, QMessageBox  # noqa: E402
+
+WAIT_S = 10
+
+
+class InlineIo(QObject):
+    """IoPool stand-in that runs everything on the calling thread."""
+
+    pending = 0
+
+    def read(self, fn, *args, on_done=None, on_error=None):
+        self._run(fn, args, on_done, on_error)
+
+    def write(self, fn, *args, on_done=None, on_error=None):
+        self._run(fn, args, on_done, on_error)
+
+    def _run(self, fn, args, on_done, on_error):
+        try:
+            result = fn(*args)
+        except Exception as e:
+            if on_error is not None:
+                on_error(e)
+            return
+        if on_done is not None:
+            on_done(result)
+
+    def shutdown(self):
+        pass
+
+
+def slow_down(latency_s):
+    """Delay every fsync and rename, as on a network file system."""
+    fsync, replace = os.fsync, os.replace
+
+    def slow_fsync(fd):
+        time.sleep(latency_s)
+        fsync(fd)
+
+    def slow_replace(src, dst):
+        time.sleep(latency_s)
+        replace(src, dst)
+
+    os.fsync = slow_fsync
+    os.replace = slow_replace
+
+
+def run_window(app, inline, sessions):
+    """
+    Type sessions in a fresh window.
+
+    Returns:
+        list: Longest UI-thread call (ms) between each lesson's last key and
+        the next lesson being ready
+    """
+    from level_manager import LevelManager
+    from ui.main_window import MainWindow
+
+    level_manager = LevelManager()
+    window = MainWindow(level_manager)
+    if inline:
+        window.io_pool = InlineIo()
+        level_manager.io = None
+    window.show()
+
+    def spin(done):
+        longest = 0.0
+        deadline = time.perf_counter() + WAIT_S
+        while not done() and time.perf_counter() < deadline:
+            t0 = time.perf_counter()
+            app.processEvents()
+            longest = max(longest, time.perf_counter() - t0)
+            time.sleep(0.0005)
+        return longest
+
+    def press(char):
+        key = Qt.Key_Return if char == '\n' else 0
+        window.keyPressEvent(QKeyEvent(QEvent.KeyPress, key, Qt.NoModifier, char))
+
+    spin(lambda: window.current_session is not None and not window._between_lessons)
+    blocked = []
+    for _ in range(sessions):
+        session = window.current_session
+        for char in session.text[:-1]:
+            press(char)
+        t0 = time.perf_counter()
+        press(session.text[-1])
+        longest = time.perf_counter() - t0
+        longest = max(longest, spin(lambda: window.current_session is not session
+                                    and not window._between_lessons))
+        blocked.append(longest * 1000)
+    window.close()
+    return blocked
+
+
+def run(args):
+    os.environ['HOME'] = tempfile.mkdtemp(prefix='typetutor-bench-')
+    app = QApplication.instance() or QApplication([])
+    QMessageBox.information = staticmethod(lambda *a, **k: None)
+    slow_down(args.latency_ms / 1000)
+
+    pooled = run_window(app, False, args.sessions)
+    inline = run_window(app, True, args.sessions)
+    return {
+        'latency_ms': args.latency_ms,
+        'sessions': args.sessions,
+        'pool_blocked_ms': pooled,
+        'inline_blocked_ms': inline,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--latency-ms', type=float, default=25.0,
+                        help='delay added to every fsync and rename')
+    parser.add_argument('--sessions', type=int, default=5)
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    args = parser.parse_args()
+
+    results = run(args)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{results['sessions']} sessions, {results['latency_ms']:.0f} ms per fsync/rename")
+    for label, key in (('I/O pool', 'pool_blocked_ms'), ('inline', 'inline_blocked_ms')):
+        blocked = results[key]
+        print(f"{label:9} longest UI block per session end: "
+              f"{' '.join(f'{ms:.0f}' for ms in blocked)} ms (max {max(blocked):.0f})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""
+Memory benchmark for the keystroke log.
+
+Simulates a long session at a steady typing rate and reports the bytes held
+by KeystrokeLog along with the tracemalloc peak while recording.
+
+Usage:
+    python benchmarks/bench_keystroke_log.py
+    python benchmarks/bench_keystroke_log.py --minutes 30 --keys-per-sec 15 --max-bytes 2000000
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+from keystroke_log import KeystrokeLog  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--minutes', type=float, default=30.0)
+    parser.add_argument('--keys-per-sec', type=float, default=15.0)
+    parser.add_argument('--max-bytes', type=int,
+                        help='exit non-zero if the log holds more than this')
+    args = parser.parse_args()
+
+    keys = int(args.minutes * 60 * args.keys_per_sec)
+    step_ns = int(1e9 / args.keys_per_sec)
+
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    log = KeystrokeLog()
+    for i in range(keys):
+        log.append(i * step_ns, i, 97, i % 20 != 0)
+    elapsed = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    nbytes = log.nbytes()
+    print(f"keystrokes:        {keys}")
+    print(f"log bytes:         {nbytes} ({nbytes / keys:.1f} bytes/key, capacity {log.capacity})")
+    print(f"tracemalloc peak:  {peak}")
+    print(f"append rate:       {keys / elapsed:,.0f} keys/s")
+
+    if args.max_bytes is not None and nbytes > args.max_bytes:
+        print(f"FAIL: log holds {nbytes} bytes, budget {args.max_bytes}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""
+Memory of marathon sessions versus one long text.
+
+Types a simulated multi-hour marathon through a MarathonEngine fed by a
+generator of bundled lessons, sampling traced memory as it goes, then types
+the same stream as a single TypingEngine text. The marathon's memory should
+stay flat while the plain engine's grows with the text and keystroke log.
+
+Usage:
+    python benchmarks/bench_marathon.py
+    python benchmarks/bench_marathon.py --hours 8 --keys-per-sec 6
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+from marathon import MarathonEngine  # noqa: E402
+from typing_engine import TypingEngine  # noqa: E402
+
+SAMPLES = 10
+
+
+def lesson_stream(seed):
+    """Bundled lessons in random order, without end."""
+    levels_dir = os.path.join(ROOT, 'data', 'levels')
+    texts = []
+    for name in sorted(os.listdir(levels_dir)):
+        with open(os.path.join(levels_dir, name), 'r', encoding='utf-8') as f:
+            texts.append(f.read().rstrip())
+    rng = random.Random(seed)
+    separator = ''
+    while True:
+        yield separator + rng.choice(texts)
+        separator = '\n'
+
+
+def type_through(engine, keystrokes, error_rate, seed):
+    """
+    Type keystrokes into an engine, sampling traced memory.
+
+    Returns:
+        tuple: (memory samples in KB, seconds taken)
+    """
+    rng = random.Random(seed)
+    every = max(1, keystrokes // SAMPLES)
+    samples = []
+    t0 = time.perf_counter()
+    for i in range(keystrokes):
+        if rng.random() < error_rate:
+            engine.process_keystroke('\x00')
+        else:
+            engine.process_keystroke(engine.get_current_char())
+        if i % every == 0:
+            samples.append(tracemalloc.get_traced_memory()[0] // 1024)
+    return samples, time.perf_counter() - t0
+
+
+def run(args):
+    keystrokes = int(args.hours * 3600 * args.keys_per_sec)
+    retired = [0]
+
+    def on_retire(text, offset, log):
+        retired[0] += len(log)
+
+    tracemalloc.start()
+    marathon = MarathonEngine(lesson_stream(args.seed), 40, on_retire)
+    marathon_kb, marathon_s = type_through(marathon, keystrokes, args.error_rate, args.seed)
+    marathon_chars = marathon.current_index
+    del marathon
+    tracemalloc.stop()
+
+    # The same stream, materialized up front
+    stream = lesson_stream(args.seed)
+    pieces = []
+    length = 0
+    while length <= marathon_chars + 1:
+        pieces.append(next(stream))
+        length += len(pieces[-1])
+    tracemalloc.start()
+    plain = TypingEngine(''.join(pieces), 40)
+    del pieces
+    plain_kb, plain_s = type_through(plain, keystrokes, args.error_rate, args.seed)
+    tracemalloc.stop()
+
+    return {
+        'keystrokes': keystrokes,
+        'chars': marathon_chars,
+        'retired_keystrokes': retired[0],
+        'marathon_kb': marathon_kb,
+        'plain_kb': plain_kb,
+        'marathon_us_per_key': marathon_s / keystrokes * 1e6,
+        'plain_us_per_key': plain_s / keystrokes * 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--hours', type=float, default=3.0)
+    parser.add_argument('--keys-per-sec', type=float, default=5.0)
+    parser.add_argument('--error-rate', type=float, default=0.03)
+    parser.add_argument('--seed', type=int, default=1234)
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    args = parser.parse_args()
+
+    results = run(args)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{results['keystrokes']} keystrokes, {results['chars']} characters typed")
+    print(f"marathon KB: {' '.join(str(kb) for kb in results['marathon_kb'])} "
+          f"({results['marathon_us_per_key']:.2f} us/key)")
+    print(f"plain KB:    {' '.join(str(kb) for kb in results['plain_kb'])} "
+          f"({results['plain_us_per_key']:.2f} us/key)")
+
+
+if __name__ == '__main__':
+    main()
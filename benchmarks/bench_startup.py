@@ -0,0 +1,142 @@
+"""
+Time-to-first-keystroke benchmark for the full application.
+
+Launches the app repeatedly with the startup probe enabled (see
+src/startup_probe.py). The probe types the first character of the lesson as
+soon as the window is ready and quits once it is accepted. Every milestone is
+reported in milliseconds from the moment the process was spawned:
+
+    main             interpreter (or frozen bootloader) up, main() entered
+    window_created   Qt initialized, window built
+    first_paint      window painted for the first time
+    ready            keyboard layout and lesson loaded
+    first_keystroke  first keystroke accepted by the typing session
+
+Runs from source by default; pass --exe to time a frozen build.
+
+Usage:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --exe dist/TypingTutor.exe --runs 10
+    QT_QPA_PLATFORM=offscreen python benchmarks/bench_startup.py --max-ms 1500
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+from main import STARTUP_PROBE_ENV  # noqa: E402
+from bench_engine import percentile  # noqa: E402
+
+MILESTONES = ('main', 'window_created', 'first_paint', 'ready', 'first_keystroke')
+
+
+def launch(command, timeout):
+    """
+    Start the app once with the probe enabled and wait for it to quit.
+
+    Args:
+        command: argv used to start the app
+        timeout: Seconds to wait before killing it
+
+    Returns:
+        dict: Milliseconds from spawn to each milestone
+
+    Raises:
+        RuntimeError: If the app exits without reporting a first keystroke
+    """
+    fd, result_path = tempfile.mkstemp(prefix='typetutor_startup_', suffix='.json')
+    os.close(fd)
+    env = dict(os.environ)
+    env[STARTUP_PROBE_ENV] = result_path
+    try:
+        spawn_ns = time.time_ns()
+        process = subprocess.Popen(command, cwd=ROOT, env=env,
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        try:
+            _, stderr = process.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.communicate()
+            raise RuntimeError(f"app did not accept a keystroke within {timeout} s")
+
+        try:
+            with open(result_path, 'r', encoding='utf-8') as f:
+                result = json.load(f)
+        except (OSError, ValueError):
+            result = {}
+        marks = result.get('marks', {})
+        if 'first_keystroke' not in marks:
+            detail = result.get('error') or stderr.decode(errors='replace').strip()[-500:]
+            raise RuntimeError(f"app exited with code {process.returncode}: {detail}")
+
+        return {name: (marks[name] - spawn_ns) / 1e6 for name in MILESTONES if name in marks}
+    finally:
+        os.remove(result_path)
+
+
+def summarize(runs):
+    """
+    Reduce per-run milestones to median and worst-case figures.
+
+    Returns:
+        dict: milestone -> {'p50_ms', 'max_ms'}
+    """
+    summary = {}
+    for name in MILESTONES:
+        values = sorted(run[name] for run in runs if name in run)
+        if values:
+            summary[name] = {'p50_ms': percentile(values, 50), 'max_ms': values[-1]}
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--exe', help='frozen executable to time instead of src/main.py')
+    parser.add_argument('--runs', type=int, default=5, help='launches to time')
+    parser.add_argument('--warmup', type=int, default=1,
+                        help='untimed launches first (fills OS file caches)')
+    parser.add_argument('--timeout', type=float, default=60.0,
+                        help='seconds to wait for each launch')
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    parser.add_argument('--max-ms', type=float,
+                        help='exit non-zero if median time to first keystroke exceeds this')
+    args = parser.parse_args()
+
+    command = [os.path.abspath(args.exe)] if args.exe else [sys.executable, os.path.join(ROOT, 'src', 'main.py')]
+
+    try:
+        for _ in range(args.warmup):
+            launch(command, args.timeout)
+        runs = [launch(command, args.timeout) for _ in range(args.runs)]
+    except RuntimeError as e:
+        print(f"FAIL: {e}", file=sys.stderr)
+        sys.exit(2)
+
+    summary = summarize(runs)
+    target = 'frozen' if args.exe else 'source'
+
+    if args.json:
+        print(json.dumps({'target': target, 'runs': runs, 'summary': summary}, indent=2))
+    else:
+        print(f"Startup ({target}, {len(runs)} runs)")
+        header = f"{'milestone':<18}{'p50 ms':>10}{'max ms':>10}"
+        print(header)
+        print('-' * len(header))
+        for name, r in summary.items():
+            print(f"{name:<18}{r['p50_ms']:>10.1f}{r['max_ms']:>10.1f}")
+
+    first_keystroke = summary['first_keystroke']['p50_ms']
+    if args.max_ms is not None and first_keystroke > args.max_ms:
+        print(f"FAIL: time to first keystroke {first_keystroke:.1f} ms exceeds {args.max_ms:.1f} ms",
+              file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
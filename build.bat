@@ -11,6 +11,9 @@ REM Clean previous builds
 if exist build rmdir /s /q build
 if exist dist rmdir /s /q dist
 
+REM Pack lesson files into the indexed corpus bundled with the executable
+python src\lesson_corpus.py
+
 REM Build with PyInstaller
 pyinstaller typing_tutor.spec
 
@@ -0,0 +1,268 @@
+"""
+Classroom client: streams a seat's live stats to a classroom server.
+
+The client runs its own asyncio loop on a background thread, so the Qt thread
+never waits on the network. post_stats() and post_complete() only update
+pending state under a lock. Stats are coalesced to the latest value and
+completions are queued, bounded by MAX_PENDING_COMPLETIONS. Every
+batch_interval the loop sends what is pending as one batch and awaits
+drain(), so a slow server or link slows batching instead of growing
+buffers. The server acks every batch; completions are kept until acked and
+resent after a reconnect (with exponential backoff), carrying a sequence
+number so the server can drop duplicates.
+
+Run directly to watch the leaderboard (instructor view):
+    python src/classroom_client.py --viewer 192.168.1.10:8765
+"""
+import argparse
+import asyncio
+import collections
+import json
+import random
+import threading
+import time
+import uuid
+
+BATCH_INTERVAL = 0.25
+RECONNECT_MIN = 0.5
+RECONNECT_MAX = 10.0
+CONNECT_TIMEOUT = 5.0
+MAX_PENDING_COMPLETIONS = 1000
+MAX_LINE_BYTES = 1024 * 1024
+
+
+def parse_address(address, default_port=8765):
+    """
+    Split "host:port" (port optional).
+
+    Returns:
+        tuple: (host, port)
+    """
+    host, _, port = address.rpartition(':')
+    if not host:
+        return address, default_port
+    return host, int(port)
+
+
+class ClassroomClient:
+    """Batched, reconnecting connection from one seat (or viewer) to the server."""
+
+    def __init__(self, host, port, seat, name=None, role='seat', batch_interval=BATCH_INTERVAL):
+        self.host = host
+        self.port = port
+        self.seat = seat
+        self.name = name or seat
+        self.role = role
+        self.batch_interval = batch_interval
+
+        self._lock = threading.Lock()
+        self._latest_stats = None
+        self._completions = collections.deque()
+        # Completions sent but not yet acked: (batch number, [events])
+        self._unacked = collections.deque()
+        self._batch_number = 0
+        # Completions are numbered per client instance, so a restarted app can't collide
+        self._token = uuid.uuid4().hex
+        self._sequence = 0
+        self._loop = None
+        self._stopping = None
+        self._thread = None
+
+        # Latest leaderboard received from the server
+        self.leaderboard = []
+        self.leaderboard_time = None
+
+        self.connected = False
+        self.connections = 0
+        self.batches_sent = 0
+        self.events_sent = 0
+        self.dropped = 0
+
+    def post_stats(self, level, wpm, accuracy, chars, total):
+        """Record the seat's current stats (thread-safe; replaces unsent stats)."""
+        event = {'type': 'stats', 'level': level, 'wpm': wpm, 'accuracy': accuracy,
+                 'chars': chars, 'total': total}
+        with self._lock:
+            self._latest_stats = event
+
+    def post_complete(self, level, wpm, accuracy, passed):
+        """Queue a finished session (thread-safe)."""
+        with self._lock:
+            self._sequence += 1
+            event = {'type': 'complete', 'level': level, 'wpm': wpm, 'accuracy': accuracy,
+                     'passed': bool(passed), 'time': time.time(),
+                     'token': self._token, 'sequence': self._sequence}
+            if len(self._completions) >= MAX_PENDING_COMPLETIONS:
+                self._completions.popleft()
+                self.dropped += 1
+            self._completions.append(event)
+
+    def _take_events(self):
+        """Remove and return everything pending, completions first."""
+        with self._lock:
+            events = list(self._completions)
+            self._completions.clear()
+            if self._latest_stats is not None:
+                events.append(self._latest_stats)
+                self._latest_stats = None
+        return events
+
+    def _requeue(self, events):
+        """Put back events whose send failed (newer stats win)."""
+        with self._lock:
+            for event in reversed(events):
+                if event['type'] == 'complete':
+                    self._completions.appendleft(event)
+                elif self._latest_stats is None:
+                    self._latest_stats = event
+
+    def _acknowledge(self, batch_number):
+        """Forget completions the server has stored."""
+        while self._unacked and self._unacked[0][0] <= batch_number:
+            self._unacked.popleft()
+
+    def _requeue_unacked(self):
+        """Queue completions the server never acked for resending."""
+        events = [event for _, batch in self._unacked for event in batch]
+        self._unacked.clear()
+        self._requeue(events)
+
+    def start(self):
+        """Run the client on a daemon thread."""
+        self._thread = threading.Thread(target=lambda: asyncio.run(self.run()),
+                                         name='classroom-client', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=2.0):
+        """Send what is pending, disconnect and wait for the thread to end."""
+        if self._loop is not None and self._stopping is not None:
+            self._loop.call_soon_threadsafe(self._stopping.set)
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    async def run(self):
+        """Connect, stream batches and reconnect until stop() is called."""
+        self._loop = asyncio.get_running_loop()
+        self._stopping = asyncio.Event()
+        delay = RECONNECT_MIN
+        final_attempt = True
+        while True:
+            if self._stopping.is_set():
+                # One more connection to deliver completions left unacked when stop() came
+                with self._lock:
+                    pending = bool(self._completions)
+                if not pending or not final_attempt:
+                    break
+                final_attempt = False
+            try:
+                reader, writer = await asyncio.wait_for(
+                    asyncio.open_connection(self.host, self.port, limit=MAX_LINE_BYTES),
+                    CONNECT_TIMEOUT)
+            except (OSError, asyncio.TimeoutError):
+                # Jitter keeps a whole lab from reconnecting in lockstep
+                await self._wait_stopping(delay * random.uniform(0.5, 1.0))
+                delay = min(delay * 2, RECONNECT_MAX)
+                continue
+
+            delay = RECONNECT_MIN
+            self.connected = True
+            self.connections += 1
+            receiver = asyncio.create_task(self._receive(reader))
+            try:
+                hello = {'type': 'hello', 'role': self.role, 'seat': self.seat, 'name': self.name}
+                writer.write((json.dumps(hello) + '\n').encode())
+                await writer.drain()
+                await self._send_batches(writer, receiver)
+            except (ConnectionError, OSError):
+                pass
+            finally:
+                if self._stopping.is_set():
+                    await self._wait_acked(receiver)
+                self.connected = False
+                receiver.cancel()
+                writer.close()
+                self._requeue_unacked()
+
+    async def _wait_stopping(self, timeout):
+        """Sleep for timeout seconds, returning early if stop() was called."""
+        try:
+            await asyncio.wait_for(self._stopping.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _wait_acked(self, receiver, timeout=1.0):
+        """Give the server a moment to ack the final batch before disconnecting."""
+        deadline = time.monotonic() + timeout
+        while self._unacked and not receiver.done() and time.monotonic() < deadline:
+            await asyncio.sleep(0.01)
+
+    async def _send_batches(self, writer, receiver):
+        """Send pending events every batch_interval until disconnected or stopped."""
+        while not receiver.done():
+            await self._wait_stopping(self.batch_interval)
+            events = self._take_events()
+            if events:
+                self._batch_number += 1
+                completions = [event for event in events if event['type'] == 'complete']
+                if completions:
+                    self._unacked.append((self._batch_number, completions))
+                batch = {'type': 'batch', 'batch': self._batch_number, 'events': events}
+                try:
+                    writer.write((json.dumps(batch) + '\n').encode())
+                    await writer.drain()
+                except (ConnectionError, OSError):
+                    # Completions come back through _unacked once disconnected
+                    self._requeue([event for event in events if event['type'] == 'stats'])
+                    raise
+                self.batches_sent += 1
+                self.events_sent += len(events)
+            if self._stopping.is_set():
+                return
+
+    async def _receive(self, reader):
+        """Keep the latest leaderboard until the server closes the connection."""
+        while True:
+            try:
+                line = await reader.readline()
+            except (ConnectionError, ValueError):
+                return
+            if not line:
+                return
+            try:
+                message = json.loads(line)
+            except ValueError:
+                continue
+            kind = message.get('type')
+            if kind == 'ack':
+                self._acknowledge(message['batch'])
+            elif kind == 'leaderboard':
+                self.leaderboard = message['seats']
+                self.leaderboard_time = message['time']
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Watch a TypeTutor classroom leaderboard')
+    parser.add_argument('--viewer', required=True, metavar='HOST:PORT')
+    args = parser.parse_args()
+
+    host, port = parse_address(args.viewer)
+    client = ClassroomClient(host, port, seat='viewer', role='viewer')
+    client.start()
+    shown = None
+    try:
+        while True:
+            time.sleep(0.5)
+            if client.leaderboard_time == shown:
+                continue
+            shown = client.leaderboard_time
+            print(f"\n{'#':>3} {'seat':<16}{'level':>6}{'wpm':>8}{'acc':>8}{'done':>6}{'best':>8}")
+            for rank, seat in enumerate(client.leaderboard, 1):
+                marker = '' if seat.get('connected') else ' (offline)'
+                print(f"{rank:>3} {seat['name'][:16]:<16}{seat['level'] or '-':>6}{seat['wpm']:>8.1f}"
+                      f"{seat['accuracy']:>8.1f}{seat['completed']:>6}{seat['best_wpm']:>8.1f}{marker}")
+    except KeyboardInterrupt:
+        client.stop()
+
+
+if __name__ == '__main__':
+    main()
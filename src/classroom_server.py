@@ -0,0 +1,304 @@
+"""
+Classroom server: aggregates live typing stats from every seat in a lab.
+
+Clients speak newline-delimited JSON over TCP. A seat sends a hello and then
+batches of events; a viewer (the instructor's screen) sends a hello with role
+"viewer" and only listens. Every BROADCAST_INTERVAL the server fans the
+current leaderboard out to all connections.
+
+Backpressure: each connection has a single pending-leaderboard slot. Its
+writer task always sends the newest snapshot and awaits drain(), so a slow
+client skips intermediate snapshots instead of growing a buffer. Reading is
+paced by TCP flow control. Completed sessions are queued and written to
+SQLite in batches off the event loop.
+
+Each batch is acked so clients can resend completions lost with a dropped
+connection. A completion carries its client's token and sequence number, and
+anything at or below the last sequence seen for that token is a duplicate.
+
+Usage:
+    python src/classroom_server.py --port 8765 --db classroom.sqlite3
+"""
+import argparse
+import asyncio
+import json
+import os
+import sqlite3
+import time
+
+DEFAULT_PORT = 8765
+BROADCAST_INTERVAL = 0.5
+WRITE_INTERVAL = 1.0
+WRITE_BATCH = 500
+MAX_LINE_BYTES = 1024 * 1024
+
+_RESULTS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    seat TEXT NOT NULL,
+    name TEXT NOT NULL,
+    level INTEGER NOT NULL,
+    wpm REAL NOT NULL,
+    accuracy REAL NOT NULL,
+    passed INTEGER NOT NULL,
+    finished_at REAL NOT NULL,
+    received_at REAL NOT NULL
+)
+"""
+
+
+class ResultWriter:
+    """Batches completed sessions into SQLite inserts on a worker thread."""
+
+    def __init__(self, path):
+        self.path = path
+        self.pending = []
+        self.written = 0
+        self._connection = None
+
+    def add(self, row):
+        """Queue one result row (seat, name, level, wpm, accuracy, passed, finished_at, received_at)."""
+        self.pending.append(row)
+
+    def _open(self):
+        if self._connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # Used only from the writer thread, one batch at a time
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute(_RESULTS_SCHEMA)
+        return self._connection
+
+    def _write(self, rows):
+        connection = self._open()
+        with connection:
+            connection.executemany(
+                'INSERT INTO results (seat, name, level, wpm, accuracy, passed, finished_at, '
+                'received_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)', rows)
+
+    async def flush(self):
+        """Write everything queued so far in one transaction."""
+        while self.pending:
+            rows = self.pending[:WRITE_BATCH]
+            del self.pending[:WRITE_BATCH]
+            try:
+                await asyncio.to_thread(self._write, rows)
+                self.written += len(rows)
+            except sqlite3.Error as e:
+                print(f"Warning: Could not save classroom results: {e}")
+                self.pending[:0] = rows
+                return
+
+    async def run(self):
+        """Flush periodically until cancelled, then flush once more."""
+        try:
+            while True:
+                await asyncio.sleep(WRITE_INTERVAL)
+                await self.flush()
+        finally:
+            await self.flush()
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+class _Connection:
+    """One client connection and its latest-snapshot writer."""
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.seat = None
+        self.role = 'seat'
+        self.name = None
+        self.snapshot = None
+        self.wakeup = asyncio.Event()
+        self.sent = 0
+        self.skipped = 0
+
+    def offer(self, snapshot):
+        """Replace the pending snapshot; an unsent one is skipped."""
+        if self.snapshot is not None:
+            self.skipped += 1
+        self.snapshot = snapshot
+        self.wakeup.set()
+
+    async def send_loop(self):
+        """Send the newest snapshot whenever there is one, respecting drain()."""
+        while True:
+            await self.wakeup.wait()
+            self.wakeup.clear()
+            snapshot, self.snapshot = self.snapshot, None
+            if snapshot is None:
+                continue
+            try:
+                self.writer.write(snapshot)
+                await self.writer.drain()
+            except ConnectionError:
+                # The read side notices the disconnect and cleans up
+                return
+            self.sent += 1
+
+
+class ClassroomServer:
+    """Seat aggregation, leaderboard fan-out and result persistence."""
+
+    def __init__(self, db_path, broadcast_interval=BROADCAST_INTERVAL):
+        self.seats = {}  # seat id -> latest state dict
+        self.connections = set()
+        self.results = ResultWriter(db_path)
+        self.broadcast_interval = broadcast_interval
+        self.events_received = 0
+        self.batches_received = 0
+        self.completions = 0
+        self.duplicates = 0
+        self._last_sequence = {}  # client token -> highest completion sequence stored
+        self._changed = False
+        self._server = None
+        self._tasks = []
+
+    async def start(self, host='127.0.0.1', port=DEFAULT_PORT):
+        """
+        Start listening and the background tasks.
+
+        Returns:
+            int: The bound port (useful with port 0)
+        """
+        self._server = await asyncio.start_server(self._handle, host, port, limit=MAX_LINE_BYTES)
+        self._tasks = [asyncio.create_task(self._broadcast_loop()),
+                       asyncio.create_task(self.results.run())]
+        return self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        """Close every connection and flush pending results."""
+        self._server.close()
+        for connection in list(self.connections):
+            connection.writer.close()
+        await self._server.wait_closed()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def leaderboard(self):
+        """
+        Current standings, fastest first.
+
+        Returns:
+            list: Seat state dicts sorted by WPM
+        """
+        return sorted(self.seats.values(), key=lambda seat: seat['wpm'], reverse=True)
+
+    async def _broadcast_loop(self):
+        """Fan the leaderboard out whenever it changed since the last tick."""
+        while True:
+            await asyncio.sleep(self.broadcast_interval)
+            if not self._changed or not self.connections:
+                continue
+            self._changed = False
+            # Serialized once, shared by every connection
+            snapshot = (json.dumps({'type': 'leaderboard', 'time': time.time(),
+                                    'seats': self.leaderboard()}) + '\n').encode()
+            for connection in self.connections:
+                connection.offer(snapshot)
+
+    async def _handle(self, reader, writer):
+        """Serve one client until it disconnects."""
+        connection = _Connection(writer)
+        self.connections.add(connection)
+        sender = asyncio.create_task(connection.send_loop())
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                    self._dispatch(connection, message)
+                except (ValueError, KeyError, TypeError) as e:
+                    print(f"Warning: Dropping malformed classroom message: {e}")
+        except (ConnectionError, ValueError):
+            # Dropped connection, or a line longer than MAX_LINE_BYTES
+            pass
+        finally:
+            sender.cancel()
+            self.connections.discard(connection)
+            if connection.seat in self.seats:
+                self.seats[connection.seat]['connected'] = False
+                self._changed = True
+            writer.close()
+
+    def _dispatch(self, connection, message):
+        """Apply one decoded client message."""
+        kind = message['type']
+        if kind == 'hello':
+            connection.role = message.get('role', 'seat')
+            connection.name = message.get('name')
+            # New viewers get the standings on the next tick
+            self._changed = True
+            if connection.role == 'seat':
+                connection.seat = str(message['seat'])
+                state = self.seats.setdefault(connection.seat, {
+                    'seat': connection.seat, 'name': connection.seat, 'level': None,
+                    'wpm': 0.0, 'accuracy': 100.0, 'chars': 0, 'total': 0,
+                    'completed': 0, 'best_wpm': 0.0,
+                })
+                state['name'] = str(message.get('name') or connection.seat)
+                state['connected'] = True
+        elif kind == 'batch' and connection.seat is not None:
+            self.batches_received += 1
+            for event in message['events']:
+                self._apply_event(connection.seat, event)
+            if 'batch' in message:
+                # A small write; flow control is left to the snapshot writer
+                connection.writer.write((json.dumps({'type': 'ack', 'batch': message['batch']})
+                                         + '\n').encode())
+
+    def _apply_event(self, seat, event):
+        """Fold a seat's stats or completion event into its state."""
+        self.events_received += 1
+        state = self.seats[seat]
+        kind = event['type']
+        if kind == 'stats':
+            state.update(level=event['level'], wpm=event['wpm'], accuracy=event['accuracy'],
+                         chars=event['chars'], total=event['total'])
+        elif kind == 'complete':
+            token = event.get('token')
+            if token is not None:
+                if event['sequence'] <= self._last_sequence.get(token, 0):
+                    self.duplicates += 1
+                    return
+                self._last_sequence[token] = event['sequence']
+            self.completions += 1
+            state['completed'] += 1
+            state['best_wpm'] = max(state['best_wpm'], event['wpm'])
+            self.results.add((seat, state['name'], event['level'], event['wpm'],
+                              event['accuracy'], int(event['passed']), event['time'], time.time()))
+        self._changed = True
+
+
+async def serve(host, port, db_path):
+    """Run a server until interrupted."""
+    server = ClassroomServer(db_path)
+    port = await server.start(host, port)
+    print(f"Classroom server listening on {host}:{port}, saving results to {db_path}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='TypeTutor classroom server')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--db', default='classroom.sqlite3', help='SQLite file for results')
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.db))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
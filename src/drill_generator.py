@@ -0,0 +1,210 @@
+"""
+Adaptive drills built from an n-gram index over the lesson texts.
+
+The index counts the whitespace-separated words of every lesson source
+(built-in lesson files and imported texts). Counts are cached on disk per
+source together with a stamp of the source, so only sources whose stamp
+changed are re-read and re-tokenized. From the merged word counts it derives,
+for every character and every character bigram, the words containing it with
+cumulative frequency weights, so a drill targeting any key or transition is
+drawn with a binary search per word.
+"""
+import bisect
+import itertools
+import json
+import os
+import random
+import tempfile
+
+DRILL_INDEX_FILE = 'drill_index.json'
+DRILL_INDEX_VERSION = 1
+
+DRILL_CHARS = 600
+DRILL_LINE_CHARS = 60
+# Share of drill words chosen for a focus key/bigram (the rest keep the flow natural)
+FOCUS_SHARE = 0.7
+
+MAX_WORD_CHARS = 20
+MAX_WORDS_PER_SOURCE = 5000
+
+
+def count_words(texts):
+    """
+    Count the words of a source's texts, keeping the most frequent.
+
+    Args:
+        texts: Iterable of lesson texts
+
+    Returns:
+        dict: word -> count
+    """
+    counts = {}
+    for text in texts:
+        for word in text.split():
+            if len(word) <= MAX_WORD_CHARS:
+                counts[word] = counts.get(word, 0) + 1
+    if len(counts) > MAX_WORDS_PER_SOURCE:
+        kept = sorted(counts.items(), key=lambda item: item[1], reverse=True)[:MAX_WORDS_PER_SOURCE]
+        counts = dict(kept)
+    return counts
+
+
+class _WeightedChoice:
+    """Items with cumulative weights for O(log n) weighted draws."""
+
+    def __init__(self, weighted):
+        self.items = [item for item, _ in weighted]
+        self.cumulative = list(itertools.accumulate(weight for _, weight in weighted))
+
+    def draw(self, rng):
+        """Pick an item with probability proportional to its weight."""
+        point = rng.random() * self.cumulative[-1]
+        return self.items[bisect.bisect_right(self.cumulative, point)]
+
+
+class NgramIndex:
+    """Word counts per lesson source plus derived character/bigram lookups."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.path = os.path.join(directory, DRILL_INDEX_FILE)
+        self.sources = {}  # source key -> {'stamp': [...], 'words': {word: count}}
+        self.all_words = None
+        self.by_ngram = {}
+
+    def load(self):
+        """Read the cached per-source counts, starting empty if there are none."""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != DRILL_INDEX_VERSION:
+                raise ValueError(f"unsupported version {data.get('version')}")
+            self.sources = data['sources']
+        except (OSError, ValueError, KeyError, AttributeError) as e:
+            if os.path.exists(self.path):
+                print(f"Warning: Could not read drill index: {e}")
+
+    def save(self):
+        """
+        Write the per-source counts atomically.
+
+        The temporary file is unique, so concurrent saves (another running
+        instance) never write into the same file.
+
+        Raises:
+            OSError: If the file could not be written
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        # One dumps() call uses the C encoder; dump() streams through the Python one
+        data = json.dumps({'version': DRILL_INDEX_VERSION, 'sources': self.sources})
+        fd, tmp_path = tempfile.mkstemp(prefix=DRILL_INDEX_FILE + '.', suffix='.tmp',
+                                        dir=self.directory)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(data)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def update(self, sources):
+        """
+        Bring the index in line with the current lesson sources.
+
+        Args:
+            sources: Iterable of (key, stamp, read_texts) where stamp is a
+                JSON-serializable list that changes whenever the source does
+                and read_texts() returns the source's lesson texts
+
+        Returns:
+            bool: True if any source was added, re-read or dropped
+        """
+        changed = False
+        current = {}
+        for key, stamp, read_texts in sources:
+            entry = self.sources.get(key)
+            if entry is None or entry['stamp'] != stamp:
+                try:
+                    entry = {'stamp': stamp, 'words': count_words(read_texts())}
+                except OSError as e:
+                    print(f"Warning: Could not index {key}: {e}")
+                    continue
+                changed = True
+            current[key] = entry
+
+        if changed or current.keys() != self.sources.keys():
+            self.sources = current
+            self._derive()
+            return True
+        if self.all_words is None:
+            self._derive()
+        return False
+
+    def _derive(self):
+        """Merge source counts and build the per-character and per-bigram lookups."""
+        totals = {}
+        for entry in self.sources.values():
+            for word, count in entry['words'].items():
+                totals[word] = totals.get(word, 0) + count
+
+        weighted = sorted(totals.items())
+        self.all_words = _WeightedChoice(weighted) if weighted else None
+
+        members = {}
+        for word, count in weighted:
+            grams = set(word)
+            grams.update(word[i:i + 2] for i in range(len(word) - 1))
+            for gram in grams:
+                members.setdefault(gram, []).append((word, count))
+        self.by_ngram = {gram: _WeightedChoice(words) for gram, words in members.items()}
+
+    def words_with(self, ngram):
+        """Weighted words containing a character or bigram, or None."""
+        return self.by_ngram.get(ngram)
+
+
+def generate_drill(index, focus, length=DRILL_CHARS, rng=random):
+    """
+    Build practice text weighted toward the given keys and bigrams.
+
+    Args:
+        index: NgramIndex that has been updated
+        focus: Dict of character or bigram -> weight (empty for a plain drill)
+        length: Approximate number of characters
+        rng: Random source
+
+    Returns:
+        str: Drill text in lines of about DRILL_LINE_CHARS characters
+
+    Raises:
+        ValueError: If the index holds no words
+    """
+    if index.all_words is None:
+        raise ValueError("No lesson text available to build a drill")
+
+    targets = [(index.words_with(gram), weight) for gram, weight in focus.items()
+               if weight > 0 and index.words_with(gram) is not None]
+    pools = _WeightedChoice(targets) if targets else None
+
+    lines = []
+    line = []
+    line_chars = 0
+    total = 0
+    while total < length:
+        if pools is not None and rng.random() < FOCUS_SHARE:
+            word = pools.draw(rng).draw(rng)
+        else:
+            word = index.all_words.draw(rng)
+        if line and line_chars + 1 + len(word) > DRILL_LINE_CHARS:
+            lines.append(' '.join(line))
+            line = []
+            line_chars = 0
+        line.append(word)
+        line_chars += len(word) + (1 if line_chars else 0)
+        total += len(word) + 1
+    if line:
+        lines.append(' '.join(line))
+    return '\n'.join(lines)
@@ -0,0 +1,215 @@
+"""
+Ghost races: replay recorded runs of a lesson alongside the typist.
+
+A run is stored as a compact timestamp index: for every character of the
+lesson, the milliseconds from the run's first keystroke until that
+character was typed correctly (a uint32 array, 4 bytes per character). The
+index is sorted by construction, so a ghost's position at any moment is one
+bisect over it. Each frame costs O(log n) per ghost, so racing the top five
+adds only a handful of bisects per frame.
+
+Runs are kept per lesson (keyed by a hash of its text), best WPM first, up
+to MAX_GHOSTS, in one small JSON file per lesson with the index base64-encoded.
+"""
+import base64
+import bisect
+import hashlib
+import json
+import os
+import sys
+import time
+from array import array
+
+GHOSTS_DIR = 'ghosts'
+GHOST_VERSION = 1
+MAX_GHOSTS = 5
+
+NS_PER_MS = 1_000_000
+
+
+def lesson_key(text):
+    """Stable identifier of a lesson's text."""
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+class GhostRun:
+    """One recorded run: per-character completion times plus its result."""
+
+    def __init__(self, times_ms, wpm, accuracy, name='You', recorded_at=None):
+        self.times_ms = times_ms  # array('I'), non-decreasing
+        self.wpm = wpm
+        self.accuracy = accuracy
+        self.name = name
+        self.recorded_at = time.time() if recorded_at is None else recorded_at
+
+    @classmethod
+    def from_engine(cls, engine, name='You'):
+        """
+        Build a run from a finished TypingEngine.
+
+        Returns:
+            GhostRun: The run, or None if the engine never started
+        """
+        if engine.start_ns is None:
+            return None
+        view = engine.keystrokes.view()
+        start_ns = engine.start_ns
+        times_ms = array('I', ((timestamp - start_ns) // NS_PER_MS
+                               for timestamp, correct in zip(view.timestamps, view.correct)
+                               if correct))
+        return cls(times_ms, engine.calculate_wpm(), engine.calculate_accuracy(), name)
+
+    def __len__(self):
+        return len(self.times_ms)
+
+    def position_at(self, elapsed_ms, lo=0):
+        """
+        Characters the ghost had typed after elapsed_ms.
+
+        Args:
+            elapsed_ms: Milliseconds since the race started
+            lo: A position known to be at or before the answer (narrows the search)
+
+        Returns:
+            int: Text position of the ghost's cursor
+        """
+        return bisect.bisect_right(self.times_ms, elapsed_ms, lo)
+
+    def duration_ms(self):
+        """Time the run took to finish the lesson."""
+        return self.times_ms[-1] if self.times_ms else 0
+
+    def to_dict(self):
+        """JSON-serializable form (the index as little-endian base64)."""
+        times = array('I', self.times_ms)
+        if sys.byteorder != 'little':
+            times.byteswap()
+        return {'name': self.name, 'wpm': self.wpm, 'accuracy': self.accuracy,
+                'recorded_at': self.recorded_at,
+                'times': base64.b64encode(times.tobytes()).decode('ascii')}
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Rebuild a run saved with to_dict().
+
+        Raises:
+            ValueError: If the index is corrupt
+        """
+        times = array('I')
+        times.frombytes(base64.b64decode(data['times']))
+        if sys.byteorder != 'little':
+            times.byteswap()
+        if any(times[i] > times[i + 1] for i in range(len(times) - 1)):
+            raise ValueError("ghost times are not sorted")
+        return cls(times, data['wpm'], data['accuracy'], data.get('name', 'You'),
+                   data.get('recorded_at'))
+
+
+class GhostRace:
+    """Positions of several ghosts, advanced frame by frame."""
+
+    def __init__(self, runs):
+        self.runs = list(runs)
+        self.positions = [0] * len(self.runs)
+        self._elapsed_ms = 0
+
+    def update(self, elapsed_ms):
+        """
+        Move every ghost to where it was after elapsed_ms.
+
+        Time normally only moves forward, so each search starts at the
+        ghost's previous position.
+
+        Returns:
+            bool: True if any ghost moved
+        """
+        if elapsed_ms < self._elapsed_ms:
+            self.positions = [0] * len(self.runs)
+        self._elapsed_ms = elapsed_ms
+        moved = False
+        positions = self.positions
+        for index, run in enumerate(self.runs):
+            position = run.position_at(elapsed_ms, positions[index])
+            if position != positions[index]:
+                positions[index] = position
+                moved = True
+        return moved
+
+    def reset(self):
+        """Put every ghost back at the start."""
+        self.positions = [0] * len(self.runs)
+        self._elapsed_ms = 0
+
+    def place(self, position):
+        """
+        Rank of a typist at a position among the ghosts.
+
+        Returns:
+            int: 1 if ahead of (or level with) every ghost
+        """
+        return 1 + sum(1 for ghost in self.positions if ghost > position)
+
+
+class GhostStore:
+    """The best recorded runs of each lesson, one JSON file per lesson."""
+
+    def __init__(self, directory, max_ghosts=MAX_GHOSTS):
+        self.directory = directory
+        self.max_ghosts = max_ghosts
+
+    def _path(self, text):
+        return os.path.join(self.directory, lesson_key(text) + '.json')
+
+    def load(self, text):
+        """
+        Saved runs of a lesson, fastest first.
+
+        Returns:
+            list: GhostRun objects (empty if the lesson has none)
+        """
+        path = self._path(text)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != GHOST_VERSION:
+                raise ValueError(f"unsupported version {data.get('version')}")
+            runs = [GhostRun.from_dict(run) for run in data['runs']]
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            if os.path.exists(path):
+                print(f"Warning: Could not read ghosts: {e}")
+            return []
+        # Only runs that cover the whole text can race it
+        return [run for run in runs if len(run) == len(text)]
+
+    def add(self, text, run):
+        """
+        Keep a finished run if it is among the lesson's fastest.
+
+        Args:
+            text: Lesson text the run was typed against
+            run: GhostRun covering the whole text
+
+        Returns:
+            int: The run's rank (1 = new best), or 0 if it wasn't kept
+
+        Raises:
+            OSError: If the file could not be written
+        """
+        if len(run) != len(text):
+            return 0
+        runs = self.load(text)
+        runs.append(run)
+        runs.sort(key=lambda ghost: ghost.wpm, reverse=True)
+        del runs[self.max_ghosts:]
+        if run not in runs:
+            return 0
+
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(text)
+        tmp_path = path + '.tmp'
+        data = json.dumps({'version': GHOST_VERSION, 'runs': [ghost.to_dict() for ghost in runs]})
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        return runs.index(run) + 1
@@ -0,0 +1,328 @@
+"""
+Per-key and per-bigram latency and error analytics.
+
+A session is reduced in a single pass over its KeystrokeLog columns. For
+every expected character (and every pair of consecutive expected characters)
+the pass adds up keystrokes, errors and the latency of clean transitions:
+the time from the previous correct keystroke to this one, counted only when
+no mistake was made in between. All of these are plain sums, so the totals
+across every session ever typed are maintained incrementally (one merge per
+session, O(distinct keys + bigrams)) and queries never rescan history.
+"""
+import json
+import math
+import os
+
+ANALYTICS_FILE = 'key_stats.json'
+ANALYTICS_VERSION = 1
+
+# Fewer clean transitions than this and a mean latency is too noisy to show
+MIN_SAMPLES = 5
+
+# Layout of each aggregate record
+KEYSTROKES = 0
+ERRORS = 1
+SAMPLES = 2
+LATENCY_SUM = 3     # milliseconds
+LATENCY_SQ_SUM = 4  # milliseconds squared
+
+# Each percentage point of errors counts as this many percent of extra latency
+ERROR_WEIGHT = 10
+
+METRIC_LATENCY = 'latency'
+METRIC_ERRORS = 'errors'
+
+
+def _new_record():
+    return [0, 0, 0, 0.0, 0.0]
+
+
+def _add(table, item, correct, latency_ms):
+    """Count one keystroke against an item's aggregate record."""
+    record = table.get(item)
+    if record is None:
+        record = table[item] = _new_record()
+    record[KEYSTROKES] += 1
+    if not correct:
+        record[ERRORS] += 1
+    elif latency_ms is not None:
+        record[SAMPLES] += 1
+        record[LATENCY_SUM] += latency_ms
+        record[LATENCY_SQ_SUM] += latency_ms * latency_ms
+
+
+def analyze_session(text, log, offset=0):
+    """
+    Reduce one session's keystrokes to per-key and per-bigram aggregates.
+
+    Args:
+        text: Text the session was typed against
+        log: The session's KeystrokeLog
+        offset: Position of text[0] (when text is a window of a longer stream)
+
+    Returns:
+        tuple: (keys, bigrams) dicts mapping a character or two-character
+        string to its aggregate record
+    """
+    view = log.view()
+    keys = {}
+    bigrams = {}
+    last_correct_ns = None
+    clean = True
+
+    for timestamp, position, correct in zip(view.timestamps, view.positions, view.correct):
+        char = text[position - offset]
+        latency_ms = None
+        if correct:
+            if clean and last_correct_ns is not None:
+                latency_ms = (timestamp - last_correct_ns) / 1e6
+            last_correct_ns = timestamp
+            clean = True
+        else:
+            clean = False
+
+        _add(keys, char, correct, latency_ms)
+        if position > offset:
+            _add(bigrams, text[position - offset - 1:position - offset + 1], correct, latency_ms)
+
+    return keys, bigrams
+
+
+def merge_into(totals, table):
+    """
+    Add one table of aggregate records into another.
+
+    Args:
+        totals: Table updated in place
+        table: Records to add
+    """
+    for item, record in table.items():
+        total = totals.get(item)
+        if total is None:
+            totals[item] = list(record)
+        else:
+            for field, value in enumerate(record):
+                total[field] += value
+
+
+def summarize(record):
+    """
+    Turn an aggregate record into readable figures.
+
+    Returns:
+        dict: keystrokes, errors, error_rate, samples, mean_ms and stdev_ms
+        (the latency figures are None without samples)
+    """
+    keystrokes, errors, samples, total, sq_total = record
+    summary = {
+        'keystrokes': keystrokes,
+        'errors': errors,
+        'error_rate': errors / keystrokes if keystrokes else 0.0,
+        'samples': samples,
+        'mean_ms': None,
+        'stdev_ms': None,
+    }
+    if samples:
+        mean = total / samples
+        summary['mean_ms'] = mean
+        summary['stdev_ms'] = math.sqrt(max(0.0, sq_total / samples - mean * mean))
+    return summary
+
+
+class KeyAnalytics:
+    """Lifetime per-key and per-bigram totals, saved as one JSON file."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.path = os.path.join(directory, ANALYTICS_FILE)
+        self.sessions = 0
+        self.keys = {}
+        self.bigrams = {}
+        # Until the saved totals are in, these hold only what was added since
+        self.loaded = False
+
+    def read(self):
+        """
+        Read the saved totals without touching these ones.
+
+        Only the file is touched, so this may run on a worker thread.
+
+        Returns:
+            tuple: (sessions, keys, bigrams), empty if nothing could be read
+        """
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != ANALYTICS_VERSION:
+                raise ValueError(f"unsupported version {data.get('version')}")
+            return data['sessions'], data['keys'], data['bigrams']
+        except (OSError, ValueError, KeyError, AttributeError) as e:
+            if os.path.exists(self.path):
+                print(f"Warning: Could not read key statistics: {e}")
+            return 0, {}, {}
+
+    def set_totals(self, totals):
+        """
+        Take over totals returned by read().
+
+        Sessions added while they were being read are merged into them.
+
+        Args:
+            totals: (sessions, keys, bigrams)
+        """
+        sessions, keys, bigrams = totals
+        merge_into(keys, self.keys)
+        merge_into(bigrams, self.bigrams)
+        self.sessions += sessions
+        self.keys = keys
+        self.bigrams = bigrams
+        self.loaded = True
+
+    def load(self):
+        """Read the saved totals on this thread, starting empty if there are none."""
+        self.set_totals(self.read())
+
+    def snapshot(self):
+        """
+        Serialize the totals for save().
+
+        Returns:
+            str: JSON text
+        """
+        return json.dumps({'version': ANALYTICS_VERSION, 'sessions': self.sessions,
+                           'keys': self.keys, 'bigrams': self.bigrams})
+
+    def save(self, data=None):
+        """
+        Write the totals atomically.
+
+        Args:
+            data: A snapshot() taken earlier (lets the write run on another
+                thread while the totals keep changing); taken now if omitted
+
+        Raises:
+            OSError: If the file could not be written
+        """
+        if data is None:
+            data = self.snapshot()
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(data)
+        os.replace(tmp_path, self.path)
+
+    def add_session(self, text, log, offset=0):
+        """
+        Fold a finished session into the totals.
+
+        Args:
+            text: Text the session was typed against
+            log: The session's KeystrokeLog
+            offset: Position of text[0] (when text is a window of a longer stream)
+        """
+        self.add_keystrokes(text, log, offset)
+        self.sessions += 1
+
+    def add_keystrokes(self, text, log, offset=0):
+        """
+        Fold part of a session into the totals without counting a session.
+
+        Args:
+            text: Text the keystrokes were typed against
+            log: KeystrokeLog holding them
+            offset: Position of text[0]
+        """
+        keys, bigrams = analyze_session(text, log, offset)
+        merge_into(self.keys, keys)
+        merge_into(self.bigrams, bigrams)
+
+    def key_summary(self, char):
+        """Summary figures for one expected character, or None if never typed."""
+        record = self.keys.get(char)
+        return summarize(record) if record else None
+
+    def bigram_summary(self, bigram):
+        """Summary figures for one two-character transition, or None if never typed."""
+        record = self.bigrams.get(bigram)
+        return summarize(record) if record else None
+
+    def slowest_bigrams(self, count=5, min_samples=MIN_SAMPLES):
+        """
+        Find the transitions with the highest mean latency.
+
+        Args:
+            count: Number of bigrams to return
+            min_samples: Clean transitions required for a bigram to qualify
+
+        Returns:
+            list: (bigram, mean_ms) tuples, slowest first
+        """
+        means = [(bigram, record[LATENCY_SUM] / record[SAMPLES])
+                 for bigram, record in self.bigrams.items()
+                 if record[SAMPLES] >= min_samples]
+        means.sort(key=lambda item: item[1], reverse=True)
+        return means[:count]
+
+    def weakest(self, count=6, min_samples=MIN_SAMPLES):
+        """
+        Pick the weakest keys and bigrams for a drill to focus on.
+
+        Weakness is the mean clean latency inflated by the error rate.
+        Whitespace is left out since drills are built from whole words.
+
+        Args:
+            count: Number of characters and, separately, of bigrams to return
+            min_samples: Clean transitions required for an item to qualify
+
+        Returns:
+            dict: Character or bigram -> weakness score (higher is weaker)
+        """
+        weakest = {}
+        for table in (self.keys, self.bigrams):
+            scores = []
+            for item, record in table.items():
+                if record[SAMPLES] < min_samples or any(c.isspace() for c in item):
+                    continue
+                mean = record[LATENCY_SUM] / record[SAMPLES]
+                error_rate = record[ERRORS] / record[KEYSTROKES]
+                scores.append((mean * (1 + ERROR_WEIGHT * error_rate), item))
+            scores.sort(reverse=True)
+            weakest.update((item, score) for score, item in scores[:count])
+        return weakest
+
+    def key_heat(self, keyboard_layout, metric=METRIC_LATENCY, min_samples=MIN_SAMPLES):
+        """
+        Score each physical key from 0 (best) to 1 (worst).
+
+        Characters sharing a key (such as 'a' and 'A') are combined.
+
+        Args:
+            keyboard_layout: KeyboardLayout used to map characters to keys
+            metric: METRIC_LATENCY (mean clean latency) or METRIC_ERRORS (error rate)
+            min_samples: Keystrokes (or clean transitions) required to score a key
+
+        Returns:
+            dict: Key code -> heat in [0, 1]
+        """
+        per_key = {}
+        for char, record in self.keys.items():
+            info = keyboard_layout.lookup(char)
+            if info is not None:
+                merge_into(per_key, {info.code: record})
+
+        values = {}
+        for code, record in per_key.items():
+            if metric == METRIC_ERRORS:
+                if record[KEYSTROKES] >= min_samples:
+                    values[code] = record[ERRORS] / record[KEYSTROKES]
+            elif record[SAMPLES] >= min_samples:
+                values[code] = record[LATENCY_SUM] / record[SAMPLES]
+
+        if not values:
+            return {}
+        low = min(values.values())
+        high = max(values.values())
+        spread = high - low
+        if spread <= 0:
+            return {code: 0.0 for code in values}
+        return {code: (value - low) / spread for code, value in values.items()}
@@ -0,0 +1,149 @@
+"""
+Compiled character-to-key index built from a keyboard layout definition.
+"""
+import json
+import os
+from collections import namedtuple
+
+
+# Result of a character lookup: physical key code, whether Shift is needed
+# and which finger presses the key in standard touch typing
+KeyInfo = namedtuple('KeyInfo', ['code', 'shift', 'finger'])
+
+# Keys whose label names the key instead of showing the character it types
+NAMED_KEY_CHARS = {'Space': ' ', 'Enter': '\n', 'Tab': '\t'}
+
+# Finger assignment per physical key code. Codes identify key positions,
+# not legends, so this holds for any layout that uses standard codes; a key
+# can still override it with a "finger" entry in the layout JSON.
+_FINGER_COLUMNS = {
+    'left_pinky': 'Backquote Digit1 KeyQ KeyA KeyZ Tab CapsLock ShiftLeft',
+    'left_ring': 'Digit2 KeyW KeyS KeyX',
+    'left_middle': 'Digit3 KeyE KeyD KeyC',
+    'left_index': 'Digit4 Digit5 KeyR KeyT KeyF KeyG KeyV KeyB',
+    'right_index': 'Digit6 Digit7 KeyY KeyU KeyH KeyJ KeyN KeyM',
+    'right_middle': 'Digit8 KeyI KeyK Comma',
+    'right_ring': 'Digit9 KeyO KeyL Period',
+    'right_pinky': ('Digit0 Minus Equal KeyP BracketLeft BracketRight Backslash '
+                    'Semicolon Quote Slash Enter ShiftRight Backspace'),
+    'thumb': 'Space',
+}
+DEFAULT_FINGERS = {code: finger
+                   for finger, codes in _FINGER_COLUMNS.items()
+                   for code in codes.split()}
+
+# Key positions in widget pixels: keys is a tuple of (key dict, (x, y, w, h))
+LayoutGeometry = namedtuple('LayoutGeometry', ['keys', 'width', 'height'])
+
+# Compiled layouts keyed by file path, tagged with the file's (mtime, size)
+_layout_cache = {}
+
+
+class KeyboardLayout:
+    """Character lookup table compiled once from a layout's key entries."""
+
+    def __init__(self, layout_data):
+        self.layout_data = layout_data
+        self.char_index = self._compile(layout_data)
+        self.geometry = self._compute_geometry(layout_data)
+
+    @staticmethod
+    def _compile(layout_data):
+        """
+        Build the char -> KeyInfo table from label/shift_label/code entries.
+
+        Args:
+            layout_data: Parsed keyboard_layout.json dictionary
+
+        Returns:
+            dict: Mapping of typed character to KeyInfo
+        """
+        index = {}
+        for row in layout_data.get('rows', []):
+            for key in row['keys']:
+                code = key['code']
+                finger = key.get('finger', DEFAULT_FINGERS.get(code))
+                label = key.get('label', '')
+
+                if code in NAMED_KEY_CHARS:
+                    index.setdefault(NAMED_KEY_CHARS[code], KeyInfo(code, False, finger))
+                elif len(label) == 1:
+                    if label.isalpha():
+                        # Letter keys are labelled with the capital only
+                        index.setdefault(label.lower(), KeyInfo(code, False, finger))
+                        index.setdefault(label.upper(), KeyInfo(code, True, finger))
+                    else:
+                        index.setdefault(label, KeyInfo(code, False, finger))
+
+                shift_label = key.get('shift_label')
+                if shift_label:
+                    index.setdefault(shift_label, KeyInfo(code, True, finger))
+        return index
+
+    @staticmethod
+    def _compute_geometry(layout_data):
+        """
+        Place every key in widget pixels.
+
+        Args:
+            layout_data: Parsed keyboard_layout.json dictionary
+
+        Returns:
+            LayoutGeometry: Key rectangles and the overall keyboard size
+        """
+        key_size = layout_data['key_size']
+        spacing = layout_data['spacing']
+        pitch = key_size + spacing
+
+        max_width = 0
+        max_height = 0
+        keys = []
+        for row in layout_data.get('rows', []):
+            row_y = row['y']
+            for key in row['keys']:
+                max_width = max(max_width, (key['x'] + key['width']) * pitch)
+                x = key['x'] * pitch + spacing
+                y = row_y * pitch + spacing
+                width = key['width'] * key_size + (key['width'] - 1) * spacing
+                keys.append((key, (x, y, width, key_size)))
+            max_height = max(max_height, (row_y + 1) * pitch)
+
+        return LayoutGeometry(tuple(keys), int(max_width + spacing), int(max_height + spacing))
+
+    def lookup(self, char):
+        """
+        Resolve a character to its key.
+
+        Args:
+            char: Character to look up
+
+        Returns:
+            KeyInfo: Key code, shift requirement and finger, or None
+        """
+        return self.char_index.get(char)
+
+
+def load_layout(path):
+    """
+    Load and compile a layout file, reusing the result while the file is unchanged.
+
+    Args:
+        path: Path to a keyboard layout JSON file
+
+    Returns:
+        KeyboardLayout: Compiled layout (shared; treat as read-only)
+
+    Raises:
+        OSError: If the file can't be read
+        ValueError: If the file isn't valid JSON
+    """
+    stat = os.stat(path)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    cached = _layout_cache.get(path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    with open(path, 'r') as f:
+        layout = KeyboardLayout(json.load(f))
+    _layout_cache[path] = (stamp, layout)
+    return layout
@@ -1,37 +1,85 @@
 """
 Custom keyboard visualization widget with vintage Compaq aesthetic.
 """
-import json
+import math
 from PySide6.QtWidgets import QWidget
-from PySide6.QtCore import Qt, QRectF
-from PySide6.QtGui import QPainter, QColor, QPen, QFont, QBrush
+from PySide6.QtCore import Qt, QRectF, QPointF, QSize, QEvent
+from PySide6.QtGui import QPainter, QColor, QPen, QFont, QBrush, QPixmap
 from level_manager import get_resource_path
+from keyboard_layout import KeyboardLayout, load_layout
+from latency_trace import KEYBOARD_PAINT
+
+SHIFT_KEYS = ('ShiftLeft', 'ShiftRight')
+
+# Border pen is 2px wide and centred on the key outline
+KEY_MARGIN = 1
+
+# Heatmap overlay colour and its opacity range (alpha at heat 0 and heat 1)
+HEATMAP_RGB = (220, 40, 30)
+HEATMAP_ALPHA = (0, 170)
+
+# Outline marking the keys ghost runners are about to press
+GHOST_COLOR = "#FF9800"
+GHOST_PEN_WIDTH = 3
 
 
 class KeyboardWidget(QWidget):
     """Custom widget for rendering vintage keyboard with real-time highlighting."""
 
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, cached_rendering=True, deferred=False):
         super().__init__(parent)
-        self.layout_data = self._load_layout()
-        self.current_key = None
-        self.next_key = None
-        self.shift_pressed = False
 
-        # Calculate widget size
-        self._calculate_size()
+        # Pre-rendered (origin, pixmap) pairs keyed by (key index, highlighted)
+        self.cached_rendering = cached_rendering
+        self._pixmap_cache = {}
+        self._cache_dpr = None
 
-        self.setMinimumHeight(self.widget_height)
+        # Key code -> heat in [0, 1], drawn over unhighlighted keys
+        self.heatmap = {}
+
+        # Codes of the keys ghost runners are on (drawn as outlines)
+        self.ghost_keys = set()
+
+        # Optional LatencyTracer timing each paint
+        self.latency_tracer = None
+
+        # Characters passed to set_current_char(), kept for a layout change
+        self._current_chars = ('', '')
 
-    def _load_layout(self):
-        """Load keyboard layout from JSON file."""
+        # Only the dirty key rects are repainted; nothing underneath to clear
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+
+        # A deferred widget starts empty until load_default_layout() is called
+        if deferred:
+            self._apply_layout(KeyboardLayout(self._get_default_layout()))
+        else:
+            self._apply_layout(self.read_default_layout())
+
+    def read_default_layout(self):
+        """
+        Load the compiled keyboard layout for the bundled JSON file.
+
+        No widget state is touched, so this may run on a worker thread.
+
+        Returns:
+            KeyboardLayout: The bundled layout (a minimal one if it can't be read)
+        """
         layout_path = get_resource_path('data/keyboard_layout.json')
         try:
-            with open(layout_path, 'r') as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError) as e:
+            return load_layout(layout_path)
+        except (OSError, ValueError) as e:
             print(f"Error loading keyboard layout: {e}")
-            return self._get_default_layout()
+            return KeyboardLayout(self._get_default_layout())
+
+    def load_default_layout(self, keyboard_layout=None):
+        """
+        Load the bundled keyboard layout (used after a deferred start).
+
+        Args:
+            keyboard_layout: read_default_layout() result if it was read
+                elsewhere (e.g. on a worker thread); read now if omitted
+        """
+        self._apply_layout(keyboard_layout or self.read_default_layout())
 
     def _get_default_layout(self):
         """Return a minimal default layout if file not found."""
@@ -49,159 +97,279 @@ class KeyboardWidget(QWidget):
         }
 
     def _calculate_size(self):
-        """Calculate required widget dimensions."""
-        key_size = self.layout_data['key_size']
-        spacing = self.layout_data['spacing']
-
-        max_width = 0
-        max_height = 0
+        """Build key rectangles from the layout's precomputed geometry."""
+        geometry = self.keyboard_layout.geometry
+        self.key_rects = []
+        self.key_rects_by_code = {}
+        for key, box in geometry.keys:
+            rect = QRectF(*box)
+            self.key_rects.append((key, rect))
+            self.key_rects_by_code[key['code']] = rect
+
+        self.widget_width = geometry.width
+        self.widget_height = geometry.height
+
+    def _create_paint_resources(self):
+        """Build the colors, pens, brushes and fonts shared by every key."""
+        colors = self.layout_data['colors']
+        self._background_color = QColor("#2C2C2C")
+        self._base_brush = QBrush(QColor(colors['base']))
+        self._current_brush = QBrush(QColor(colors['current']))
+        self._border_pen = QPen(QColor(colors['border']), 2)
+        self._text_pen = QPen(QColor(colors['text']))
+        self._label_font = QFont("Arial", 10, QFont.Bold)
+        self._shift_font = QFont("Arial", 8)
+        self._ghost_pen = QPen(QColor(GHOST_COLOR), GHOST_PEN_WIDTH)
+        red, green, blue = HEATMAP_RGB
+        self._heat_colors = [QColor(red, green, blue, alpha)
+                             for alpha in range(HEATMAP_ALPHA[0], HEATMAP_ALPHA[1] + 1)]
+
+    def set_layout(self, layout_data):
+        """
+        Switch to a different keyboard layout.
 
-        for row in self.layout_data['rows']:
-            row_y = row['y']
-            for key in row['keys']:
-                key_right = (key['x'] + key['width']) * (key_size + spacing)
-                max_width = max(max_width, key_right)
+        Args:
+            layout_data: Parsed layout dictionary (same schema as keyboard_layout.json)
+        """
+        self._apply_layout(KeyboardLayout(layout_data))
 
-            max_height = max(max_height, (row_y + 1) * (key_size + spacing))
+    def _apply_layout(self, keyboard_layout):
+        """
+        Make a compiled layout current and resize to fit it.
 
-        self.widget_width = int(max_width + spacing)
-        self.widget_height = int(max_height + spacing)
+        Args:
+            keyboard_layout: KeyboardLayout to display
+        """
+        self.keyboard_layout = keyboard_layout
+        self.layout_data = keyboard_layout.layout_data
+        # The highlighted characters may sit on other keys (or none) now
+        self._resolve_current_chars()
+        self._calculate_size()
+        self._create_paint_resources()
+        self.setMinimumHeight(self.widget_height)
+        self.updateGeometry()
+        self.resize(self.sizeHint())
+        self.invalidate_cache()
 
-    def set_current_char(self, char, next_char=''):
+    def set_heatmap(self, heatmap):
         """
-        Set the current character to highlight.
+        Show (or clear) a heatmap layer over the keys.
 
         Args:
-            char: Current character to type
-            next_char: Next character (for preview)
+            heatmap: Dict of key code -> heat in [0, 1]; empty or None clears it
         """
-        self.current_key = self._char_to_key_code(char)
-        self.next_key = self._char_to_key_code(next_char)
-        self.shift_pressed = char.isupper() or char in '~!@#$%^&*()_+{}|:"<>?'
+        self.heatmap = dict(heatmap or {})
         self.update()
 
-    def _char_to_key_code(self, char):
+    def set_ghost_chars(self, chars):
         """
-        Map character to keyboard key code.
+        Outline the keys for the characters ghost runners type next.
 
         Args:
-            char: Character to map
-
-        Returns:
-            str: Key code or None
-        """
-        if not char:
-            return None
-
-        # Character mapping
-        char_map = {
-            # Letters
-            'a': 'KeyA', 'b': 'KeyB', 'c': 'KeyC', 'd': 'KeyD',
-            'e': 'KeyE', 'f': 'KeyF', 'g': 'KeyG', 'h': 'KeyH',
-            'i': 'KeyI', 'j': 'KeyJ', 'k': 'KeyK', 'l': 'KeyL',
-            'm': 'KeyM', 'n': 'KeyN', 'o': 'KeyO', 'p': 'KeyP',
-            'q': 'KeyQ', 'r': 'KeyR', 's': 'KeyS', 't': 'KeyT',
-            'u': 'KeyU', 'v': 'KeyV', 'w': 'KeyW', 'x': 'KeyX',
-            'y': 'KeyY', 'z': 'KeyZ',
-            # Numbers (unshifted)
-            '0': 'Digit0', '1': 'Digit1', '2': 'Digit2', '3': 'Digit3',
-            '4': 'Digit4', '5': 'Digit5', '6': 'Digit6', '7': 'Digit7',
-            '8': 'Digit8', '9': 'Digit9',
-            # Shifted numbers
-            ')': 'Digit0', '!': 'Digit1', '@': 'Digit2', '#': 'Digit3',
-            '$': 'Digit4', '%': 'Digit5', '^': 'Digit6', '&': 'Digit7',
-            '*': 'Digit8', '(': 'Digit9',
-            # Special characters
-            ' ': 'Space', '\n': 'Enter', '\t': 'Tab',
-            '-': 'Minus', '_': 'Minus',
-            '=': 'Equal', '+': 'Equal',
-            '[': 'BracketLeft', '{': 'BracketLeft',
-            ']': 'BracketRight', '}': 'BracketRight',
-            '\\': 'Backslash', '|': 'Backslash',
-            ';': 'Semicolon', ':': 'Semicolon',
-            "'": 'Quote', '"': 'Quote',
-            ',': 'Comma', '<': 'Comma',
-            '.': 'Period', '>': 'Period',
-            '/': 'Slash', '?': 'Slash',
-            '`': 'Backquote', '~': 'Backquote',
-        }
+            chars: Iterable of characters (unmapped ones are ignored)
+        """
+        codes = set()
+        for char in chars:
+            info = self.keyboard_layout.lookup(char)
+            if info is not None:
+                codes.add(info.code)
+        changed = codes ^ self.ghost_keys
+        self.ghost_keys = codes
+        for code in changed:
+            rect = self.key_rects_by_code.get(code)
+            if rect is not None:
+                self.update(self._dirty_rect(rect))
+
+    def invalidate_cache(self):
+        """Drop all pre-rendered key pixmaps and repaint everything."""
+        self._pixmap_cache.clear()
+        self._cache_dpr = None
+        self.update()
 
-        # Handle uppercase letters
-        if char.isupper():
-            return char_map.get(char.lower())
+    def set_current_char(self, char, next_char=''):
+        """
+        Set the current character to highlight.
 
-        return char_map.get(char)
+        Args:
+            char: Current character to type
+            next_char: Next character (for preview)
+        """
+        old_codes = self._highlighted_codes()
+        self._current_chars = (char, next_char)
+        self._resolve_current_chars()
+
+        # Repaint only the keys whose highlight changed
+        for code in old_codes ^ self._highlighted_codes():
+            rect = self.key_rects_by_code.get(code)
+            if rect is not None:
+                self.update(self._dirty_rect(rect))
+
+    def _resolve_current_chars(self):
+        """Look up the keys of the current and next characters."""
+        char, next_char = self._current_chars
+        current = self.keyboard_layout.lookup(char)
+        upcoming = self.keyboard_layout.lookup(next_char)
+        self.current_key = current.code if current else None
+        self.next_key = upcoming.code if upcoming else None
+        self.shift_pressed = current.shift if current else False
+
+    def _highlighted_codes(self):
+        """Return the set of key codes currently drawn highlighted."""
+        codes = set()
+        if self.current_key:
+            codes.add(self.current_key)
+        if self.shift_pressed:
+            codes.update(SHIFT_KEYS)
+        return codes
+
+    def _dirty_rect(self, rect):
+        """Widget-space rect covering a key including its border."""
+        return rect.adjusted(-KEY_MARGIN, -KEY_MARGIN, KEY_MARGIN, KEY_MARGIN).toAlignedRect()
 
     def paintEvent(self, event):
-        """Paint the keyboard."""
+        """Paint the keys intersecting the dirty region."""
+        tracer = self.latency_tracer
+        if tracer is not None:
+            start = tracer.now()
         painter = QPainter(self)
-        painter.setRenderHint(QPainter.Antialiasing)
+        dirty = QRectF(event.rect())
 
         # Draw background
-        painter.fillRect(self.rect(), QColor("#2C2C2C"))
+        painter.fillRect(event.rect(), self._background_color)
 
-        # Get layout settings
-        key_size = self.layout_data['key_size']
-        spacing = self.layout_data['spacing']
-        colors = self.layout_data['colors']
+        if self.cached_rendering:
+            dpr = self.devicePixelRatioF()
+            if dpr != self._cache_dpr:
+                self._pixmap_cache.clear()
+                self._cache_dpr = dpr
+        else:
+            painter.setRenderHint(QPainter.Antialiasing)
+
+        highlighted = self._highlighted_codes()
+        for index, (key, rect) in enumerate(self.key_rects):
+            if not dirty.intersects(rect.adjusted(-KEY_MARGIN, -KEY_MARGIN, KEY_MARGIN, KEY_MARGIN)):
+                continue
+            is_highlighted = key['code'] in highlighted
+            if self.cached_rendering:
+                origin, pixmap = self._key_pixmap(index, is_highlighted)
+                painter.drawPixmap(origin, pixmap)
+            else:
+                self._draw_key(painter, key, rect, is_highlighted)
+
+            # The heat layer is not cached; the key to press stays unobscured
+            heat = self.heatmap.get(key['code'])
+            if heat and not is_highlighted:
+                self._draw_heat(painter, rect, heat)
+
+            if key['code'] in self.ghost_keys:
+                self._draw_ghost(painter, rect)
+
+        if tracer is not None:
+            painter.end()
+            tracer.span(KEYBOARD_PAINT, start)
+
+    def _key_pixmap(self, index, highlighted):
+        """
+        Get (rendering on first use) the cached pixmap for a key state.
 
-        # Draw keys
-        for row in self.layout_data['rows']:
-            row_y = row['y']
-            for key in row['keys']:
-                self._draw_key(painter, key, row_y, key_size, spacing, colors)
+        Pixmaps are anchored on whole pixels so blitting them reproduces
+        direct painting exactly, even for keys at fractional offsets.
+
+        Args:
+            index: Index into key_rects
+            highlighted: Whether to render the highlighted state
 
-    def _draw_key(self, painter, key, row_y, key_size, spacing, colors):
+        Returns:
+            tuple: (QPointF widget-space origin, QPixmap)
+        """
+        cache_key = (index, highlighted)
+        entry = self._pixmap_cache.get(cache_key)
+        if entry is None:
+            key, rect = self.key_rects[index]
+            dpr = self._cache_dpr or self.devicePixelRatioF()
+            origin = QPointF(math.floor(rect.x() - KEY_MARGIN), math.floor(rect.y() - KEY_MARGIN))
+            width = math.ceil(rect.right() + KEY_MARGIN) - origin.x()
+            height = math.ceil(rect.bottom() + KEY_MARGIN) - origin.y()
+
+            pixmap = QPixmap(math.ceil(width * dpr), math.ceil(height * dpr))
+            pixmap.setDevicePixelRatio(dpr)
+            pixmap.fill(self._background_color)
+
+            painter = QPainter(pixmap)
+            painter.setRenderHint(QPainter.Antialiasing)
+            self._draw_key(painter, key, rect.translated(-origin), highlighted)
+            painter.end()
+
+            entry = (origin, pixmap)
+            self._pixmap_cache[cache_key] = entry
+        return entry
+
+    def _draw_key(self, painter, key, rect, highlighted):
         """
         Draw a single key.
 
         Args:
             painter: QPainter instance
             key: Key data dictionary
-            row_y: Row index
-            key_size: Size of standard key
-            spacing: Spacing between keys
-            colors: Color scheme
-        """
-        # Calculate position and size
-        x = key['x'] * (key_size + spacing) + spacing
-        y = row_y * (key_size + spacing) + spacing
-        width = key['width'] * key_size + (key['width'] - 1) * spacing
-        height = key_size
-
-        # Determine key color
-        key_code = key['code']
-        if key_code == self.current_key:
-            bg_color = QColor(colors['current'])
-        elif key_code in ['ShiftLeft', 'ShiftRight'] and self.shift_pressed:
-            bg_color = QColor(colors['current'])  # Highlight shift when needed
-        else:
-            bg_color = QColor(colors['base'])
-
+            rect: Key rectangle in painter coordinates
+            highlighted: Whether the key is the one to press next
+        """
         # Draw key background with rounded corners
-        painter.setBrush(QBrush(bg_color))
-        painter.setPen(QPen(QColor(colors['border']), 2))
-
-        rect = QRectF(x, y, width, height)
+        painter.setBrush(self._current_brush if highlighted else self._base_brush)
+        painter.setPen(self._border_pen)
         painter.drawRoundedRect(rect, 6, 6)
 
-        # Draw key label
-        painter.setPen(QColor(colors['text']))
-        font = QFont("Arial", 10, QFont.Bold)
-        painter.setFont(font)
-
         # Draw main label
-        label = key['label']
-        painter.drawText(rect, Qt.AlignCenter, label)
+        painter.setPen(self._text_pen)
+        painter.setFont(self._label_font)
+        painter.drawText(rect, Qt.AlignCenter, key['label'])
 
         # Draw shift label if exists (smaller, in top-right)
         if 'shift_label' in key:
-            small_font = QFont("Arial", 8)
-            painter.setFont(small_font)
-            shift_rect = QRectF(x + width * 0.6, y + 5, width * 0.35, height * 0.3)
+            painter.setFont(self._shift_font)
+            shift_rect = QRectF(rect.x() + rect.width() * 0.6, rect.y() + 5,
+                                rect.width() * 0.35, rect.height() * 0.3)
             painter.drawText(shift_rect, Qt.AlignCenter, key['shift_label'])
 
+    def _draw_heat(self, painter, rect, heat):
+        """
+        Tint a key by its heat.
+
+        Args:
+            painter: QPainter instance
+            rect: Key rectangle in painter coordinates
+            heat: Value in [0, 1]
+        """
+        color = self._heat_colors[round(min(max(heat, 0.0), 1.0) * (len(self._heat_colors) - 1))]
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(color)
+        painter.drawRoundedRect(rect, 6, 6)
+        painter.restore()
+
+    def _draw_ghost(self, painter, rect):
+        """Outline a key a ghost runner is on."""
+        inset = GHOST_PEN_WIDTH / 2 + KEY_MARGIN
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setPen(self._ghost_pen)
+        painter.setBrush(Qt.NoBrush)
+        painter.drawRoundedRect(rect.adjusted(inset, inset, -inset, -inset), 5, 5)
+        painter.restore()
+
+    def resizeEvent(self, event):
+        """Key images are re-rendered after a resize."""
+        self._pixmap_cache.clear()
+        super().resizeEvent(event)
+
+    def changeEvent(self, event):
+        """Re-render key images when the screen's device pixel ratio changes."""
+        dpr_change = getattr(QEvent, 'DevicePixelRatioChange', None)
+        if event.type() in (dpr_change, QEvent.ScreenChangeInternal):
+            self.invalidate_cache()
+        super().changeEvent(event)
+
     def sizeHint(self):
         """Return preferred size."""
-        from PySide6.QtCore import QSize
         return QSize(self.widget_width, self.widget_height)
@@ -0,0 +1,126 @@
+"""
+Compact keystroke log stored in parallel typed arrays.
+
+Every keystroke costs 17 bytes: an int64 monotonic timestamp (ns), a uint32
+text position, a uint32 typed codepoint and a uint8 correctness flag.
+Storage is preallocated and doubles when full, so a log never holds more
+than twice what it needs and nbytes() reports exactly what it uses.
+"""
+from array import array
+from collections import namedtuple
+
+# Zero-copy memoryview slices of the four columns
+KeystrokeView = namedtuple('KeystrokeView', ['timestamps', 'positions', 'codepoints', 'correct'])
+
+INITIAL_CAPACITY = 1024
+_COLUMNS = (('timestamps', 'q'), ('positions', 'I'), ('codepoints', 'I'), ('correct', 'B'))
+
+
+class KeystrokeLog:
+    """Append-only log of every keystroke in a session."""
+
+    def __init__(self, capacity=INITIAL_CAPACITY):
+        self.count = 0
+        self.capacity = 0
+        self.timestamps = array('q')
+        self.positions = array('I')
+        self.codepoints = array('I')
+        self.correct = array('B')
+        self._grow(max(1, capacity))
+
+    def __len__(self):
+        return self.count
+
+    def _grow(self, capacity):
+        """
+        Move the columns into larger preallocated arrays.
+
+        New arrays are allocated rather than resized in place, so views
+        handed out earlier stay valid (they keep the old buffers alive).
+        """
+        extra = capacity - self.capacity
+        for name, typecode in _COLUMNS:
+            column = array(typecode, getattr(self, name))
+            column.extend(array(typecode, bytes(extra * column.itemsize)))
+            setattr(self, name, column)
+        self.capacity = capacity
+
+    def append(self, timestamp_ns, position, codepoint, correct):
+        """
+        Record one keystroke.
+
+        Args:
+            timestamp_ns: Monotonic timestamp in nanoseconds
+            position: Text index the keystroke was compared against
+            codepoint: Codepoint of the typed character
+            correct: Whether it matched the expected character
+        """
+        i = self.count
+        if i == self.capacity:
+            self._grow(self.capacity * 2)
+        self.timestamps[i] = timestamp_ns
+        self.positions[i] = position
+        self.codepoints[i] = codepoint
+        self.correct[i] = correct
+        self.count = i + 1
+
+    def extend(self, timestamps, positions, codepoints, correct):
+        """
+        Record a run of keystrokes at once.
+
+        Args:
+            timestamps: Monotonic timestamps in nanoseconds
+            positions: Text indices the keystrokes were compared against
+            codepoints: Codepoints of the typed characters
+            correct: Correctness flags (0 or 1)
+        """
+        i = self.count
+        n = len(timestamps)
+        if i + n > self.capacity:
+            capacity = self.capacity
+            while capacity < i + n:
+                capacity *= 2
+            self._grow(capacity)
+        stop = i + n
+        self.timestamps[i:stop] = array('q', timestamps)
+        self.positions[i:stop] = array('I', positions)
+        self.codepoints[i:stop] = array('I', codepoints)
+        self.correct[i:stop] = array('B', correct)
+        self.count = stop
+
+    def view(self, start=0, stop=None):
+        """
+        Get zero-copy views of a range of the log.
+
+        Args:
+            start: First keystroke index
+            stop: End index (defaults to the current length)
+
+        Returns:
+            KeystrokeView: memoryview slices of each column
+        """
+        stop = self.count if stop is None else min(stop, self.count)
+        return KeystrokeView(*(memoryview(getattr(self, name))[start:stop]
+                               for name, _ in _COLUMNS))
+
+    def nbytes(self):
+        """Bytes held by the column buffers (including unused capacity)."""
+        return sum(len(getattr(self, name)) * getattr(self, name).itemsize
+                   for name, _ in _COLUMNS)
+
+    def errors(self, text, offset=0):
+        """
+        Build the mistyped-key list for a session.
+
+        Args:
+            text: Text the session was typed against
+            offset: Position of text[0] (when text is a window of a longer stream)
+
+        Returns:
+            list: Dicts with position, expected and typed characters
+        """
+        view = self.view()
+        return [{'position': view.positions[i],
+                 'expected': text[view.positions[i] - offset],
+                 'typed': chr(view.codepoints[i])}
+                for i in range(self.count) if not view.correct[i]]
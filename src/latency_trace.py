@@ -0,0 +1,287 @@
+"""
+Input-to-paint latency tracing.
+
+Each keystroke is followed through its stages: the key event (including
+process_keystroke), the wait for the next UI frame, the frame's signal
+handlers (including _highlight_text), and the repaint (including
+KeyboardWidget.paintEvent). The end-to-end latency runs from the key event
+to the end of the first repaint after its handlers ran.
+
+Recording is cheap enough to leave on while typing. Durations go into
+fixed-size log-linear histograms (O(1) per sample, about 6% resolution).
+Spans go into a preallocated ring buffer of the most recent events, which
+can be exported in Chrome trace-event format (chrome://tracing, Perfetto).
+"""
+import json
+import os
+import time
+from array import array
+
+# Stages, in pipeline order
+KEY_EVENT = 'key_event'
+PROCESS_KEYSTROKE = 'process_keystroke'
+QUEUE_WAIT = 'queue_wait'
+HANDLERS = 'handlers'
+HIGHLIGHT = 'highlight'
+KEYBOARD_PAINT = 'keyboard_paint'
+FRAME = 'frame'
+INPUT_TO_PAINT = 'input_to_paint'
+
+STAGES = (KEY_EVENT, PROCESS_KEYSTROKE, QUEUE_WAIT, HANDLERS, HIGHLIGHT,
+          KEYBOARD_PAINT, FRAME, INPUT_TO_PAINT)
+_STAGE_IDS = {stage: index for index, stage in enumerate(STAGES)}
+
+# Sub-buckets per power of two; relative error is at most 1 / SUB_BUCKETS
+SUB_BITS = 4
+SUB_BUCKETS = 1 << SUB_BITS
+# Largest recordable duration is about 2**MAX_BITS ns (18 minutes)
+MAX_BITS = 40
+
+TRACE_CAPACITY = 100000
+
+# Chrome trace thread ids: nested stage spans, and end-to-end latency on its own row
+_STAGE_TID = 1
+_LATENCY_TID = 2
+
+
+def _bucket(value):
+    """Histogram bucket of a non-negative duration in ns."""
+    if value < SUB_BUCKETS:
+        return value
+    shift = value.bit_length() - SUB_BITS - 1
+    return (shift + 1) * SUB_BUCKETS + ((value >> shift) & (SUB_BUCKETS - 1))
+
+
+def _bucket_value(index):
+    """Midpoint (in ns) of the durations falling in a bucket."""
+    if index < SUB_BUCKETS:
+        return index
+    shift = index // SUB_BUCKETS - 1
+    low = (SUB_BUCKETS + index % SUB_BUCKETS) << shift
+    return low + (1 << shift) // 2
+
+
+class LatencyHistogram:
+    """Log-linear histogram of durations in nanoseconds."""
+
+    def __init__(self):
+        self.counts = array('q', bytes(8 * (MAX_BITS + 1) * SUB_BUCKETS))
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def record(self, duration_ns):
+        """Add one duration (clamped to the recordable range)."""
+        if duration_ns < 0:
+            duration_ns = 0
+        self.counts[min(_bucket(duration_ns), len(self.counts) - 1)] += 1
+        self.count += 1
+        self.total_ns += duration_ns
+        if duration_ns > self.max_ns:
+            self.max_ns = duration_ns
+
+    def percentile(self, pct):
+        """
+        Approximate a percentile.
+
+        Args:
+            pct: Percentile between 0 and 100
+
+        Returns:
+            float: Duration in ms, or None without samples
+        """
+        if not self.count:
+            return None
+        rank = max(1, -(-self.count * pct // 100))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(_bucket_value(index), self.max_ns) / 1e6
+        return self.max_ns / 1e6
+
+    def mean(self):
+        """Mean duration in ms, or None without samples."""
+        return self.total_ns / self.count / 1e6 if self.count else None
+
+    def clear(self):
+        """Forget every sample."""
+        self.counts = array('q', bytes(len(self.counts) * 8))
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+
+class LatencyTracer:
+    """
+    Per-stage histograms and a ring buffer of recent spans.
+
+    Timestamps are perf_counter_ns values. Callers take a start time with
+    now() and pass it to span() when the stage ends.
+    """
+
+    def __init__(self, trace_capacity=TRACE_CAPACITY):
+        self.histograms = {stage: LatencyHistogram() for stage in STAGES}
+        self.capacity = trace_capacity
+        self._stages = array('B', bytes(trace_capacity))
+        self._starts = array('q', bytes(8 * trace_capacity))
+        self._durations = array('q', bytes(8 * trace_capacity))
+        self._inputs = array('l', bytes(array('l').itemsize * trace_capacity))
+        self._written = 0  # Spans recorded since the last clear (may exceed capacity)
+
+        self.inputs = 0
+        self._current_input = 0
+        self._queued = []   # Key event start times of inputs waiting for a frame
+        self._applied = []  # Inputs whose handlers ran, waiting for a repaint
+
+    now = staticmethod(time.perf_counter_ns)
+
+    def span(self, stage, start_ns, end_ns=None):
+        """
+        Record a finished stage.
+
+        Args:
+            stage: One of STAGES
+            start_ns: perf_counter_ns when the stage began
+            end_ns: When it ended (defaults to now)
+        """
+        if end_ns is None:
+            end_ns = time.perf_counter_ns()
+        duration = end_ns - start_ns
+        self.histograms[stage].record(duration)
+
+        slot = self._written % self.capacity
+        self._stages[slot] = _STAGE_IDS[stage]
+        self._starts[slot] = start_ns
+        self._durations[slot] = duration
+        self._inputs[slot] = self._current_input
+        self._written += 1
+
+    def input_started(self, start_ns):
+        """Note a key event; its latency is open until the next repaint."""
+        self.inputs += 1
+        self._current_input = self.inputs
+        self._queued.append((self.inputs, start_ns))
+
+    def frame_applied(self, start_ns):
+        """
+        Note that pending updates were applied (their signal handlers ran).
+
+        Args:
+            start_ns: When the frame's handlers began
+        """
+        for input_id, input_ns in self._queued:
+            self.histograms[QUEUE_WAIT].record(start_ns - input_ns)
+        self._applied.extend(self._queued)
+        self._queued = []
+
+    def frame_painted(self, start_ns):
+        """
+        Close the latency of every input whose updates this repaint showed.
+
+        Args:
+            start_ns: When the repaint began
+        """
+        end_ns = time.perf_counter_ns()
+        self.span(FRAME, start_ns, end_ns)
+        if not self._applied:
+            return
+        current = self._current_input
+        for input_id, input_ns in self._applied:
+            self._current_input = input_id
+            self.span(INPUT_TO_PAINT, input_ns, end_ns)
+        self._current_input = current
+        self._applied = []
+
+    def discard_pending(self):
+        """Drop open inputs (their updates were cancelled)."""
+        self._queued = []
+        self._applied = []
+
+    def clear(self):
+        """Forget every sample and span."""
+        for histogram in self.histograms.values():
+            histogram.clear()
+        self._written = 0
+        self.discard_pending()
+
+    def summary(self):
+        """
+        Percentiles per stage.
+
+        Returns:
+            dict: stage -> {'count', 'p50_ms', 'p99_ms', 'max_ms', 'mean_ms'}
+            for every stage with samples
+        """
+        summary = {}
+        for stage in STAGES:
+            histogram = self.histograms[stage]
+            if histogram.count:
+                summary[stage] = {
+                    'count': histogram.count,
+                    'p50_ms': histogram.percentile(50),
+                    'p99_ms': histogram.percentile(99),
+                    'max_ms': histogram.max_ns / 1e6,
+                    'mean_ms': histogram.mean(),
+                }
+        return summary
+
+    def spans(self):
+        """
+        Recorded spans still in the ring buffer, oldest first.
+
+        Returns:
+            list: (stage, start_ns, duration_ns, input id) tuples
+        """
+        count = min(self._written, self.capacity)
+        first = self._written - count
+        spans = []
+        for absolute in range(first, self._written):
+            slot = absolute % self.capacity
+            spans.append((STAGES[self._stages[slot]], self._starts[slot],
+                          self._durations[slot], self._inputs[slot]))
+        return spans
+
+    def chrome_trace(self):
+        """
+        Build a Chrome trace-event document of the recorded spans.
+
+        Returns:
+            dict: JSON-serializable trace with complete ("X") events in microseconds
+        """
+        pid = os.getpid()
+        events = [
+            {'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': _STAGE_TID,
+             'args': {'name': 'UI thread stages'}},
+            {'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': _LATENCY_TID,
+             'args': {'name': 'Input to paint'}},
+        ]
+        for stage, start_ns, duration_ns, input_id in self.spans():
+            events.append({
+                'name': stage,
+                'cat': 'latency',
+                'ph': 'X',
+                'ts': start_ns / 1000.0,
+                'dur': duration_ns / 1000.0,
+                'pid': pid,
+                'tid': _LATENCY_TID if stage == INPUT_TO_PAINT else _STAGE_TID,
+                'args': {'input': input_id},
+            })
+        return {'traceEvents': events, 'displayTimeUnit': 'ms',
+                'otherData': {'summary': self.summary()}}
+
+    def export(self, path):
+        """
+        Write the Chrome trace to a file atomically.
+
+        Raises:
+            OSError: If the file could not be written
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = path + '.tmp'
+        data = json.dumps(self.chrome_trace())
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
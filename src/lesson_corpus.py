@@ -0,0 +1,145 @@
+"""
+Packed lesson corpus: every lesson in one indexed file, read through mmap.
+
+File layout:
+    8 bytes   magic (CORPUS_MAGIC)
+    4 bytes   little-endian length of the JSON index
+    N bytes   UTF-8 JSON index {"version": 1, "lessons": {name: metadata}}
+    ...       concatenated UTF-8 lesson texts
+
+Each lesson's metadata holds its byte offset (relative to the start of the
+text data) and byte length plus precomputed chars, lines and sha1, so a
+lesson can be listed without being decoded.
+
+Build the corpus before packaging:
+    python src/lesson_corpus.py [levels_dir] [output_path]
+"""
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+
+CORPUS_MAGIC = b'TTCORP01'
+CORPUS_VERSION = 1
+CORPUS_FILE = 'levels.corpus'
+_HEADER = struct.Struct('<8sI')
+
+
+def build_corpus(levels_dir, corpus_path):
+    """
+    Pack every lesson file in a directory into a single corpus file.
+
+    Args:
+        levels_dir: Directory containing lesson files
+        corpus_path: Output path of the corpus file
+
+    Returns:
+        int: Number of lessons packed
+    """
+    lessons = {}
+    blobs = []
+    offset = 0
+    for name in sorted(os.listdir(levels_dir)):
+        path = os.path.join(levels_dir, name)
+        if not os.path.isfile(path):
+            continue
+        # Text mode normalizes CRLF checkouts to the '\n' the UI expects
+        with open(path, 'r', encoding='utf-8') as f:
+            text = f.read()
+        data = text.encode('utf-8')
+        lessons[name] = {
+            'offset': offset,
+            'length': len(data),
+            'chars': len(text),
+            'lines': text.count('\n') + 1,
+            'sha1': hashlib.sha1(data).hexdigest(),
+        }
+        blobs.append(data)
+        offset += len(data)
+
+    index = json.dumps({'version': CORPUS_VERSION, 'lessons': lessons},
+                       separators=(',', ':')).encode('utf-8')
+
+    tmp_path = corpus_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER.pack(CORPUS_MAGIC, len(index)))
+        f.write(index)
+        for data in blobs:
+            f.write(data)
+    os.replace(tmp_path, corpus_path)
+    return len(lessons)
+
+
+class LessonCorpus:
+    """Read-only view of a packed corpus; decodes one lesson at a time."""
+
+    def __init__(self, corpus_path):
+        self.path = corpus_path
+        self._file = open(corpus_path, 'rb')
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty file
+            self._file.close()
+            raise ValueError(f"Corpus file is empty: {corpus_path}")
+
+        magic, index_length = _HEADER.unpack_from(self._mmap, 0)
+        if magic != CORPUS_MAGIC:
+            self.close()
+            raise ValueError(f"Not a lesson corpus: {corpus_path}")
+
+        index_start = _HEADER.size
+        self._data_start = index_start + index_length
+        index = json.loads(self._mmap[index_start:self._data_start].decode('utf-8'))
+        self.lessons = index['lessons']
+
+    def __contains__(self, name):
+        return name in self.lessons
+
+    def get_metadata(self, name):
+        """
+        Get the precomputed metadata of a lesson.
+
+        Args:
+            name: Lesson file name
+
+        Returns:
+            dict: offset, length, chars, lines and sha1, or None
+        """
+        return self.lessons.get(name)
+
+    def read(self, name):
+        """
+        Decode a single lesson.
+
+        Args:
+            name: Lesson file name
+
+        Returns:
+            str: Lesson text
+
+        Raises:
+            KeyError: If the lesson is not in the corpus
+        """
+        entry = self.lessons[name]
+        start = self._data_start + entry['offset']
+        return self._mmap[start:start + entry['length']].decode('utf-8')
+
+    def close(self):
+        """Release the memory map and file handle."""
+        self._mmap.close()
+        self._file.close()
+
+
+def main():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    levels_dir = sys.argv[1] if len(sys.argv) > 1 else os.path.join(root, 'data', 'levels')
+    corpus_path = sys.argv[2] if len(sys.argv) > 2 else os.path.join(root, 'data', CORPUS_FILE)
+    count = build_corpus(levels_dir, corpus_path)
+    print(f"Packed {count} lessons into {corpus_path}")
+
+
+if __name__ == '__main__':
+    main()
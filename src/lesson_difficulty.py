@@ -0,0 +1,164 @@
+"""
+Lesson difficulty scoring over the keyboard's geometry.
+
+Each lesson is scored on what it asks of the typist's hands, using the key
+positions in the layout and the touch-typing finger of every key:
+
+- finger travel: key widths each finger moves from its home key and back
+  (including the opposite pinky's trip to Shift), per character
+- same-finger bigrams: consecutive characters typed by one finger on
+  different keys, per bigram
+- row jumps: consecutive characters on one hand two or more rows apart
+- shift frequency and symbol density, per character
+
+Scoring is done over character and bigram counts rather than character by
+character: the counts are built by Counter in C, and the per-key tables are
+then applied once per distinct character or bigram. Bigram classifications
+are memoized across lessons, so scoring a corpus soon costs little more
+than the counting.
+"""
+import hashlib
+import json
+import math
+from collections import Counter
+from keyboard_layout import NAMED_KEY_CHARS
+
+# Resting key of each finger
+HOME_KEYS = {
+    'left_pinky': 'KeyA', 'left_ring': 'KeyS', 'left_middle': 'KeyD', 'left_index': 'KeyF',
+    'right_index': 'KeyJ', 'right_middle': 'KeyK', 'right_ring': 'KeyL', 'right_pinky': 'Semicolon',
+    'thumb': 'Space',
+}
+
+# Space, Enter and Tab are typed characters but not symbols
+_NAMED_CHARS = frozenset(NAMED_KEY_CHARS.values())
+
+# Shift is held by the pinky of the hand not typing the character
+_SHIFT_KEYS = {'left': ('right_pinky', 'ShiftRight'), 'right': ('left_pinky', 'ShiftLeft')}
+
+# Contribution of each measure to the 0-100 difficulty score, with the
+# value at which it saturates: travel in key widths per character, the rest
+# as rates
+_WEIGHTS = (
+    ('finger_travel', 35, 3.0),
+    ('same_finger_bigrams', 20, 0.10),
+    ('row_jumps', 10, 0.10),
+    ('shift_ratio', 15, 0.20),
+    ('symbol_density', 15, 0.25),
+    ('untypeable', 5, 0.05),
+)
+
+
+def _hand(finger):
+    return finger.split('_', 1)[0]
+
+
+class DifficultyScorer:
+    """Scores texts against one keyboard layout."""
+
+    def __init__(self, layout):
+        centers = {}
+        for row in layout.layout_data.get('rows', []):
+            for key in row['keys']:
+                centers[key['code']] = (key['x'] + key['width'] / 2, row['y'])
+        self._centers = centers
+
+        # char -> (finger, key code, x, y, travel cost, shifted)
+        self._keys = {}
+        for char, info in layout.char_index.items():
+            if info.finger not in HOME_KEYS or info.code not in centers:
+                continue
+            x, y = centers[info.code]
+            travel = 2 * self._distance(HOME_KEYS[info.finger], info.code)
+            if info.shift and info.finger != 'thumb':
+                shift_finger, shift_code = _SHIFT_KEYS[_hand(info.finger)]
+                travel += 2 * self._distance(HOME_KEYS[shift_finger], shift_code)
+            self._keys[char] = (info.finger, info.code, x, y, travel, info.shift)
+
+        # Bigram -> (same finger, row jump, extra travel), filled as bigrams are met
+        self._pairs = {}
+
+        table = sorted((char, key[0], key[1], round(key[4], 4), key[5])
+                       for char, key in self._keys.items())
+        self.fingerprint = hashlib.sha1(json.dumps(table).encode('utf-8')).hexdigest()
+
+    def _distance(self, from_code, to_code):
+        """Distance between two key centers in key widths (0 if either is missing)."""
+        start = self._centers.get(from_code)
+        end = self._centers.get(to_code)
+        if start is None or end is None:
+            return 0.0
+        return math.hypot(end[0] - start[0], end[1] - start[1])
+
+    def _pair_cost(self, pair):
+        """Classify a bigram (a pair of characters) and cache the result."""
+        first = self._keys.get(pair[0])
+        second = self._keys.get(pair[1])
+        cost = (False, False, 0.0)
+        if first is not None and second is not None and 'thumb' not in (first[0], second[0]):
+            if first[0] == second[0]:
+                if first[1] != second[1]:
+                    # The finger must leave one key for the other without resting
+                    cost = (True, False, self._distance(first[1], second[1]))
+            elif _hand(first[0]) == _hand(second[0]) and abs(first[3] - second[3]) >= 2:
+                cost = (False, True, 0.0)
+        self._pairs[pair] = cost
+        return cost
+
+    def score(self, text):
+        """
+        Measure a text.
+
+        Args:
+            text: Lesson text
+
+        Returns:
+            dict: finger_travel (key widths per character),
+            same_finger_bigrams and row_jumps (per bigram), shift_ratio,
+            symbol_density and untypeable (per character), and difficulty
+            (0-100)
+        """
+        chars = len(text)
+        if not chars:
+            return {'finger_travel': 0.0, 'same_finger_bigrams': 0.0, 'row_jumps': 0.0,
+                    'shift_ratio': 0.0, 'symbol_density': 0.0, 'untypeable': 0.0,
+                    'difficulty': 0.0}
+
+        keys = self._keys
+        travel = shifted = symbols = untypeable = 0
+        for char, count in Counter(text).items():
+            key = keys.get(char)
+            if key is None:
+                untypeable += count
+                continue
+            travel += key[4] * count
+            if key[5]:
+                shifted += count
+            if not char.isalnum() and char not in _NAMED_CHARS:
+                symbols += count
+
+        same_finger = row_jumps = 0
+        bigrams = chars - 1
+        if bigrams > 0:
+            pairs = self._pairs
+            for pair, count in Counter(zip(text, text[1:])).items():
+                cost = pairs.get(pair) or self._pair_cost(pair)
+                if cost[0]:
+                    same_finger += count
+                    travel += cost[2] * count
+                elif cost[1]:
+                    row_jumps += count
+
+        measures = {
+            'finger_travel': travel / chars,
+            'same_finger_bigrams': same_finger / bigrams if bigrams > 0 else 0.0,
+            'row_jumps': row_jumps / bigrams if bigrams > 0 else 0.0,
+            'shift_ratio': shifted / chars,
+            'symbol_density': symbols / chars,
+            'untypeable': untypeable / chars,
+        }
+        difficulty = sum(weight * min(measures[name] / saturation, 1.0)
+                         for name, weight, saturation in _WEIGHTS)
+        result = {name: round(value, 4) for name, value in measures.items()}
+        result['difficulty'] = round(difficulty, 1)
+        return result
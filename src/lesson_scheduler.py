@@ -0,0 +1,172 @@
+"""
+Shuffled-bag lesson scheduling.
+
+Each level deals its lessons from a shuffled bag: every lesson comes up once
+before any repeats, and a refilled bag never starts with the lesson that
+ended the previous one. Bags are saved in the user data folder, so the
+rotation carries on across launches. Lessons added to a level join at the
+next refill; lessons that disappear are dropped from the bag.
+"""
+import json
+import os
+import random
+
+SCHEDULE_FILE = 'lesson_schedule.json'
+SCHEDULE_VERSION = 1
+
+
+def serialize(data):
+    """
+    Turn a snapshot() into the JSON text save() writes.
+
+    Only the snapshot is touched, so this may run on a worker thread.
+
+    Args:
+        data: Value returned by LessonScheduler.snapshot()
+
+    Returns:
+        str: JSON text
+    """
+    saved, dealt, last = data
+    bags = dict(saved)
+    for key, (files, bag) in dealt.items():
+        bags[key] = [files[index] for index in bag]
+    return json.dumps({'version': SCHEDULE_VERSION, 'bags': bags, 'last': last})
+
+
+class LessonScheduler:
+    """
+    Per-level shuffled bags of lesson names.
+
+    A level's bag is kept as positions in its list of lesson names and
+    checked against that list only when the caller passes a different list
+    object, so dealing and peeking cost the same for a level of thousands
+    of lessons as for one of five. Lists must not change in place.
+    """
+
+    def __init__(self, directory, rng=None):
+        self.directory = directory
+        self.path = os.path.join(directory, SCHEDULE_FILE)
+        self.rng = rng or random.Random()
+        self.bags = {}  # level key -> saved lesson names not yet matched to a list
+        self.dealt = {}  # level key -> (lesson names, positions still to deal from the end)
+        self.last = {}  # level key -> lesson dealt most recently
+        self.dirty = False
+        self._loaded = False
+
+    def load(self):
+        """Read saved bags, starting empty if there are none."""
+        self._loaded = True
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != SCHEDULE_VERSION:
+                raise ValueError(f"unsupported version {data.get('version')}")
+            self.bags = {key: list(bag) for key, bag in data['bags'].items()}
+            self.last = dict(data['last'])
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            if os.path.exists(self.path):
+                print(f"Warning: Could not read lesson schedule: {e}")
+
+    def snapshot(self):
+        """
+        Copy the bags for save(), marking them saved.
+
+        The copy is cheap (positions, not names); serialize() turns it into
+        JSON, so that part can run on the thread doing the write.
+
+        Returns:
+            tuple: Bags for save(), or None if nothing changed since the
+            last snapshot
+        """
+        if not self.dirty:
+            return None
+        self.dirty = False
+        # Saved name lists are replaced, never changed, so sharing them is safe
+        dealt = {key: (files, list(bag)) for key, (files, bag) in self.dealt.items()}
+        return dict(self.bags), dealt, dict(self.last)
+
+    def save(self, data=None):
+        """
+        Write the bags atomically if anything changed.
+
+        Args:
+            data: A snapshot() taken earlier (lets the write run on another
+                thread); taken now if omitted
+
+        Raises:
+            OSError: If the file could not be written
+        """
+        if data is None:
+            data = self.snapshot()
+            if data is None:
+                return
+        text = serialize(data)
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, self.path)
+
+    def _bag(self, key, files):
+        """A level's current bag of positions in files, refilled if it ran out."""
+        if not self._loaded:
+            self.load()
+        held = self.dealt.get(key)
+        if held is None or held[0] is not files:
+            self._match(key, files, held)
+        bag = self.dealt[key][1]
+        if not bag and files:
+            bag.extend(range(len(files)))
+            self.rng.shuffle(bag)
+            # Never deal the lesson that was just finished twice in a row
+            if len(bag) > 1 and files[bag[-1]] == self.last.get(key):
+                bag[0], bag[-1] = bag[-1], bag[0]
+            self.dirty = True
+        return bag
+
+    def _match(self, key, files, held):
+        """Carry a level's bag over to a new list of its lessons, dropping vanished ones."""
+        if held is None:
+            names = self.bags.pop(key, [])
+        else:
+            old_files, old_bag = held
+            names = [old_files[index] for index in old_bag]
+        positions = {name: index for index, name in enumerate(files)}
+        bag = [positions[name] for name in names if name in positions]
+        if len(bag) != len(names):
+            self.dirty = True
+        self.dealt[key] = (files, bag)
+
+    def peek(self, key, files):
+        """
+        The lesson next() will deal, without dealing it.
+
+        Args:
+            key: Level identifier (a string)
+            files: The level's current lesson names
+
+        Returns:
+            str: Lesson name, or None if the level has no lessons
+        """
+        bag = self._bag(key, files)
+        return files[bag[-1]] if bag else None
+
+    def next(self, key, files):
+        """
+        Deal a level's next lesson.
+
+        Args:
+            key: Level identifier (a string)
+            files: The level's current lesson names
+
+        Returns:
+            str: Lesson name, or None if the level has no lessons
+        """
+        bag = self._bag(key, files)
+        if not bag:
+            return None
+        name = files[bag.pop()]
+        self.last[key] = name
+        self.dirty = True
+        return name
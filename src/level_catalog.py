@@ -0,0 +1,312 @@
+"""
+Data-driven level catalogue and cached per-lesson metadata.
+
+Levels come from data/levels.json, a manifest naming each level and its
+lessons (an explicit file list or a glob pattern). Lesson files following
+the level{N}_{type}_{variation}.{ext} convention that no manifest entry
+claims become levels of their own, so new content needs no code change.
+Building the catalogue lists the lesson directory once and opens no lesson.
+
+Per-lesson metadata (length, lines, character classes, shift ratio and a
+difficulty score) is cached in the user data folder, keyed by the SHA-1 of
+the lesson text. With a DifficultyScorer the metadata also holds its
+keyboard measures and difficulty; the cache records the scorer's
+fingerprint and starts over when the layout changes. A stamp per lesson
+source (file mtime and size, or the corpus checksum) maps to that hash, so
+unchanged lessons are never re-read; identical texts share one entry
+wherever they live.
+"""
+import fnmatch
+import hashlib
+import json
+import os
+import re
+from collections import Counter
+
+MANIFEST_FILE = 'levels.json'
+MANIFEST_VERSION = 1
+DEFAULT_TARGET_WPM = 40
+
+LESSON_NAME = re.compile(r'^level(\d+)_([A-Za-z]+)_(\w+)\.\w+$')
+
+METADATA_FILE = 'lesson_meta.json'
+METADATA_VERSION = 2
+
+# Characters typed with Shift held on a US layout (besides capitals)
+SHIFTED_SYMBOLS = frozenset('~!@#$%^&*()_+{}|:"<>?')
+
+# Relative effort per character class, used by the difficulty score
+_CLASS_COST = {'lower': 1.0, 'space': 1.0, 'upper': 1.5, 'digit': 2.0,
+               'symbol': 2.0, 'shifted_symbol': 2.5, 'other': 3.0}
+
+
+def _natural_key(name):
+    """Sort key ordering 'lesson_10' after 'lesson_9'."""
+    return [int(part) if part.isdigit() else part for part in re.split(r'(\d+)', name)]
+
+
+def load_manifest(path):
+    """
+    Read the level manifest.
+
+    Args:
+        path: Path of levels.json
+
+    Returns:
+        list: Level entries (empty if there is no usable manifest)
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') != MANIFEST_VERSION:
+            raise ValueError(f"unsupported version {data.get('version')}")
+        levels = data['levels']
+        for entry in levels:
+            int(entry['level'])
+            entry['name']
+        return levels
+    except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+        if os.path.exists(path):
+            print(f"Warning: Could not read level manifest: {e}")
+        return []
+
+
+def build_catalog(manifest_levels, lesson_names, max_level=None):
+    """
+    Resolve manifest entries and unclaimed lesson files into levels.
+
+    Args:
+        manifest_levels: Entries from load_manifest()
+        lesson_names: File names of every available lesson
+        max_level: Scanned levels must be below this number (reserved ranges)
+
+    Returns:
+        dict: Level info (name, target_wpm, files, description) keyed by
+        level number; levels without lessons are left out
+    """
+    available = sorted(lesson_names, key=_natural_key)
+    levels = {}
+    claimed = set()
+    for entry in manifest_levels:
+        level_num = int(entry['level'])
+        if 'files' in entry:
+            present = set(available)
+            files = [name for name in entry['files'] if name in present]
+        else:
+            files = fnmatch.filter(available, entry.get('pattern', f"level{level_num}_*"))
+        claimed.update(files)
+        if files:
+            levels[level_num] = {
+                "name": entry['name'],
+                "target_wpm": entry.get('target_wpm', DEFAULT_TARGET_WPM),
+                "files": files,
+                "description": entry.get('description', ''),
+            }
+
+    # Files following the naming convention that nothing claimed
+    scanned = {}
+    for name in available:
+        match = LESSON_NAME.match(name)
+        if match is None or name in claimed:
+            continue
+        level_num = int(match.group(1))
+        if level_num in levels or (max_level is not None and level_num >= max_level):
+            continue
+        scanned.setdefault(level_num, (match.group(2), []))[1].append(name)
+    for level_num, (kind, files) in scanned.items():
+        levels[level_num] = {
+            "name": f"{kind.title()} - Level {level_num}",
+            "target_wpm": DEFAULT_TARGET_WPM,
+            "files": files,
+            "description": f"{len(files)} {kind} lessons",
+        }
+    return levels
+
+
+def lesson_metadata(text, scorer=None):
+    """
+    Compute the metadata of one lesson.
+
+    Args:
+        text: Lesson text
+        scorer: DifficultyScorer for the keyboard in use (optional)
+
+    Returns:
+        dict: chars, lines, words, counts per character class, shift_ratio
+        and difficulty (0-100). With a scorer, its measures are added and
+        difficulty is its score; without one, difficulty is estimated from
+        the character classes (0 = only lowercase and spaces, 100 = only
+        non-ASCII characters).
+    """
+    counts = dict.fromkeys(_CLASS_COST, 0)
+    # Classify each distinct character once
+    for char, count in Counter(text).items():
+        if char.isspace():
+            counts['space'] += count
+        elif 'a' <= char <= 'z':
+            counts['lower'] += count
+        elif 'A' <= char <= 'Z':
+            counts['upper'] += count
+        elif '0' <= char <= '9':
+            counts['digit'] += count
+        elif char in SHIFTED_SYMBOLS:
+            counts['shifted_symbol'] += count
+        elif char.isascii():
+            counts['symbol'] += count
+        else:
+            counts['other'] += count
+
+    chars = len(text)
+    cost = sum(_CLASS_COST[name] * count for name, count in counts.items())
+    lowest, highest = min(_CLASS_COST.values()), max(_CLASS_COST.values())
+    difficulty = (cost / chars - lowest) / (highest - lowest) * 100 if chars else 0.0
+    metadata = {
+        'chars': chars,
+        'lines': text.count('\n') + 1,
+        'words': len(text.split()),
+        'classes': counts,
+        'shift_ratio': (counts['upper'] + counts['shifted_symbol']) / chars if chars else 0.0,
+        'difficulty': round(difficulty, 1),
+    }
+    if scorer is not None:
+        metadata.update(scorer.score(text))
+    return metadata
+
+
+def text_sha1(text):
+    """Content hash used as the metadata cache key."""
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+class LessonMetadataCache:
+    """Lesson metadata keyed by content hash, with source stamps to skip re-reading."""
+
+    def __init__(self, directory, scorer=None):
+        self.directory = directory
+        self.scorer = scorer
+        self.fingerprint = scorer.fingerprint if scorer is not None else None
+        self.path = os.path.join(directory, METADATA_FILE)
+        self.stamps = {}   # source key -> [stamp, sha1]
+        self.lessons = {}  # sha1 -> metadata
+        self.dirty = False
+        self._loaded = False
+
+    def load(self):
+        """Read the cache, starting empty if there is none."""
+        self._loaded = True
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != METADATA_VERSION:
+                raise ValueError(f"unsupported version {data.get('version')}")
+            self.stamps = data['stamps']
+            if data.get('scorer') == self.fingerprint:
+                self.lessons = data['lessons']
+            else:
+                # Scored for another keyboard; stamps still save re-hashing
+                self.dirty = True
+        except (OSError, ValueError, KeyError, AttributeError) as e:
+            if os.path.exists(self.path):
+                print(f"Warning: Could not read lesson metadata cache: {e}")
+
+    def save(self):
+        """
+        Write the cache atomically if anything changed.
+
+        Raises:
+            OSError: If the file could not be written
+        """
+        if not self.dirty:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        data = json.dumps({'version': METADATA_VERSION, 'scorer': self.fingerprint,
+                           'stamps': self.stamps, 'lessons': self.lessons})
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(data)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+    def get(self, key, stamp, read_text, sha1=None):
+        """
+        Metadata of a lesson, reading it only if its source changed.
+
+        Args:
+            key: Identifies the lesson source (such as "levels/level1_business_1.txt")
+            stamp: JSON-serializable value that changes whenever the source does
+            read_text: Function returning the lesson text
+            sha1: The text's hash if already known (the corpus stores it)
+
+        Returns:
+            dict: Lesson metadata (see lesson_metadata)
+
+        Raises:
+            OSError: If the lesson had to be read and could not be
+        """
+        if not self._loaded:
+            self.load()
+        if sha1 is None:
+            known = self.stamps.get(key)
+            if known is not None and known[0] == stamp:
+                sha1 = known[1]
+        metadata = self.lessons.get(sha1) if sha1 is not None else None
+        if metadata is None:
+            text = read_text()
+            sha1 = text_sha1(text)
+            metadata = self.lessons.get(sha1)
+            if metadata is None:
+                metadata = self.lessons[sha1] = lesson_metadata(text, self.scorer)
+                self.dirty = True
+        if self.stamps.get(key) != [stamp, sha1]:
+            self.stamps[key] = [stamp, sha1]
+            self.dirty = True
+        return metadata
+
+    def forget(self, prefix):
+        """Drop the stamps of every lesson source whose key starts with prefix."""
+        if not self._loaded:
+            self.load()
+        keys = [key for key in self.stamps if key.startswith(prefix)]
+        for key in keys:
+            del self.stamps[key]
+        if keys:
+            self.dirty = True
+
+    def restamp(self, key, stamp):
+        """
+        Give a stored lesson source a new stamp, keeping its text.
+
+        Args:
+            key: Identifies the lesson source
+            stamp: The source's new stamp
+
+        Returns:
+            dict: The lesson's metadata, or None if the source isn't stored
+        """
+        if not self._loaded:
+            self.load()
+        known = self.stamps.get(key)
+        metadata = self.lessons.get(known[1]) if known is not None else None
+        if metadata is not None and known[0] != stamp:
+            self.stamps[key] = [stamp, known[1]]
+            self.dirty = True
+        return metadata
+
+    def put(self, key, stamp, sha1, metadata):
+        """
+        Store metadata computed elsewhere, such as while the lesson was written.
+
+        Args:
+            key: Identifies the lesson source
+            stamp: JSON-serializable value that changes whenever the source does
+            sha1: text_sha1() of the lesson text
+            metadata: lesson_metadata() of the text, scored with this cache's scorer
+        """
+        if not self._loaded:
+            self.load()
+        if sha1 not in self.lessons:
+            self.lessons[sha1] = metadata
+            self.dirty = True
+        if self.stamps.get(key) != [stamp, sha1]:
+            self.stamps[key] = [stamp, sha1]
+            self.dirty = True
@@ -4,7 +4,16 @@ Level definitions and text corpus management.
 import os
 import sys
 import json
-import random
+import threading
+from functools import partial
+from progress_store import ProgressStore, default_level_progress
+from text_import import IMPORT_INFO_FILE, LessonFileNames
+from key_analytics import KeyAnalytics
+from level_catalog import load_manifest, build_catalog, LessonMetadataCache, MANIFEST_FILE
+from keyboard_layout import load_layout
+from lesson_difficulty import DifficultyScorer
+from lesson_scheduler import LessonScheduler
+from lesson_corpus import LessonCorpus, CORPUS_FILE
 
 
 def get_resource_path(relative_path):
@@ -26,63 +35,247 @@ def get_resource_path(relative_path):
     return os.path.join(base_path, relative_path)
 
 
+def get_user_data_dir():
+    """
+    Get the per-user directory holding progress and caches.
+
+    The directory is not created here; writers create it on first write.
+
+    Returns:
+        str: Absolute path to ~/.typing_tutor
+    """
+    return os.path.join(os.path.expanduser('~'), '.typing_tutor')
+
+
+def get_imports_dir():
+    """
+    Get the directory holding imported practice texts (one subdirectory each).
+
+    Returns:
+        str: Absolute path to ~/.typing_tutor/imports
+    """
+    return os.path.join(get_user_data_dir(), 'imports')
+
+
+def _summarize(lessons):
+    """
+    Summarize lesson metadata for the level selector.
+
+    Args:
+        lessons: Metadata dicts
+
+    Returns:
+        dict: lessons, avg_chars, avg_difficulty, min_difficulty and
+        max_difficulty, or None without lessons
+    """
+    lessons = list(lessons)
+    if not lessons:
+        return None
+    difficulties = [metadata['difficulty'] for metadata in lessons]
+    return {
+        'lessons': len(lessons),
+        'avg_chars': sum(metadata['chars'] for metadata in lessons) / len(lessons),
+        'avg_difficulty': sum(difficulties) / len(difficulties),
+        'min_difficulty': min(difficulties),
+        'max_difficulty': max(difficulties),
+    }
+
+
+def _marathon_piece(reader, separator):
+    """Read one marathon piece, joined to the previous one by separator."""
+    return separator + reader().rstrip()
+
+
 class LevelManager:
     """Manages typing levels and progression."""
 
-    LEVELS = {
-        1: {
-            "name": "Business - Beginner",
-            "target_wpm": 50,
-            "files": [f"level1_business_{i}.txt" for i in range(1, 6)],
-            "description": "Professional emails and documents"
-        },
-        2: {
-            "name": "Business - Advanced",
-            "target_wpm": 80,
-            "files": [f"level2_business_{i}.txt" for i in range(1, 6)],
-            "description": "Fast-paced business communication"
-        },
-        3: {
-            "name": "Code - Beginner",
-            "target_wpm": 20,
-            "files": [f"level3_code_{i}.py" for i in range(1, 6)],
-            "description": "Python basics with special characters"
-        },
-        4: {
-            "name": "Code - Advanced",
-            "target_wpm": 50,
-            "files": [f"level4_code_{i}.py" for i in range(1, 6)],
-            "description": "Complex code with symbols"
-        },
-        5: {
-            "name": "Mixed - Master",
-            "target_wpm": 40,
-            "files": [f"level5_mixed_{i}.md" for i in range(1, 6)],
-            "description": "Markdown with inline code blocks"
-        }
+    # Imported texts are numbered from here so they never collide with built-in levels
+    IMPORTED_LEVEL_BASE = 101
+    IMPORTED_TARGET_WPM = 40
+
+    # Generated drill focusing on the typist's weakest keys and bigrams
+    DRILL_LEVEL = 100
+    DRILL_INFO = {
+        "name": "Drill - Weak Keys",
+        "target_wpm": 40,
+        "files": [],
+        "description": "Generated words targeting your slowest keys and transitions",
+        "drill": True,
     }
+    # Lessons of each imported text that feed the drill index
+    DRILL_IMPORT_LESSONS = 200
 
     def __init__(self):
-        self.progress = self._load_progress()
+        self.progress_store = ProgressStore(get_user_data_dir())
+        self._corpus = None  # Opened for the level catalogue
+        self.levels = self._load_levels()
+        # Best scores start empty until load_progress() or set_progress()
+        self.progress = {}
+        self.progress_loaded = False
+        self._metadata_cache = None  # Read on the first metadata query
+        # Metadata queries may run on worker threads; one at a time uses the cache
+        self._metadata_lock = threading.Lock()
+        self._level_summaries = {}  # level number -> get_level_summary() result
+        self.scheduler = LessonScheduler(get_user_data_dir())
+        # Imported texts are unknown until load_imported_levels() or set_imported_levels()
+        self.imported_levels = {}
+        self.imported_levels_loaded = False
+        self.analytics = KeyAnalytics(get_user_data_dir())  # Loaded after startup
+        self._drill_index = None  # Built on the first drill
+        # Drills are generated on worker threads; one at a time touches the index
+        self._drill_lock = threading.Lock()
+        self._history = None  # Opened on first use
+        # Runs saves off the caller's thread when set (the UI sets its IoPool)
+        self.io = None
+
+    def _load_levels(self):
+        """
+        Build the built-in levels from the manifest and the lessons on hand.
+
+        The lessons are those in the corpus index when a corpus was built,
+        otherwise those in the lesson directory; no lesson is read.
+
+        Returns:
+            dict: Level info keyed by level number
+        """
+        corpus = self._get_corpus()
+        if corpus is not None:
+            names = list(corpus.lessons)
+        else:
+            levels_dir = get_resource_path(os.path.join('data', 'levels'))
+            try:
+                with os.scandir(levels_dir) as entries:
+                    names = [entry.name for entry in entries if entry.is_file()]
+            except OSError:
+                names = []
+        manifest = load_manifest(get_resource_path(os.path.join('data', MANIFEST_FILE)))
+        return build_catalog(manifest, names, max_level=self.DRILL_LEVEL)
+
+    def read_imported_levels(self):
+        """
+        Discover imported texts from their import.json files.
+
+        Only the imports folder is read, so this may run on a worker thread.
+
+        Returns:
+            dict: Level info keyed by level number
+        """
+        imports_dir = get_imports_dir()
+        try:
+            names = sorted(os.listdir(imports_dir))
+        except OSError:
+            return {}
+
+        levels = {}
+        for name in names:
+            directory = os.path.join(imports_dir, name)
+            try:
+                with open(os.path.join(directory, IMPORT_INFO_FILE), 'r', encoding='utf-8') as f:
+                    info = json.load(f)
+            except (OSError, ValueError):
+                # Not an import, or one still being written
+                continue
+            level_num = info.get('level') or max(levels, default=self.IMPORTED_LEVEL_BASE - 1) + 1
+            levels[level_num] = self._imported_level_info(directory, info)
+        return levels
+
+    def set_imported_levels(self, levels):
+        """
+        Take over imported levels returned by read_imported_levels().
+
+        Texts imported while they were being read are kept.
+
+        Args:
+            levels: Level info keyed by level number
+        """
+        levels.update(self.imported_levels)
+        self.imported_levels = levels
+        self.imported_levels_loaded = True
+
+    def load_imported_levels(self):
+        """Discover imported texts on this thread."""
+        self.set_imported_levels(self.read_imported_levels())
+
+    def _imported_level_info(self, directory, info):
+        """Build a level info dictionary for an imported text."""
+        return {
+            "name": f"Imported - {info['name']}",
+            "target_wpm": self.IMPORTED_TARGET_WPM,
+            "files": LessonFileNames(info['lessons']),
+            "description": f"{info['lessons']} lessons from {info['source']}",
+            "directory": directory,
+        }
+
+    def next_imported_level(self):
+        """
+        Get the level number the next import will be stored under.
+
+        Returns:
+            int: Unused level number
+        """
+        return max(self.imported_levels, default=self.IMPORTED_LEVEL_BASE - 1) + 1
+
+    def add_imported_level(self, directory, info):
+        """
+        Register a freshly imported text as a level.
+
+        Args:
+            directory: Directory holding the import's lesson files
+            info: Import info returned by text_import.import_text
+
+        Returns:
+            int: The new level number
+        """
+        level_num = info.get('level') or self.next_imported_level()
+        self.imported_levels[level_num] = self._imported_level_info(directory, info)
+        return level_num
+
+    def _get_corpus(self):
+        """
+        Open the packed lesson corpus if one was built.
+
+        Returns:
+            LessonCorpus: The corpus, or None to read lesson files directly
+        """
+        if self._corpus is None:
+            corpus_path = get_resource_path(os.path.join('data', CORPUS_FILE))
+            try:
+                self._corpus = LessonCorpus(corpus_path)
+            except (OSError, ValueError, KeyError):
+                self._corpus = False
+        return self._corpus or None
+
+    def load_lessons(self):
+        """
+        Read the saved lesson schedule that dealing lessons needs.
+
+        May run on a worker thread, as long as no lesson is dealt meanwhile;
+        without it the schedule is read by the first lesson dealt.
+        """
+        self.scheduler.load()
 
     def get_level_info(self, level_num):
         """
         Get information about a specific level.
 
         Args:
-            level_num: Level number (1-5)
+            level_num: Level number
 
         Returns:
             dict: Level information or None
         """
-        return self.LEVELS.get(level_num)
+        if level_num == self.DRILL_LEVEL:
+            return self.DRILL_INFO
+        return self.levels.get(level_num) or self.imported_levels.get(level_num)
 
-    def get_level_text(self, level_num):
+    def get_level_text(self, level_num, file_name=None):
         """
-        Load the practice text for a level (randomly chooses from available files).
+        Load the practice text for a level (the next lesson from its shuffled bag).
 
         Args:
-            level_num: Level number (1-5)
+            level_num: Level number
+            file_name: Lesson to load instead of the next one (ignored if the
+                level doesn't have it)
 
         Returns:
             str: Practice text content
@@ -94,17 +287,461 @@ class LevelManager:
         level_info = self.get_level_info(level_num)
         if not level_info:
             raise ValueError(f"Invalid level number: {level_num}")
+        if level_info.get('drill'):
+            return self.drill_reader()()
+
+        if file_name not in level_info['files']:
+            file_name = self.next_lesson(level_num)
+        return self.lesson_reader(level_num, file_name)()
+
+    def peek_lesson(self, level_num):
+        """
+        Name the lesson next_lesson() will deal, without dealing it.
+
+        Returns:
+            str: Lesson file name, or None for the drill or an unknown level
+        """
+        level_info = self.get_level_info(level_num)
+        if not level_info or level_info.get('drill'):
+            return None
+        return self.scheduler.peek(str(level_num), level_info['files'])
+
+    def next_lesson(self, level_num):
+        """
+        Deal a level's next lesson from its shuffled bag.
+
+        Every lesson of the level comes up once before any repeats.
+
+        Returns:
+            str: Lesson file name, or None for the drill or an unknown level
+        """
+        level_info = self.get_level_info(level_num)
+        if not level_info or level_info.get('drill'):
+            return None
+        file_name = self.scheduler.next(str(level_num), level_info['files'])
+        data = self.scheduler.snapshot()
+        if data is not None:
+            self._write("lesson schedule", (OSError,), self.scheduler.save, data)
+        return file_name
+
+    def lesson_reader(self, level_num, file_name):
+        """
+        Get a function that reads one lesson of a level.
+
+        The corpus is opened here, so the returned function only reads files
+        and the memory map and may run on a worker thread.
+
+        Args:
+            level_num: Level number
+            file_name: Lesson file name
+
+        Returns:
+            callable: Returns the lesson text; raises FileNotFoundError if missing
+
+        Raises:
+            ValueError: If the level doesn't exist or has no such lesson
+        """
+        level_info = self.get_level_info(level_num)
+        if not level_info or file_name not in level_info.get('files', ()):
+            raise ValueError(f"No lesson {file_name} in level {level_num}")
+        if 'directory' in level_info:
+            return partial(self._read_lesson_file, os.path.join(level_info['directory'], file_name))
+        self._get_corpus()
+        return partial(self._read_builtin_lesson, file_name)
+
+    def marathon_readers(self, level_num):
+        """
+        Stream practice text for a marathon on a level, one piece at a time.
+
+        Built-in levels deal lessons from their shuffled bag without end, the
+        drill level generates drill after drill, and an imported text yields
+        its lessons in order and then ends. Each piece comes as a function
+        that reads it: which lesson comes next is decided as the stream is
+        advanced (on the caller's thread), while the functions only read
+        files and the drill index and may run on a worker thread.
+
+        Args:
+            level_num: Level number
+
+        Returns:
+            generator: Functions returning the text pieces (each after the
+            first starts with a newline)
+
+        Raises:
+            ValueError: If level doesn't exist
+        """
+        level_info = self.get_level_info(level_num)
+        if not level_info:
+            raise ValueError(f"Invalid level number: {level_num}")
+
+        if level_info.get('drill'):
+            def readers():
+                while True:
+                    yield self.drill_reader()
+        elif 'directory' in level_info:
+            def readers():
+                for file_name in level_info['files']:
+                    yield partial(self._read_lesson_file, os.path.join(level_info['directory'], file_name))
+        else:
+            def readers():
+                while True:
+                    yield self.lesson_reader(level_num, self.next_lesson(level_num))
+
+        def pieces():
+            separator = ''
+            for reader in readers():
+                yield partial(_marathon_piece, reader, separator)
+                separator = '\n'
+        return pieces()
+
+    def _read_builtin_lesson(self, file_name):
+        """
+        Read a bundled lesson, from the corpus when it is up to date.
+
+        Raises:
+            FileNotFoundError: If the lesson is in neither the corpus nor data/levels
+        """
+        file_path = get_resource_path(os.path.join('data', 'levels', file_name))
+
+        corpus = self._get_corpus()
+        if corpus is not None and file_name in corpus and self._corpus_is_current(file_path):
+            return corpus.read(file_name)
+
+        return self._read_lesson_file(file_path)
 
-        # Randomly choose one of the lesson files
-        chosen_file = random.choice(level_info['files'])
-        file_path = get_resource_path(os.path.join('data', 'levels', chosen_file))
+    def _read_lesson_file(self, file_path):
+        """
+        Read a loose lesson file.
 
+        Raises:
+            FileNotFoundError: If the file is missing
+        """
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
                 return f.read()
         except FileNotFoundError:
             raise FileNotFoundError(f"Level file not found: {file_path}")
 
+    def _corpus_is_current(self, file_path):
+        """
+        Check the corpus isn't older than a lesson file being edited in a checkout.
+
+        Args:
+            file_path: Path of the loose lesson file
+
+        Returns:
+            bool: True if the packed copy can be used
+        """
+        if getattr(sys, 'frozen', False):
+            return True
+        try:
+            return os.path.getmtime(file_path) <= os.path.getmtime(self._corpus.path)
+        except OSError:
+            return True
+
+    def drill_reader(self):
+        """
+        Get a function that generates a drill for the current weak keys.
+
+        The weak keys are picked here, so the returned function only reads
+        lesson files and the drill index and may run on a worker thread.
+
+        Returns:
+            callable: Returns the drill text; raises ValueError if there is
+            no lesson text to draw words from
+        """
+        return partial(self._generate_drill, self.analytics.weakest())
+
+    def _generate_drill(self, weakest):
+        """
+        Generate a drill weighted toward the weakest keys and bigrams.
+
+        Args:
+            weakest: KeyAnalytics.weakest() result
+
+        Raises:
+            ValueError: If there is no lesson text to draw words from
+        """
+        # Import here so the drill index isn't loaded until a drill is opened
+        from drill_generator import NgramIndex, generate_drill
+
+        with self._drill_lock:
+            if self._drill_index is None:
+                self._drill_index = NgramIndex(get_user_data_dir())
+                self._drill_index.load()
+            if self._drill_index.update(self._drill_sources()):
+                try:
+                    self._drill_index.save()
+                except OSError as e:
+                    print(f"Warning: Could not save drill index: {e}")
+            return generate_drill(self._drill_index, weakest)
+
+    def _drill_sources(self):
+        """
+        List the lesson sources feeding the drill index.
+
+        Returns:
+            list: (key, stamp, read_texts) tuples for NgramIndex.update
+        """
+        sources = []
+        for level_info in self.levels.values():
+            for file_name in level_info['files']:
+                stamp = self._lesson_stamp(file_name)
+                if stamp is not None:
+                    sources.append((f"levels/{file_name}", stamp,
+                                    partial(self._read_builtin_lessons, [file_name])))
+
+        for level_info in self.imported_levels.values():
+            directory = level_info['directory']
+            stamp = self._import_stamp(directory)
+            if stamp is None:
+                continue
+            files = level_info['files'][:self.DRILL_IMPORT_LESSONS]
+            sources.append((f"imports/{os.path.basename(directory)}", stamp,
+                            partial(self._read_import_lessons, directory, files)))
+        return sources
+
+    def _lesson_stamp(self, file_name):
+        """
+        Identify the current version of a bundled lesson.
+
+        Frozen builds extract lesson files afresh on every launch, so there the
+        corpus checksum is used instead of the file's modification time.
+
+        Returns:
+            list: Stamp that changes with the lesson's content, or None if missing
+        """
+        corpus = self._get_corpus()
+        if getattr(sys, 'frozen', False) and corpus is not None and file_name in corpus:
+            return [corpus.get_metadata(file_name)['sha1']]
+        try:
+            stat = os.stat(get_resource_path(os.path.join('data', 'levels', file_name)))
+        except OSError:
+            if corpus is not None and file_name in corpus:
+                return [corpus.get_metadata(file_name)['sha1']]
+            return None
+        return [stat.st_mtime_ns, stat.st_size]
+
+    def _read_builtin_lessons(self, file_names):
+        """Read bundled lessons for indexing."""
+        return [self._read_builtin_lesson(name) for name in file_names]
+
+    def _read_import_lessons(self, directory, file_names):
+        """Read an imported text's lessons for indexing."""
+        return [self._read_lesson_file(os.path.join(directory, name)) for name in file_names]
+
+    def _get_scorer(self):
+        """
+        Build the difficulty scorer for the bundled keyboard layout.
+
+        Returns:
+            DifficultyScorer: The scorer, or None if the layout can't be read
+            (difficulty then falls back to a character-class estimate)
+        """
+        try:
+            layout = load_layout(get_resource_path(os.path.join('data', 'keyboard_layout.json')))
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Warning: Could not load keyboard layout for difficulty scores: {e}")
+            return None
+        return DifficultyScorer(layout)
+
+    def _get_metadata_cache(self):
+        """The lesson metadata cache (call with the metadata lock held)."""
+        if self._metadata_cache is None:
+            self._metadata_cache = LessonMetadataCache(get_user_data_dir(), self._get_scorer())
+        return self._metadata_cache
+
+    def _save_metadata_cache(self):
+        """Write the metadata cache if it changed (call with the metadata lock held)."""
+        try:
+            self._metadata_cache.save()
+        except OSError as e:
+            print(f"Warning: Could not save lesson metadata: {e}")
+
+    @staticmethod
+    def _import_stamp(directory):
+        """
+        Stamp of an imported text's lessons.
+
+        Imports are written once and never modified, so their info file
+        stamps them.
+
+        Returns:
+            list: The info file's mtime and size, or None if it is missing
+        """
+        try:
+            stat = os.stat(os.path.join(directory, IMPORT_INFO_FILE))
+        except OSError:
+            return None
+        return [stat.st_mtime_ns, stat.st_size]
+
+    def get_lessons(self, level_num):
+        """
+        List a level's lessons with their metadata.
+
+        Metadata comes from the cache; only lessons that are new or changed
+        since they were last seen are read. That can take seconds for a
+        large import, so call this on a worker thread; one thread at a time
+        uses the cache.
+
+        Args:
+            level_num: Level number
+
+        Returns:
+            list: (file name, metadata dict) tuples; empty for the drill level
+        """
+        level_info = self.get_level_info(level_num)
+        if not level_info or level_info.get('drill'):
+            return []
+
+        lessons = []
+        directory = level_info.get('directory')
+        if directory is not None:
+            stamp = self._import_stamp(directory)
+            if stamp is None:
+                return []
+            prefix = f"imports/{os.path.basename(directory)}/"
+        with self._metadata_lock:
+            cache = self._get_metadata_cache()
+            for file_name in level_info['files']:
+                if directory is not None:
+                    key = prefix + file_name
+                    read_text = partial(self._read_lesson_file, os.path.join(directory, file_name))
+                    sha1 = None
+                else:
+                    stamp = self._lesson_stamp(file_name)
+                    if stamp is None:
+                        continue
+                    key = f"levels/{file_name}"
+                    read_text = partial(self._read_builtin_lesson, file_name)
+                    # A one-element stamp is the corpus checksum of the text
+                    sha1 = stamp[0] if len(stamp) == 1 else None
+                try:
+                    lessons.append((file_name, cache.get(key, stamp, read_text, sha1)))
+                except OSError as e:
+                    print(f"Warning: Could not read lesson {file_name}: {e}")
+            self._save_metadata_cache()
+            self._level_summaries[level_num] = _summarize(metadata for _, metadata in lessons)
+        return lessons
+
+    def record_import_metadata(self, directory, lessons):
+        """
+        Cache the metadata of lessons an import has just written.
+
+        The import computes it while writing each lesson and hands it over
+        in batches, so no lesson is read back. The lessons stay unstamped
+        (and are never matched) until finish_import_metadata(). May run on
+        a worker thread.
+
+        Args:
+            directory: Directory the import's lesson files end up in
+            lessons: (file name, text_sha1(), lesson_metadata()) tuples,
+                scored with metadata_scorer()
+        """
+        prefix = f"imports/{os.path.basename(directory)}/"
+        with self._metadata_lock:
+            cache = self._get_metadata_cache()
+            for file_name, sha1, metadata in lessons:
+                cache.put(prefix + file_name, None, sha1, metadata)
+
+    def discard_import_metadata(self, directory):
+        """Forget metadata recorded for an import that failed or was cancelled."""
+        prefix = f"imports/{os.path.basename(directory)}/"
+        with self._metadata_lock:
+            self._get_metadata_cache().forget(prefix)
+
+    def finish_import_metadata(self, level_num, directory, file_names):
+        """
+        Stamp and save the metadata recorded for a finished import.
+
+        Args:
+            level_num: Level number the import is registered as
+            directory: Directory holding the import's lesson files
+            file_names: The import's lesson file names
+        """
+        stamp = self._import_stamp(directory)
+        if stamp is None:
+            return
+        prefix = f"imports/{os.path.basename(directory)}/"
+        with self._metadata_lock:
+            cache = self._get_metadata_cache()
+            lessons = (cache.restamp(prefix + file_name, stamp) for file_name in file_names)
+            self._level_summaries[level_num] = _summarize(
+                metadata for metadata in lessons if metadata is not None)
+            self._save_metadata_cache()
+
+    def metadata_scorer(self):
+        """
+        The DifficultyScorer lesson metadata is computed with.
+
+        Reads the keyboard layout the first time, so call it on a worker thread.
+
+        Returns:
+            DifficultyScorer: The scorer, or None without a readable layout
+        """
+        with self._metadata_lock:
+            return self._get_metadata_cache().scorer
+
+    def get_level_summary(self, level_num, cached_only=False):
+        """
+        Summarize a level's lessons for the level selector.
+
+        Args:
+            level_num: Level number
+            cached_only: Only answer from summaries already worked out (by
+                get_lessons() or an import), without touching any file
+
+        Returns:
+            dict: lessons, avg_chars, avg_difficulty, min_difficulty and
+            max_difficulty, or None if the level has no readable lessons
+            (or, with cached_only, no summary yet)
+        """
+        if not cached_only:
+            self.get_lessons(level_num)
+        return self._level_summaries.get(level_num)
+
+    def load_level_summaries(self, level_nums):
+        """
+        Work out the summaries of several levels for get_level_summary().
+
+        Uncached lessons are read, so call this on a worker thread.
+
+        Returns:
+            dict: Summary (or None) keyed by level number
+        """
+        return {level_num: self.get_level_summary(level_num) for level_num in level_nums}
+
+    def find_lessons(self, level_nums=None, min_difficulty=None, max_difficulty=None,
+                     sort_by='difficulty', descending=False):
+        """
+        Filter and sort lessons across levels by their cached metadata.
+
+        Args:
+            level_nums: Levels to search (defaults to every level)
+            min_difficulty: Lowest difficulty to include
+            max_difficulty: Highest difficulty to include
+            sort_by: Metadata field to sort by (such as 'difficulty',
+                'finger_travel' or 'chars'), or None to keep level order
+            descending: Sort largest first
+
+        Returns:
+            list: (level number, file name, metadata dict) tuples
+        """
+        if level_nums is None:
+            level_nums = [level_num for level_num, _ in self.get_all_levels()]
+        found = []
+        for level_num in level_nums:
+            for file_name, metadata in self.get_lessons(level_num):
+                difficulty = metadata['difficulty']
+                if min_difficulty is not None and difficulty < min_difficulty:
+                    continue
+                if max_difficulty is not None and difficulty > max_difficulty:
+                    continue
+                found.append((level_num, file_name, metadata))
+        if sort_by is not None:
+            found.sort(key=lambda lesson: lesson[2].get(sort_by, 0), reverse=descending)
+        return found
+
     def get_all_levels(self):
         """
         Get list of all levels with their info.
@@ -112,33 +749,39 @@ class LevelManager:
         Returns:
             list: List of tuples (level_num, level_info)
         """
-        return sorted(self.LEVELS.items())
-
-    def _get_progress_path(self):
-        """Get path to progress file."""
-        home = os.path.expanduser('~')
-        progress_dir = os.path.join(home, '.typing_tutor')
-        os.makedirs(progress_dir, exist_ok=True)
-        return os.path.join(progress_dir, 'progress.json')
+        return (sorted(self.levels.items()) + [(self.DRILL_LEVEL, self.DRILL_INFO)]
+                + sorted(self.imported_levels.items()))
 
-    def _load_progress(self):
+    def read_progress(self):
         """
-        Load user progress from file.
+        Read user progress from the progress store.
+
+        Only the store is touched, so this may run on a worker thread (on
+        the same one as later saves, so the journal is read before it grows).
 
         Returns:
-            dict: Progress data
+            dict: Progress data keyed by int level number
         """
-        progress_path = self._get_progress_path()
-        if os.path.exists(progress_path):
-            try:
-                with open(progress_path, 'r') as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, IOError):
-                pass
+        return self.progress_store.load(self.levels.keys())
+
+    def set_progress(self, progress):
+        """
+        Take over progress returned by read_progress().
+
+        Results saved while it was being read are merged into it.
+
+        Args:
+            progress: Progress data keyed by int level number
+        """
+        for level_num, record in self.progress.items():
+            ProgressStore.apply(progress, level_num, record["best_wpm"],
+                                record["best_accuracy"], record["completed"])
+        self.progress = progress
+        self.progress_loaded = True
 
-        # Default progress structure
-        return {level: {"best_wpm": 0, "best_accuracy": 0, "completed": False}
-                for level in self.LEVELS.keys()}
+    def load_progress(self):
+        """Read user progress on this thread."""
+        self.set_progress(self.read_progress())
 
     def save_progress(self, level_num, wpm, accuracy, passed):
         """
@@ -150,27 +793,60 @@ class LevelManager:
             accuracy: Accuracy percentage
             passed: Whether the level was passed
         """
-        if level_num not in self.progress:
-            self.progress[level_num] = {"best_wpm": 0, "best_accuracy": 0, "completed": False}
+        ProgressStore.apply(self.progress, level_num, wpm, accuracy, passed)
+        # The write gets a copy to compact into, and none before the full
+        # progress is known (compacting a partial copy would lose results)
+        snapshot = None
+        if self.progress_loaded:
+            snapshot = {level: dict(record) for level, record in self.progress.items()}
+        self._write("progress", (OSError,), self.progress_store.append,
+                    level_num, wpm, accuracy, passed, snapshot)
+
+    def _write(self, what, errors, fn, *args):
+        """
+        Run a save through self.io if set, otherwise right away.
 
-        level_progress = self.progress[level_num]
+        Args:
+            what: What is being saved (for the warning if it fails)
+            errors: Exception types the save is expected to raise
+            fn: Function doing the save
+            *args: Arguments for fn
+        """
+        def report(e):
+            print(f"Warning: Could not save {what}: {e}")
 
-        # Update best scores
-        if wpm > level_progress["best_wpm"]:
-            level_progress["best_wpm"] = wpm
+        if self.io is not None:
+            self.io.write(fn, *args, on_error=report)
+            return
+        try:
+            fn(*args)
+        except errors as e:
+            report(e)
+
+    def get_history(self):
+        """
+        Get the session history database.
 
-        if accuracy > level_progress["best_accuracy"]:
-            level_progress["best_accuracy"] = accuracy
+        Returns:
+            SessionHistory: History store (opened on its first query)
+        """
+        if self._history is None:
+            # Import here so sqlite3 isn't loaded before the first session ends
+            from session_history import SessionHistory, HISTORY_FILE
+            self._history = SessionHistory(os.path.join(get_user_data_dir(), HISTORY_FILE))
+        return self._history
 
-        if passed:
-            level_progress["completed"] = True
+    def record_session(self, level_num, stats):
+        """
+        Add a finished session to the history.
 
-        # Save to file
-        try:
-            with open(self._get_progress_path(), 'w') as f:
-                json.dump(self.progress, f, indent=2)
-        except IOError as e:
-            print(f"Warning: Could not save progress: {e}")
+        Args:
+            level_num: Level number
+            stats: Keyword arguments for SessionHistory.record (wpm, accuracy, ...)
+        """
+        import sqlite3
+        self._write("session history", (sqlite3.Error, OSError),
+                    partial(self.get_history().record, level_num, **stats))
 
     def get_level_progress(self, level_num):
         """
@@ -182,4 +858,4 @@ class LevelManager:
         Returns:
             dict: Progress data
         """
-        return self.progress.get(level_num, {"best_wpm": 0, "best_accuracy": 0, "completed": False})
+        return self.progress.get(level_num, default_level_progress())
@@ -0,0 +1,65 @@
+"""
+Prefix-sum index of line start offsets for position <-> line lookups.
+"""
+from array import array
+from bisect import bisect_right
+
+
+class LineIndex:
+    """
+    Line start offsets of a text, built once in a single pass.
+
+    line_starts[i] is the character offset where line i begins, so it is the
+    prefix sum of (line length + 1) over the preceding lines. Mapping a
+    position to its line is a bisect (O(log n)); line spans are O(1).
+    """
+
+    def __init__(self, text):
+        starts = array('q', [0])
+        find = text.find
+        pos = find('\n')
+        while pos != -1:
+            starts.append(pos + 1)
+            pos = find('\n', pos + 1)
+        self.line_starts = starts
+        self.text_length = len(text)
+
+    @property
+    def line_count(self):
+        """Number of lines (a trailing newline starts an empty last line)."""
+        return len(self.line_starts)
+
+    def line_of(self, position):
+        """
+        Find the line containing a character position.
+
+        Args:
+            position: Character offset in the text
+
+        Returns:
+            int: Zero-based line number
+        """
+        return bisect_right(self.line_starts, position) - 1
+
+    def line_start(self, line):
+        """Character offset of the first character of a line."""
+        return self.line_starts[line]
+
+    def line_end(self, line):
+        """Character offset just past the last character of a line (before '\\n')."""
+        if line + 1 < len(self.line_starts):
+            return self.line_starts[line + 1] - 1
+        return self.text_length
+
+    def span(self, first_line, end_line):
+        """
+        Character range covering a run of lines.
+
+        Args:
+            first_line: First line of the run
+            end_line: Line after the last line of the run
+
+        Returns:
+            tuple: (start, end) offsets, excluding the final newline
+        """
+        return self.line_starts[first_line], self.line_end(end_line - 1)
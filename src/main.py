@@ -1,27 +1,79 @@
 """
 Typing Tutor Application - Main Entry Point
 """
+import os
 import sys
-from PySide6.QtWidgets import QApplication
-from level_manager import LevelManager
-from ui.main_window import MainWindow
+import time
+
+# Set to a file path to record startup timings (see benchmarks/bench_startup.py)
+STARTUP_PROBE_ENV = 'TYPETUTOR_STARTUP_PROBE'
+
+# Set to host:port to stream this seat's stats to a classroom server, and
+# optionally name the seat (defaults to the computer name)
+CLASSROOM_ENV = 'TYPETUTOR_CLASSROOM'
+SEAT_ENV = 'TYPETUTOR_SEAT'
+
+# Set to a file path to trace input-to-paint latency (shown with F12) and
+# write a Chrome trace there on exit
+LATENCY_TRACE_ENV = 'TYPETUTOR_LATENCY_TRACE'
+
+# Set to a file path to report every UI-thread block over 16 ms (printed,
+# and appended there as JSON lines)
+STALL_REPORT_ENV = 'TYPETUTOR_STALL_REPORT'
 
 
 def main():
     """Main application entry point."""
+    main_ns = time.time_ns()
+
+    # Qt and the application modules are imported here rather than at module
+    # level so the probe timestamp above covers them
+    from PySide6.QtWidgets import QApplication
     app = QApplication(sys.argv)
 
     # Set application style
     app.setStyle('Fusion')
 
+    from level_manager import LevelManager
+    from ui.main_window import MainWindow
+
     # Create level manager
     level_manager = LevelManager()
 
     # Create and show main window
     window = MainWindow(level_manager)
+
+    probe_path = os.environ.get(STARTUP_PROBE_ENV)
+    if probe_path:
+        from startup_probe import StartupProbe
+        window.startup_probe = StartupProbe(window, probe_path, main_ns)
+
+    latency_trace_path = os.environ.get(LATENCY_TRACE_ENV)
+    if latency_trace_path:
+        window.enable_latency_tracing(latency_trace_path, show_hud=True)
+
+    stall_report_path = os.environ.get(STALL_REPORT_ENV)
+    if stall_report_path:
+        window.enable_stall_detection(stall_report_path)
+
+    classroom_client = None
+    classroom_address = os.environ.get(CLASSROOM_ENV)
+    if classroom_address:
+        import socket
+        from classroom_client import ClassroomClient, parse_address
+        from ui.classroom_link import ClassroomLink
+        host, port = parse_address(classroom_address)
+        seat = os.environ.get(SEAT_ENV) or socket.gethostname()
+        classroom_client = ClassroomClient(host, port, seat)
+        window.classroom_link = ClassroomLink(window, classroom_client)
+        classroom_client.start()
+
     window.show()
 
-    sys.exit(app.exec())
+    exit_code = app.exec()
+    if classroom_client is not None:
+        classroom_client.stop()
+    sys.exit(exit_code)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,151 @@
+"""
+Endless "marathon" typing over text drawn lazily from a generator.
+
+A MarathonEngine is a TypingEngine whose text is a sliding window over a
+stream of pieces (lessons, drills, or the lessons of an imported book).
+Positions stay absolute across the whole marathon; the engine's text holds
+only the part from a little behind the cursor to LOOKAHEAD_CHARS ahead of
+it. As the typist moves on, text further than KEEP_BEHIND_CHARS behind the
+cursor is dropped at a line boundary, and the keystrokes typed against it
+are handed to a callback (to fold into key statistics) and dropped too.
+Memory therefore stays flat however long the marathon runs, while the
+counters behind WPM and accuracy cover all of it.
+"""
+import bisect
+from keystroke_log import KeystrokeLog
+from typing_engine import TypingEngine, KEY_CORRECT, KEY_COMPLETE
+
+LOOKAHEAD_CHARS = 4096
+KEEP_BEHIND_CHARS = 2048
+
+
+class MarathonEngine(TypingEngine):
+    """
+    Typing engine over an endless (or very long) stream of text.
+
+    source is an iterable of text pieces, read only as the typist needs
+    them; the marathon completes if it runs out. A source with a ready()
+    method (such as ReadAhead) is only advanced once ready() says its next
+    piece is in, so a keystroke never waits for a read: until the piece
+    arrives the window ends where the text read so far does, and
+    keystrokes past that end are ignored. on_retire, if given, is
+    called with (text, offset, KeystrokeLog) for each stretch of text
+    leaving the window, together with the keystrokes typed against it.
+    """
+
+    def __init__(self, source, target_wpm, on_retire=None,
+                 lookahead=LOOKAHEAD_CHARS, keep_behind=KEEP_BEHIND_CHARS):
+        super().__init__('', target_wpm)
+        self._source = iter(source)
+        self._ready = getattr(source, 'ready', None)  # None: pieces never keep anyone waiting
+        self.on_retire = on_retire
+        self.lookahead = lookahead
+        self.keep_behind = keep_behind
+        self.exhausted = False
+        self.window_shifts = 0  # Changes whenever text or text_offset does
+        self._retired_tail = ''  # Last retired character, for the boundary bigram
+        self._fill(lookahead)
+
+    def _fill(self, wanted):
+        """Read pieces until wanted characters lie ahead of the cursor."""
+        ahead = self.text_length - self.current_index
+        if ahead >= wanted or self.exhausted:
+            return
+        pieces = [self.text]
+        while ahead < wanted:
+            if self._ready is not None and not self._ready():
+                # Still being read; a later keystroke takes it
+                break
+            try:
+                piece = next(self._source)
+            except StopIteration:
+                self.exhausted = True
+                break
+            pieces.append(piece)
+            ahead += len(piece)
+        if len(pieces) > 1:
+            self.text = ''.join(pieces)
+            self.text_length = self.text_offset + len(self.text)
+            self.window_shifts += 1
+
+    def _retire(self):
+        """Drop text (and its keystrokes) far enough behind the cursor."""
+        behind = self.current_index - self.text_offset
+        if behind <= self.keep_behind * 2:
+            return
+        cut = self.text.rfind('\n', 0, behind - self.keep_behind) + 1
+        if cut <= 0:
+            return
+        cut_position = self.text_offset + cut
+
+        # Positions only move forward, so the retired keystrokes are a prefix of the log
+        log = self.keystrokes
+        count = bisect.bisect_left(log.view().positions, cut_position)
+        retired = KeystrokeLog(count)
+        retired.extend(*log.view(0, count))
+        kept = KeystrokeLog(len(log) - count)
+        kept.extend(*log.view(count))
+        self.keystrokes = kept
+
+        if self.on_retire is not None and count:
+            tail = self._retired_tail
+            self.on_retire(tail + self.text[:cut], self.text_offset - len(tail), retired)
+        self._retired_tail = self.text[cut - 1]
+        self.text = self.text[cut:]
+        self.text_offset = cut_position
+        self.window_shifts += 1
+
+    def _slide(self, wanted=0):
+        """Keep the window a bounded stretch around the cursor."""
+        if self.text_length - self.current_index < max(wanted, self.lookahead // 2):
+            self._retire()
+            self._fill(max(wanted, self.lookahead))
+
+    @property
+    def waiting(self):
+        """True while the typist has reached the end of the text read so far."""
+        return self.current_index >= self.text_length and not self.exhausted
+
+    def is_complete(self):
+        """Return True once the source has run out and all of it has been typed."""
+        return self.exhausted and super().is_complete()
+
+    def process_keystroke(self, char):
+        """
+        Process a keystroke, sliding the window along.
+
+        Returns:
+            int: As TypingEngine.process_keystroke(), or None if the
+            keystroke was ignored because the text ahead is still being read
+        """
+        if self.waiting:
+            self._slide()
+            if self.waiting:
+                return None
+        result = super().process_keystroke(char)
+        if result in (KEY_CORRECT, KEY_COMPLETE):
+            self._slide()
+            # Reaching the end of the window only completes a finished source
+            result = KEY_COMPLETE if self.is_complete() else KEY_CORRECT
+        return result
+
+    def process_keystrokes(self, chars, timestamps=None):
+        # Make sure a long run can't reach the end of the window early
+        self._slide(len(chars) + 1)
+        if self.waiting:
+            return None, 0
+        result, count = super().process_keystrokes(chars, timestamps)
+        if result in (KEY_CORRECT, KEY_COMPLETE):
+            self._slide()
+            result = KEY_COMPLETE if self.is_complete() else KEY_CORRECT
+        return result, count
+
+    def remaining_keystrokes(self):
+        """
+        Keystrokes not yet handed to on_retire, with the text they were typed against.
+
+        Returns:
+            tuple: (text, offset, KeystrokeLog)
+        """
+        tail = self._retired_tail
+        return tail + self.text, self.text_offset - len(tail), self.keystrokes
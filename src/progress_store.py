@@ -0,0 +1,181 @@
+"""
+Journaled progress storage: an atomic snapshot plus an append-only journal.
+
+Each saved result is appended to progress.journal as one JSON line and
+fsynced, so a save costs O(1) regardless of history size. On load the
+snapshot (progress.json) is read and the journal replayed over it. Once the
+journal reaches COMPACT_THRESHOLD entries the merged state is written to a
+temporary file, atomically swapped in as the new snapshot and the journal is
+truncated. Replaying an entry twice is harmless (best scores only go up), so
+a crash between those two steps loses nothing.
+"""
+import json
+import os
+
+SNAPSHOT_FILE = 'progress.json'
+JOURNAL_FILE = 'progress.journal'
+COMPACT_THRESHOLD = 256
+
+
+def default_level_progress():
+    """Progress record for a level that has never been played."""
+    return {"best_wpm": 0, "best_accuracy": 0, "completed": False}
+
+
+class ProgressStore:
+    """Best-score store per level backed by a snapshot and a journal."""
+
+    def __init__(self, directory, compact_threshold=COMPACT_THRESHOLD):
+        self.directory = directory
+        self.snapshot_path = os.path.join(directory, SNAPSHOT_FILE)
+        self.journal_path = os.path.join(directory, JOURNAL_FILE)
+        self.compact_threshold = compact_threshold
+        self.journal_entries = 0
+        self._journal_torn = False
+        self._directory_ready = False
+
+    def load(self, level_nums=()):
+        """
+        Load the snapshot and replay the journal.
+
+        Args:
+            level_nums: Levels to include even if they have no progress yet
+
+        Returns:
+            dict: Progress keyed by int level number
+        """
+        progress = {level: default_level_progress() for level in level_nums}
+
+        try:
+            with open(self.snapshot_path, 'r') as f:
+                snapshot = json.load(f)
+            for level, record in snapshot.items():
+                if not isinstance(record, dict):
+                    # Hand-edited or damaged entry; the other levels are intact
+                    continue
+                # JSON object keys are strings; levels are ints everywhere else
+                progress[int(level)] = dict(default_level_progress(), **record)
+        except (OSError, ValueError, AttributeError) as e:
+            if os.path.exists(self.snapshot_path):
+                print(f"Warning: Could not read progress snapshot: {e}")
+
+        self.journal_entries = 0
+        self._journal_torn = False
+        try:
+            with open(self.journal_path, 'r') as f:
+                for line in f:
+                    self._journal_torn = not line.endswith('\n')
+                    try:
+                        entry = json.loads(line)
+                        if not isinstance(entry, dict):
+                            continue
+                        self.apply(progress, int(entry['level']), entry['wpm'],
+                                   entry['accuracy'], entry['passed'])
+                    except (ValueError, KeyError, TypeError):
+                        # Torn write from a crash; the other entries are intact
+                        continue
+                    self.journal_entries += 1
+        except OSError:
+            pass
+
+        if self.journal_entries >= self.compact_threshold:
+            self.compact(progress)
+        return progress
+
+    @staticmethod
+    def apply(progress, level_num, wpm, accuracy, passed):
+        """
+        Merge one session result into a progress dictionary.
+
+        Returns:
+            dict: The level's updated progress record
+        """
+        level_progress = progress.setdefault(level_num, default_level_progress())
+        if wpm > level_progress["best_wpm"]:
+            level_progress["best_wpm"] = wpm
+        if accuracy > level_progress["best_accuracy"]:
+            level_progress["best_accuracy"] = accuracy
+        if passed:
+            level_progress["completed"] = True
+        return level_progress
+
+    def record(self, progress, level_num, wpm, accuracy, passed):
+        """
+        Apply a session result and durably append it to the journal.
+
+        Args:
+            progress: Progress dictionary returned by load()
+            level_num: Level number
+            wpm: Words per minute achieved
+            accuracy: Accuracy percentage
+            passed: Whether the level was passed
+
+        Raises:
+            OSError: If the journal could not be written
+        """
+        self.apply(progress, level_num, wpm, accuracy, passed)
+        self.append(level_num, wpm, accuracy, passed, progress)
+
+    def append(self, level_num, wpm, accuracy, passed, progress=None):
+        """
+        Durably append a session result to the journal.
+
+        Unlike record() this leaves the progress dictionary alone, so it can
+        run on a worker thread against a copy while the UI keeps its own.
+
+        Args:
+            level_num: Level number
+            wpm: Words per minute achieved
+            accuracy: Accuracy percentage
+            passed: Whether the level was passed
+            progress: Complete progress dictionary (including this result)
+                to compact into once the journal is long enough; None skips
+                compaction
+
+        Raises:
+            OSError: If the journal could not be written
+        """
+        line = json.dumps({"level": level_num, "wpm": wpm,
+                           "accuracy": accuracy, "passed": passed}) + '\n'
+        if self._journal_torn:
+            # Terminate a torn line so this entry starts on its own line
+            line = '\n' + line
+        self._ensure_directory()
+        with open(self.journal_path, 'a') as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+        self._journal_torn = False
+        self.journal_entries += 1
+
+        if progress is not None and self.journal_entries >= self.compact_threshold:
+            self.compact(progress)
+
+    def compact(self, progress):
+        """
+        Write the merged state as the new snapshot and empty the journal.
+
+        Args:
+            progress: Complete progress dictionary
+        """
+        self._ensure_directory()
+        tmp_path = self.snapshot_path + '.tmp'
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump({str(level): record for level, record in progress.items()}, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.snapshot_path)
+            # Only now is it safe to drop the journal
+            with open(self.journal_path, 'w'):
+                pass
+            self.journal_entries = 0
+            self._journal_torn = False
+        except OSError as e:
+            print(f"Warning: Could not compact progress: {e}")
+
+    def _ensure_directory(self):
+        """Create the storage directory once per process."""
+        if not self._directory_ready:
+            os.makedirs(self.directory, exist_ok=True)
+            self._directory_ready = True
@@ -0,0 +1,84 @@
+"""
+Rolling and burst WPM over a ring buffer of recent correct-key timestamps.
+"""
+from array import array
+
+NS_PER_MINUTE = 60 * 1_000_000_000
+
+
+class RollingWpm:
+    """
+    Live typing speed over the last few seconds and the last few characters.
+
+    One fixed-size ring buffer of correct-character timestamps serves both
+    windows, and every update is O(1) (the time-window tail only moves
+    forward, so expiring old entries is amortized O(1) as well).
+    """
+
+    def __init__(self, window_seconds=10.0, window_chars=50, capacity=512):
+        self.window_ns = int(window_seconds * 1_000_000_000)
+        self.window_chars = window_chars
+        self.capacity = max(capacity, window_chars + 1)
+        self._times = array('q', bytes(8 * self.capacity))
+        self.reset(0)
+
+    def reset(self, start_ns):
+        """
+        Clear all samples.
+
+        Args:
+            start_ns: Session start (perf_counter_ns) used until a window fills
+        """
+        self.start_ns = start_ns
+        self._count = 0  # Characters added since reset
+        self._tail = 0   # Absolute index of the oldest char in the time window
+        self.char_wpm = 0.0
+        self.burst_wpm = 0.0
+
+    def add(self, timestamp_ns):
+        """
+        Record a correctly typed character.
+
+        Args:
+            timestamp_ns: perf_counter_ns of the keystroke
+        """
+        capacity = self.capacity
+        self._times[self._count % capacity] = timestamp_ns
+        self._count += 1
+        if self._count - self._tail > capacity:
+            self._tail = self._count - capacity
+
+        # Speed over the last window_chars characters
+        if self._count > self.window_chars:
+            chars = self.window_chars
+            oldest = self._times[(self._count - 1 - chars) % capacity]
+        else:
+            chars = self._count
+            oldest = self.start_ns
+        span = timestamp_ns - oldest
+        if span > 0:
+            self.char_wpm = (chars / 5.0) / (span / NS_PER_MINUTE)
+            # Burst speed only counts once a full character window exists
+            if chars == self.window_chars and self.char_wpm > self.burst_wpm:
+                self.burst_wpm = self.char_wpm
+
+    def time_wpm(self, now_ns):
+        """
+        Speed over the last window_seconds.
+
+        Args:
+            now_ns: Current perf_counter_ns
+
+        Returns:
+            float: WPM within the time window (0 if no time elapsed)
+        """
+        cutoff = now_ns - self.window_ns
+        times = self._times
+        capacity = self.capacity
+        while self._tail < self._count and times[self._tail % capacity] <= cutoff:
+            self._tail += 1
+
+        elapsed = min(self.window_ns, now_ns - self.start_ns)
+        if elapsed <= 0:
+            return 0.0
+        return ((self._count - self._tail) / 5.0) / (elapsed / NS_PER_MINUTE)
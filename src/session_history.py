@@ -0,0 +1,307 @@
+"""
+Session history in a local SQLite database with incrementally kept aggregates.
+
+Every finished session is stored as one row. In the same transaction, the
+per-day and per-ISO-week rollups for its level are updated. A personal-best
+row is added whenever the session beats the level's (or the overall) best
+WPM. Dashboards read the rollup tables, which grow with days and weeks
+played rather than with sessions, so they never rescan raw sessions.
+"""
+import datetime
+import os
+import sqlite3
+import sys
+import time
+
+HISTORY_FILE = 'history.sqlite3'
+SCHEMA_VERSION = 1
+
+# personal_bests.level value for records across all levels
+ALL_LEVELS = 0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    finished_at REAL NOT NULL,
+    level INTEGER NOT NULL,
+    duration_s REAL NOT NULL,
+    wpm REAL NOT NULL,
+    accuracy REAL NOT NULL,
+    burst_wpm REAL NOT NULL,
+    chars INTEGER NOT NULL,
+    keystrokes INTEGER NOT NULL,
+    errors INTEGER NOT NULL,
+    passed INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_level ON sessions (level, finished_at);
+
+CREATE TABLE IF NOT EXISTS daily_stats (
+    period TEXT NOT NULL,
+    level INTEGER NOT NULL,
+    sessions INTEGER NOT NULL,
+    passed INTEGER NOT NULL,
+    wpm_sum REAL NOT NULL,
+    accuracy_sum REAL NOT NULL,
+    best_wpm REAL NOT NULL,
+    chars INTEGER NOT NULL,
+    duration_s REAL NOT NULL,
+    PRIMARY KEY (period, level)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS weekly_stats (
+    period TEXT NOT NULL,
+    level INTEGER NOT NULL,
+    sessions INTEGER NOT NULL,
+    passed INTEGER NOT NULL,
+    wpm_sum REAL NOT NULL,
+    accuracy_sum REAL NOT NULL,
+    best_wpm REAL NOT NULL,
+    chars INTEGER NOT NULL,
+    duration_s REAL NOT NULL,
+    PRIMARY KEY (period, level)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS personal_bests (
+    level INTEGER NOT NULL,
+    finished_at REAL NOT NULL,
+    wpm REAL NOT NULL,
+    session_id INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS personal_bests_level ON personal_bests (level, finished_at);
+"""
+
+_ROLLUP_UPSERT = """
+INSERT INTO {table} (period, level, sessions, passed, wpm_sum, accuracy_sum,
+                     best_wpm, chars, duration_s)
+VALUES (?, ?, 1, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (period, level) DO UPDATE SET
+    sessions = sessions + 1,
+    passed = passed + excluded.passed,
+    wpm_sum = wpm_sum + excluded.wpm_sum,
+    accuracy_sum = accuracy_sum + excluded.accuracy_sum,
+    best_wpm = MAX(best_wpm, excluded.best_wpm),
+    chars = chars + excluded.chars,
+    duration_s = duration_s + excluded.duration_s
+"""
+
+_ROLLUP_TABLES = {'day': 'daily_stats', 'week': 'weekly_stats'}
+
+
+def day_key(timestamp):
+    """Local calendar day of a Unix timestamp, as YYYY-MM-DD."""
+    return datetime.date.fromtimestamp(timestamp).isoformat()
+
+
+def week_key(timestamp):
+    """ISO week of a Unix timestamp (local time), as YYYY-Www."""
+    year, week, _ = datetime.date.fromtimestamp(timestamp).isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+class SessionHistory:
+    """Append-only session log with day/week rollups and personal-best curves."""
+
+    def __init__(self, path):
+        self.path = path
+        self._connection = None
+
+    def _connect(self):
+        """Open (creating if needed) the database on first use."""
+        if self._connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # Sessions may be recorded from a worker thread and queried from the UI thread
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            connection.row_factory = sqlite3.Row
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            version = connection.execute('PRAGMA user_version').fetchone()[0]
+            if version > SCHEMA_VERSION:
+                connection.close()
+                raise sqlite3.DatabaseError(f"history schema {version} is newer than supported")
+            with connection:
+                connection.executescript(_SCHEMA)
+                connection.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+            self._connection = connection
+        return self._connection
+
+    def close(self):
+        """Close the database connection."""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def record(self, level, wpm, accuracy, burst_wpm=0.0, duration_s=0.0, chars=0,
+               keystrokes=0, errors=0, passed=False, finished_at=None):
+        """
+        Store a finished session and fold it into the rollups.
+
+        Args:
+            level: Level number
+            wpm: Words per minute achieved
+            accuracy: Accuracy percentage
+            burst_wpm: Best burst speed during the session
+            duration_s: Time from first to last keystroke
+            chars: Characters in the lesson
+            keystrokes: Keys pressed
+            errors: Incorrect keys pressed
+            passed: Whether the level was passed
+            finished_at: Unix timestamp (defaults to now)
+
+        Returns:
+            int: The new session's id
+
+        Raises:
+            sqlite3.Error: If the database can't be written
+        """
+        if finished_at is None:
+            finished_at = time.time()
+        connection = self._connect()
+        with connection:
+            session_id = connection.execute(
+                'INSERT INTO sessions (finished_at, level, duration_s, wpm, accuracy, burst_wpm, '
+                'chars, keystrokes, errors, passed) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (finished_at, level, duration_s, wpm, accuracy, burst_wpm,
+                 chars, keystrokes, errors, int(passed))).lastrowid
+            self._apply(connection, session_id, finished_at, level, wpm, accuracy,
+                        chars, duration_s, passed)
+        return session_id
+
+    @staticmethod
+    def _apply(connection, session_id, finished_at, level, wpm, accuracy, chars, duration_s, passed):
+        """Update the rollups and personal bests for one session."""
+        values = (int(passed), wpm, accuracy, wpm, chars, duration_s)
+        connection.execute(_ROLLUP_UPSERT.format(table='daily_stats'),
+                           (day_key(finished_at), level) + values)
+        connection.execute(_ROLLUP_UPSERT.format(table='weekly_stats'),
+                           (week_key(finished_at), level) + values)
+
+        for scope in (level, ALL_LEVELS):
+            best = connection.execute('SELECT MAX(wpm) FROM personal_bests WHERE level = ?',
+                                      (scope,)).fetchone()[0]
+            if best is None or wpm > best:
+                connection.execute('INSERT INTO personal_bests (level, finished_at, wpm, session_id) '
+                                   'VALUES (?, ?, ?, ?)', (scope, finished_at, wpm, session_id))
+
+    def rebuild_aggregates(self):
+        """Recompute every rollup and personal best from the raw sessions."""
+        connection = self._connect()
+        with connection:
+            connection.execute('DELETE FROM daily_stats')
+            connection.execute('DELETE FROM weekly_stats')
+            connection.execute('DELETE FROM personal_bests')
+            rows = connection.execute('SELECT id, finished_at, level, wpm, accuracy, chars, '
+                                      'duration_s, passed FROM sessions ORDER BY finished_at, id')
+            for row in rows.fetchall():
+                self._apply(connection, row['id'], row['finished_at'], row['level'], row['wpm'],
+                            row['accuracy'], row['chars'], row['duration_s'], row['passed'])
+
+    def session_count(self, level=None):
+        """Number of stored sessions, optionally for one level."""
+        if level is None:
+            query, params = 'SELECT COUNT(*) FROM sessions', ()
+        else:
+            query, params = 'SELECT COUNT(*) FROM sessions WHERE level = ?', (level,)
+        return self._connect().execute(query, params).fetchone()[0]
+
+    def recent_sessions(self, limit=20, level=None):
+        """
+        Most recent sessions, newest first.
+
+        Returns:
+            list: Session dicts
+        """
+        where, params = ('', ()) if level is None else ('WHERE level = ?', (level,))
+        rows = self._connect().execute(
+            f'SELECT * FROM sessions {where} ORDER BY finished_at DESC, id DESC LIMIT ?',
+            params + (limit,))
+        return [dict(row) for row in rows]
+
+    def averages(self, period='day', level=None, start=None, end=None):
+        """
+        Per-day or per-week averages from the rollups.
+
+        Args:
+            period: 'day' or 'week'
+            level: Limit to one level (default: all levels combined)
+            start: First period key to include (YYYY-MM-DD or YYYY-Www)
+            end: Last period key to include
+
+        Returns:
+            list: Dicts with period, sessions, passed, avg_wpm, avg_accuracy,
+            best_wpm, chars and minutes, oldest first
+        """
+        table = _ROLLUP_TABLES[period]
+        conditions = []
+        params = []
+        if level is not None:
+            conditions.append('level = ?')
+            params.append(level)
+        if start is not None:
+            conditions.append('period >= ?')
+            params.append(start)
+        if end is not None:
+            conditions.append('period <= ?')
+            params.append(end)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+
+        rows = self._connect().execute(
+            f'SELECT period, SUM(sessions) AS sessions, SUM(passed) AS passed, '
+            f'SUM(wpm_sum) AS wpm_sum, SUM(accuracy_sum) AS accuracy_sum, '
+            f'MAX(best_wpm) AS best_wpm, SUM(chars) AS chars, SUM(duration_s) AS duration_s '
+            f'FROM {table} {where} GROUP BY period ORDER BY period', params)
+        return [{
+            'period': row['period'],
+            'sessions': row['sessions'],
+            'passed': row['passed'],
+            'avg_wpm': row['wpm_sum'] / row['sessions'],
+            'avg_accuracy': row['accuracy_sum'] / row['sessions'],
+            'best_wpm': row['best_wpm'],
+            'chars': row['chars'],
+            'minutes': row['duration_s'] / 60.0,
+        } for row in rows]
+
+    def level_trend(self, level, period='week'):
+        """Average WPM and accuracy of one level over time (see averages())."""
+        return self.averages(period, level=level)
+
+    def personal_bests(self, level=None):
+        """
+        Personal-best curve: every session that set a new best WPM.
+
+        Args:
+            level: Level number (default: across all levels)
+
+        Returns:
+            list: Dicts with finished_at, wpm and session_id, oldest first
+        """
+        scope = ALL_LEVELS if level is None else level
+        rows = self._connect().execute(
+            'SELECT finished_at, wpm, session_id FROM personal_bests '
+            'WHERE level = ? ORDER BY finished_at, wpm', (scope,))
+        return [dict(row) for row in rows]
+
+
+def main():
+    """Print a summary of a history database (default: the user's)."""
+    path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(
+        os.path.expanduser('~'), '.typing_tutor', HISTORY_FILE)
+    if not os.path.exists(path):
+        print(f"No history at {path}")
+        return
+    history = SessionHistory(path)
+    print(f"{history.session_count()} sessions in {path}")
+    print(f"{'week':<10}{'sessions':>10}{'avg wpm':>10}{'avg acc':>10}{'best':>8}{'minutes':>10}")
+    for row in history.averages('week')[-12:]:
+        print(f"{row['period']:<10}{row['sessions']:>10}{row['avg_wpm']:>10.1f}"
+              f"{row['avg_accuracy']:>10.1f}{row['best_wpm']:>8.1f}{row['minutes']:>10.1f}")
+    bests = history.personal_bests()
+    if bests:
+        latest = bests[-1]
+        print(f"Personal best: {latest['wpm']:.1f} WPM on {day_key(latest['finished_at'])}")
+    history.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+"""
+Detection of stalls on the UI thread.
+
+The UI thread calls heartbeat() from a short repeating timer. A gap between
+two beats well beyond the timer interval means the thread was blocked (in
+file I/O, a long computation, a slow repaint) and its event loop couldn't
+run. While the thread is stuck, a watchdog thread samples its stack once,
+so a stall reported afterwards names the code that caused it. Any block
+longer than the threshold, 16 ms (one frame at 60 Hz) by default, is
+recorded and handed to a callback.
+"""
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque, namedtuple
+
+STALL_THRESHOLD_MS = 16
+MAX_STALLS = 200
+STACK_DEPTH = 12
+
+# A block of the watched thread: when it began (time.time_ns()), how long
+# it lasted, and where the thread was during it (innermost frame last;
+# empty if the watchdog didn't catch it)
+Stall = namedtuple('Stall', ['start_ns', 'duration_ms', 'stack'])
+
+_APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def stall_location(stall):
+    """
+    The innermost frame of a stall's stack in the application's own code.
+
+    Returns:
+        str: "file.py:line in function", or "unknown" without a stack
+    """
+    for filename, lineno, name in reversed(stall.stack):
+        if os.path.abspath(filename).startswith(_APP_DIR):
+            return f"{os.path.relpath(filename, _APP_DIR)}:{lineno} in {name}"
+    if stall.stack:
+        filename, lineno, name = stall.stack[-1]
+        return f"{os.path.basename(filename)}:{lineno} in {name}"
+    return "unknown"
+
+
+class StallDetector:
+    """
+    Reports blocks of one thread longer than threshold_ms.
+
+    Create it on the thread to watch, call start(), then heartbeat() every
+    interval_ms (half the threshold by default) from that thread's event
+    loop. on_stall, if given, is called with each Stall from heartbeat(),
+    i.e. on the watched thread once it runs again.
+    """
+
+    def __init__(self, threshold_ms=STALL_THRESHOLD_MS, interval_ms=None, on_stall=None,
+                 max_stalls=MAX_STALLS):
+        if interval_ms is None:
+            interval_ms = threshold_ms / 2
+        self.threshold_ns = int(threshold_ms * 1e6)
+        self.interval_ns = int(interval_ms * 1e6)
+        self.on_stall = on_stall
+        self.stalls = deque(maxlen=max_stalls)  # Most recent stalls
+        self.count = 0
+        self.worst_ms = 0.0
+
+        self._thread_id = threading.get_ident()
+        self._last_beat = None  # perf_counter_ns() of the last heartbeat
+        self._beats = 0
+        self._sample = None  # (beat count, stack) taken by the watchdog
+        self._stop = threading.Event()
+        self._watchdog = None
+
+    def start(self):
+        """Start the watchdog; the first heartbeat starts the measuring."""
+        if self._watchdog is not None:
+            return
+        self._stop.clear()
+        self._watchdog = threading.Thread(target=self._watch, name='stall-watchdog', daemon=True)
+        self._watchdog.start()
+
+    def stop(self):
+        """Stop the watchdog; a later start() measures afresh."""
+        if self._watchdog is None:
+            return
+        self._stop.set()
+        self._watchdog.join()
+        self._watchdog = None
+        self._last_beat = None
+
+    def heartbeat(self):
+        """
+        Note that the watched thread is running (call from its event loop).
+
+        Returns:
+            Stall: The block that ended with this beat, or None
+        """
+        now = time.perf_counter_ns()
+        last = self._last_beat
+        sample = self._sample
+        self._last_beat = now
+        beats = self._beats
+        self._beats = beats + 1
+        if last is None:
+            return None
+
+        blocked = now - last - self.interval_ns
+        if blocked <= self.threshold_ns:
+            return None
+        stack = sample[1] if sample is not None and sample[0] == beats else []
+        start_ns = time.time_ns() - (now - last - self.interval_ns)
+        stall = Stall(start_ns, blocked / 1e6, stack)
+        self.stalls.append(stall)
+        self.count += 1
+        self.worst_ms = max(self.worst_ms, stall.duration_ms)
+        if self.on_stall is not None:
+            self.on_stall(stall)
+        return stall
+
+    def _watch(self):
+        """Sample the watched thread's stack once per stall (watchdog thread)."""
+        poll_s = self.threshold_ns / 2e9
+        sampled = None
+        while not self._stop.wait(poll_s):
+            last, beats = self._last_beat, self._beats
+            if last is None or beats == sampled:
+                continue
+            if time.perf_counter_ns() - last - self.interval_ns <= self.threshold_ns:
+                continue
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is None:
+                continue
+            summary = traceback.extract_stack(frame)[-STACK_DEPTH:]
+            del frame
+            # Tagged with the beat it follows, so a late sample can't be
+            # pinned on the next stall
+            self._sample = (beats, [(entry.filename, entry.lineno, entry.name) for entry in summary])
+            sampled = beats
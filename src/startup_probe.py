@@ -0,0 +1,71 @@
+"""
+Startup timing probe used by benchmarks/bench_startup.py.
+
+Milestones are recorded with time.time_ns() so the launching process can
+compare them with the moment it spawned the app. Once the window is ready
+the probe types the lesson's first character itself, and as soon as that
+keystroke is accepted it writes the timings as JSON and quits.
+"""
+import json
+import sys
+import time
+from PySide6.QtCore import Qt, QObject, QEvent, QCoreApplication, QTimer
+from PySide6.QtGui import QKeyEvent
+
+# Keys the main window maps to characters by key code rather than text
+_SPECIAL_KEYS = {'\n': Qt.Key_Return, '\t': Qt.Key_Tab}
+
+
+class StartupProbe(QObject):
+    """Records startup milestones for one launch of the main window."""
+
+    def __init__(self, window, result_path, main_ns):
+        super().__init__(window)
+        self.window = window
+        self.result_path = result_path
+        self.session = None
+        self.marks = {'main': main_ns, 'window_created': time.time_ns()}
+
+        window.installEventFilter(self)
+        window.startup_finished.connect(self._on_startup_finished)
+
+    def eventFilter(self, obj, event):
+        """Note when the window receives its first paint."""
+        if event.type() == QEvent.Paint and 'first_paint' not in self.marks:
+            self.marks['first_paint'] = time.time_ns()
+        return False
+
+    def _on_startup_finished(self):
+        """Type the first character of the loaded lesson."""
+        self.marks['ready'] = time.time_ns()
+        self.session = self.window.current_session
+        if self.session is None:
+            self._finish('no lesson loaded')
+            return
+
+        char = self.session.engine.get_current_char()
+        self.session.stats_updated.connect(self._on_stats_updated)
+        event = QKeyEvent(QEvent.KeyPress, _SPECIAL_KEYS.get(char, 0), Qt.NoModifier, char)
+        QCoreApplication.postEvent(self.window, event)
+
+    def _on_stats_updated(self, wpm, accuracy, char_count):
+        """Stop at the first keystroke the session accepted as correct."""
+        if self.session.correct_chars:
+            self.marks['first_keystroke'] = time.time_ns()
+            self.session.stats_updated.disconnect(self._on_stats_updated)
+            self._finish()
+
+    def _finish(self, error=None):
+        """Write the results and quit the application."""
+        result = {
+            'frozen': bool(getattr(sys, 'frozen', False)),
+            'marks': self.marks,
+        }
+        if error:
+            result['error'] = error
+        try:
+            with open(self.result_path, 'w', encoding='utf-8') as f:
+                json.dump(result, f)
+        except OSError as e:
+            print(f"Warning: Could not write startup probe results: {e}")
+        QTimer.singleShot(0, QCoreApplication.quit)
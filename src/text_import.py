@@ -0,0 +1,303 @@
+"""
+Streaming import of arbitrary text files into practice lessons.
+
+The pipeline is a chain of generators, so only one read chunk and the
+lesson being assembled are ever in memory:
+
+    read_chunks -> normalize_newlines -> normalize_chars -> iter_lines -> split_lessons
+"""
+import codecs
+import json
+import os
+import re
+import shutil
+import unicodedata
+from collections.abc import Sequence
+
+READ_CHUNK_SIZE = 64 * 1024
+TAB_WIDTH = 4
+LESSON_TARGET_CHARS = 1500
+MAX_LINE_CHARS = 200
+IMPORT_INFO_FILE = 'import.json'
+
+# Typographic characters that have a plain keyboard equivalent
+TYPOGRAPHY = {
+    '\u2018': "'", '\u2019': "'", '\u201a': "'", '\u2032': "'",
+    '\u201c': '"', '\u201d': '"', '\u201e': '"', '\u00ab': '"', '\u00bb': '"',
+    '\u2010': '-', '\u2011': '-', '\u2012': '-', '\u2013': '-', '\u2014': '--', '\u2212': '-',
+    '\u2026': '...', '\u2022': '*', '\u00b7': '*', '\u00d7': 'x',
+    '\u00a0': ' ', '\u2002': ' ', '\u2003': ' ', '\u2009': ' ', '\u202f': ' ',
+}
+
+
+class ImportCancelled(Exception):
+    """Raised from a progress callback to stop an import."""
+
+
+class _CharMapper(dict):
+    """
+    str.translate table that resolves each codepoint once, on first sight.
+
+    Supported characters map to themselves; others map to a typographic
+    replacement, their accent-stripped form, or nothing.
+    """
+
+    def __init__(self, supported_chars, tab_width):
+        super().__init__()
+        self.supported_chars = supported_chars
+        self[ord('\t')] = ' ' * tab_width
+        self[ord('\n')] = '\n'
+
+    def __missing__(self, codepoint):
+        char = chr(codepoint)
+        if char in self.supported_chars:
+            value = char
+        else:
+            value = TYPOGRAPHY.get(char)
+            if value is None:
+                decomposed = unicodedata.normalize('NFKD', char)
+                value = ''.join(c for c in decomposed if c in self.supported_chars)
+        self[codepoint] = value
+        return value
+
+
+def read_chunks(path, chunk_size=READ_CHUNK_SIZE, progress=None):
+    """
+    Incrementally decode a file as UTF-8 (invalid bytes are replaced).
+
+    Args:
+        path: File to read
+        chunk_size: Bytes read per step
+        progress: Optional callback(bytes_read, total_bytes)
+
+    Yields:
+        str: Decoded text chunks
+    """
+    total = os.path.getsize(path)
+    decoder = codecs.getincrementaldecoder('utf-8-sig')(errors='replace')
+    done = 0
+    with open(path, 'rb') as f:
+        while True:
+            data = f.read(chunk_size)
+            if not data:
+                break
+            done += len(data)
+            text = decoder.decode(data)
+            if progress is not None:
+                progress(done, total)
+            if text:
+                yield text
+    tail = decoder.decode(b'', final=True)
+    if tail:
+        yield tail
+
+
+def normalize_newlines(chunks):
+    """
+    Convert CRLF and lone CR line endings to LF, including across chunk edges.
+
+    Yields:
+        str: Chunks containing only '\\n' line breaks
+    """
+    pending_cr = False
+    for chunk in chunks:
+        if pending_cr:
+            chunk = '\r' + chunk
+        pending_cr = chunk.endswith('\r')
+        if pending_cr:
+            chunk = chunk[:-1]
+        yield chunk.replace('\r\n', '\n').replace('\r', '\n')
+    if pending_cr:
+        yield '\n'
+
+
+def normalize_chars(chunks, supported_chars, tab_width=TAB_WIDTH):
+    """
+    Expand tabs and replace characters the keyboard can't type.
+
+    Args:
+        chunks: Iterable of text chunks
+        supported_chars: Characters with a key mapping
+        tab_width: Spaces per tab
+
+    Yields:
+        str: Typable chunks
+    """
+    table = _CharMapper(supported_chars, tab_width)
+    for chunk in chunks:
+        yield chunk.translate(table)
+
+
+def iter_lines(chunks, max_line_chars=MAX_LINE_CHARS):
+    """
+    Split a chunk stream into lines with trailing whitespace removed.
+
+    Lines longer than max_line_chars are wrapped at the last space (or cut),
+    so a file without newlines can't build up an unbounded line.
+
+    Yields:
+        str: Lines without their newline
+    """
+    remainder = ''
+    for chunk in chunks:
+        lines = (remainder + chunk).split('\n')
+        remainder = lines.pop()
+        for line in lines:
+            yield from _wrap(line.rstrip(), max_line_chars)
+        while len(remainder) > max_line_chars:
+            cut = remainder.rfind(' ', 0, max_line_chars + 1)
+            if cut <= 0:
+                cut = max_line_chars
+            yield remainder[:cut].rstrip()
+            remainder = remainder[cut:].lstrip(' ')
+    if remainder:
+        yield from _wrap(remainder.rstrip(), max_line_chars)
+
+
+def _wrap(line, max_line_chars):
+    """Break a line into pieces of at most max_line_chars at spaces."""
+    while len(line) > max_line_chars:
+        cut = line.rfind(' ', 0, max_line_chars + 1)
+        if cut <= 0:
+            cut = max_line_chars
+        yield line[:cut].rstrip()
+        line = line[cut:].lstrip(' ')
+    yield line
+
+
+def split_lessons(lines, target_chars=LESSON_TARGET_CHARS):
+    """
+    Group lines into lessons of roughly target_chars.
+
+    Lessons end at a blank line once the target is reached, or at any line
+    past twice the target. Runs of blank lines collapse to one.
+
+    Yields:
+        str: Lesson text
+    """
+    current = []
+    size = 0
+    blank = True
+    for line in lines:
+        if not line:
+            if blank:
+                continue
+            blank = True
+            if size >= target_chars:
+                yield '\n'.join(current)
+                current = []
+                size = 0
+                continue
+        else:
+            blank = False
+
+        current.append(line)
+        size += len(line) + 1
+        if size >= 2 * target_chars:
+            yield '\n'.join(current).rstrip('\n')
+            current = []
+            size = 0
+            blank = True
+
+    text = '\n'.join(current).rstrip('\n')
+    if text:
+        yield text
+
+
+def import_text(path, dest_dir, supported_chars, target_chars=LESSON_TARGET_CHARS,
+                progress=None, metadata=None, on_lesson=None):
+    """
+    Import a text file as a set of lesson files.
+
+    Lessons are written to a temporary directory that is renamed into place
+    only when the import succeeds.
+
+    Args:
+        path: Source file
+        dest_dir: Directory to create for the lessons
+        supported_chars: Characters with a key mapping
+        target_chars: Approximate lesson length
+        progress: Optional callback(bytes_read, total_bytes); may raise ImportCancelled
+        metadata: Extra entries stored in the import info
+        on_lesson: Optional callback(file_name, text) for each lesson written
+
+    Returns:
+        dict: Import info (name, source, lessons)
+
+    Raises:
+        OSError: If the source can't be read or lessons can't be written
+        ImportCancelled: If the progress callback cancelled the import
+    """
+    tmp_dir = dest_dir + '.partial'
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    try:
+        chunks = read_chunks(path, progress=progress)
+        chunks = normalize_chars(normalize_newlines(chunks), supported_chars)
+        count = 0
+        for lesson in split_lessons(iter_lines(chunks), target_chars):
+            count += 1
+            file_name = lesson_file_name(count)
+            with open(os.path.join(tmp_dir, file_name), 'w', encoding='utf-8') as f:
+                f.write(lesson)
+            if on_lesson is not None:
+                on_lesson(file_name, lesson)
+
+        info = {
+            'name': os.path.splitext(os.path.basename(path))[0],
+            'source': os.path.abspath(path),
+            'lessons': count,
+        }
+        info.update(metadata or {})
+        with open(os.path.join(tmp_dir, IMPORT_INFO_FILE), 'w', encoding='utf-8') as f:
+            json.dump(info, f)
+
+        os.replace(tmp_dir, dest_dir)
+        return info
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+
+def lesson_file_name(number):
+    """File name of the n-th (1-based) lesson of an import."""
+    return f"lesson_{number:05d}.txt"
+
+
+class LessonFileNames(Sequence):
+    """
+    File names of an import's lessons, generated on access.
+
+    Large imports hold thousands of lessons; this avoids building the whole
+    list for every imported level at startup.
+    """
+
+    def __init__(self, count):
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.count))]
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError('lesson index out of range')
+        return lesson_file_name(index + 1)
+
+
+def import_dir_name(source_path):
+    """
+    Directory-safe name for an import of a file.
+
+    Args:
+        source_path: File being imported
+
+    Returns:
+        str: Slug derived from the file name
+    """
+    stem = os.path.splitext(os.path.basename(source_path))[0]
+    return re.sub(r'[^A-Za-z0-9_-]+', '_', stem).strip('_') or 'import'
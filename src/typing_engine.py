@@ -0,0 +1,229 @@
+"""
+Qt-free typing engine: position tracking, counters and WPM/accuracy math.
+"""
+import time
+from array import array
+from keystroke_log import KeystrokeLog
+from rolling_wpm import RollingWpm, NS_PER_MINUTE
+
+
+# Results returned by TypingEngine.process_keystroke
+KEY_CORRECT = 0
+KEY_INCORRECT = 1
+KEY_COMPLETE = 2
+
+
+class TypingEngine:
+    """Core typing state machine shared by the UI session and the benchmarks."""
+
+    def __init__(self, text, target_wpm):
+        self.text = text
+        self.target_wpm = target_wpm
+        # Position of text[0]; non-zero when text is a window of a longer stream
+        self.text_offset = 0
+        self.text_length = len(text)  # End position of text
+        self.current_index = 0
+        self.correct_chars = 0
+        self.total_keystrokes = 0
+        self.start_ns = None  # perf_counter_ns of the first keystroke
+        self.keystrokes = KeystrokeLog()
+        self.rolling = RollingWpm()
+
+    def start(self, timestamp_ns=None):
+        """
+        Start (or restart) timing and reset all counters.
+
+        Args:
+            timestamp_ns: perf_counter_ns to start from (defaults to now)
+        """
+        if timestamp_ns is None:
+            timestamp_ns = time.perf_counter_ns()
+        self.start_ns = timestamp_ns
+        self.rolling.reset(timestamp_ns)
+        self.current_index = 0
+        self.correct_chars = 0
+        self.total_keystrokes = 0
+        # Fresh log, so views of a previous session's log stay intact
+        self.keystrokes = KeystrokeLog()
+
+    def process_keystroke(self, char):
+        """
+        Compare a typed character against the text and advance on a match.
+
+        Args:
+            char: Character typed by the user
+
+        Returns:
+            int: KEY_CORRECT, KEY_INCORRECT or KEY_COMPLETE
+        """
+        now = time.perf_counter_ns()
+        if self.start_ns is None:
+            # The clock starts with the first keystroke, not when the text appears
+            self.start(now)
+
+        self.total_keystrokes += 1
+        position = self.current_index
+        correct = char == self.text[position - self.text_offset]
+        self.keystrokes.append(now, position, ord(char[0]), correct)
+
+        if correct:
+            self.rolling.add(now)
+            self.correct_chars += 1
+            self.current_index += 1
+            if self.current_index >= self.text_length:
+                return KEY_COMPLETE
+            return KEY_CORRECT
+
+        # Error is in the log; don't advance
+        return KEY_INCORRECT
+
+    def process_keystrokes(self, chars, timestamps=None):
+        """
+        Process a run of typed characters (IME commit, burst or replay) in one pass.
+
+        The outcome is the same as calling process_keystroke() for each
+        character in turn, but the keystroke log is extended once and a run
+        that matches the text outright is compared with a single string test.
+        Characters after the one completing the text are ignored.
+
+        Args:
+            chars: Typed characters
+            timestamps: perf_counter_ns per character (default: now for all)
+
+        Returns:
+            tuple: (result of the last processed character, number processed),
+            or (None, 0) for an empty run
+        """
+        if not chars:
+            return None, 0
+        if timestamps is None:
+            timestamps = [time.perf_counter_ns()] * len(chars)
+        if self.start_ns is None:
+            self.start(timestamps[0])
+
+        text = self.text
+        offset = self.text_offset
+        position = self.current_index
+        remaining = self.text_length - position
+        count = len(chars)
+
+        if count <= remaining and text.startswith(chars, position - offset):
+            # Everything matches: no per-character comparison needed
+            positions = range(position, position + count)
+            correct = bytes([1]) * count
+            correct_times = timestamps[:count]
+        else:
+            positions = array('I')
+            correct = bytearray()
+            correct_times = []
+            count = 0
+            for char, timestamp in zip(chars, timestamps):
+                count += 1
+                positions.append(position)
+                if char == text[position - offset]:
+                    correct.append(1)
+                    correct_times.append(timestamp)
+                    position += 1
+                    if position >= self.text_length:
+                        break
+                else:
+                    correct.append(0)
+
+        self.keystrokes.extend(timestamps[:count], positions,
+                               [ord(char) for char in chars[:count]], correct)
+        add = self.rolling.add
+        for timestamp in correct_times:
+            add(timestamp)
+        self.total_keystrokes += count
+        self.correct_chars += len(correct_times)
+        self.current_index += len(correct_times)
+
+        if self.current_index >= self.text_length:
+            return KEY_COMPLETE, count
+        return (KEY_CORRECT if correct[count - 1] else KEY_INCORRECT), count
+
+    @property
+    def errors(self):
+        """Mistyped keys as position/expected/typed dicts (built from the log)."""
+        return self.keystrokes.errors(self.text, self.text_offset)
+
+    def is_complete(self):
+        """Return True once every character of the text has been typed."""
+        return self.current_index >= self.text_length
+
+    def calculate_wpm(self):
+        """
+        Calculate words per minute.
+
+        Returns:
+            float: Current WPM (0 if no time elapsed)
+        """
+        if self.start_ns is None:
+            return 0.0
+
+        elapsed_minutes = (time.perf_counter_ns() - self.start_ns) / NS_PER_MINUTE
+        if elapsed_minutes <= 0:
+            return 0.0
+
+        # Standard WPM: characters / 5 / minutes
+        return (self.correct_chars / 5.0) / elapsed_minutes
+
+    def duration_seconds(self):
+        """
+        Time from the first to the most recent keystroke.
+
+        Returns:
+            float: Seconds (0 before the first keystroke)
+        """
+        count = len(self.keystrokes)
+        if self.start_ns is None or count == 0:
+            return 0.0
+        return (self.keystrokes.timestamps[count - 1] - self.start_ns) / 1e9
+
+    def calculate_rolling_wpm(self):
+        """
+        Calculate live WPM over the last 10 seconds.
+
+        Returns:
+            float: Rolling WPM (0 before the first keystroke)
+        """
+        if self.start_ns is None:
+            return 0.0
+        return self.rolling.time_wpm(time.perf_counter_ns())
+
+    def calculate_burst_wpm(self):
+        """
+        Peak speed over any 50 consecutive correct characters.
+
+        Returns:
+            float: Burst WPM (0 until 50 characters have been typed)
+        """
+        return self.rolling.burst_wpm
+
+    def calculate_accuracy(self):
+        """
+        Calculate typing accuracy.
+
+        Returns:
+            float: Accuracy percentage (100 if no keystrokes)
+        """
+        if self.total_keystrokes == 0:
+            return 100.0
+
+        return (self.correct_chars / self.total_keystrokes) * 100.0
+
+    def has_passed(self, wpm, accuracy):
+        """Pass criteria: target WPM + 95% accuracy."""
+        return wpm >= self.target_wpm and accuracy >= 95.0
+
+    def get_current_char(self):
+        """Get the current character to type."""
+        if self.current_index < self.text_length:
+            return self.text[self.current_index - self.text_offset]
+        return ''
+
+    def get_next_char(self):
+        """Get the next character after current."""
+        if self.current_index + 1 < self.text_length:
+            return self.text[self.current_index + 1 - self.text_offset]
+        return ''
@@ -2,34 +2,57 @@
 Typing session management with WPM and accuracy tracking.
 """
 from PySide6.QtCore import QObject, Signal
-import time
+from typing_engine import TypingEngine, KEY_CORRECT, KEY_COMPLETE
 
 
 class TypingSession(QObject):
-    """Manages typing session state, statistics, and progression."""
+    """Qt wrapper that turns TypingEngine results into signals."""
 
     # Signals
     char_changed = Signal(str, str)  # current_char, next_char
     stats_updated = Signal(float, float, int)  # wpm, accuracy, char_count
     session_complete = Signal(bool)  # passed
 
-    def __init__(self, text, target_wpm):
+    def __init__(self, text, target_wpm, engine=None):
         super().__init__()
-        self.text = text
-        self.target_wpm = target_wpm
-        self.current_index = 0
-        self.correct_chars = 0
-        self.total_keystrokes = 0
-        self.start_time = None
-        self.errors = []
+        # A prepared engine (such as a MarathonEngine) replaces text and target_wpm
+        self.engine = engine if engine is not None else TypingEngine(text, target_wpm)
+
+    @property
+    def text(self):
+        return self.engine.text
+
+    @property
+    def text_length(self):
+        return self.engine.text_length
+
+    @property
+    def target_wpm(self):
+        return self.engine.target_wpm
+
+    @property
+    def current_index(self):
+        return self.engine.current_index
+
+    @property
+    def correct_chars(self):
+        return self.engine.correct_chars
+
+    @property
+    def total_keystrokes(self):
+        return self.engine.total_keystrokes
+
+    @property
+    def start_ns(self):
+        return self.engine.start_ns
+
+    @property
+    def errors(self):
+        return self.engine.errors
 
     def start(self):
         """Start the typing session."""
-        self.start_time = time.time()
-        self.current_index = 0
-        self.correct_chars = 0
-        self.total_keystrokes = 0
-        self.errors = []
+        self.engine.start()
         self._emit_current_char()
 
     def process_keystroke(self, char):
@@ -39,43 +62,58 @@ class TypingSession(QObject):
         Args:
             char: Character typed by the user
         """
-        if self.start_time is None:
+        if self.engine.start_ns is None:
             self.start()
 
-        self.total_keystrokes += 1
-        expected_char = self.text[self.current_index]
+        result = self.engine.process_keystroke(char)
 
-        if char == expected_char:
-            self.correct_chars += 1
-            self.current_index += 1
+        if result == KEY_COMPLETE:
+            self._finish_session()
+            return
 
-            # Check if session is complete
-            if self.current_index >= len(self.text):
-                self._finish_session()
-                return
+        if result == KEY_CORRECT:
+            self._emit_current_char()
+
+        self._update_stats()
+
+    def process_keystrokes(self, chars, timestamps=None):
+        """
+        Process a run of typed characters with one consolidated update.
+
+        Counters and the keystroke log end up as if each character had been
+        typed separately, but char_changed and stats_updated are emitted
+        once for the whole run.
 
+        Args:
+            chars: Characters typed (for example an input method commit)
+            timestamps: Optional perf_counter_ns per character
+        """
+        if not chars:
+            return
+        if self.engine.start_ns is None:
+            self.start()
+
+        index = self.engine.current_index
+        result, _ = self.engine.process_keystrokes(chars, timestamps)
+
+        if result == KEY_COMPLETE:
+            self._finish_session()
+            return
+
+        if self.engine.current_index != index:
             self._emit_current_char()
-        else:
-            # Track error but don't advance
-            self.errors.append({
-                'position': self.current_index,
-                'expected': expected_char,
-                'typed': char
-            })
 
         self._update_stats()
 
     def _emit_current_char(self):
         """Emit signal for current and next character."""
-        current = self.text[self.current_index] if self.current_index < len(self.text) else ''
-        next_char = self.text[self.current_index + 1] if self.current_index + 1 < len(self.text) else ''
-        self.char_changed.emit(current, next_char)
+        self.char_changed.emit(self.engine.get_current_char(), self.engine.get_next_char())
 
     def _update_stats(self):
         """Calculate and emit current statistics."""
-        wpm = self.calculate_wpm()
-        accuracy = self.calculate_accuracy()
-        self.stats_updated.emit(wpm, accuracy, self.current_index)
+        wpm = self.engine.calculate_wpm()
+        accuracy = self.engine.calculate_accuracy()
+        self.stats_updated.emit(wpm, accuracy, self.engine.current_index)
 
     def calculate_wpm(self):
         """
@@ -84,15 +122,25 @@ class TypingSession(QObject):
         Returns:
             float: Current WPM (0 if no time elapsed)
         """
-        if self.start_time is None:
-            return 0.0
+        return self.engine.calculate_wpm()
 
-        elapsed_minutes = (time.time() - self.start_time) / 60.0
-        if elapsed_minutes == 0:
-            return 0.0
+    def calculate_rolling_wpm(self):
+        """
+        Calculate live WPM over the last 10 seconds.
 
-        # Standard WPM: characters / 5 / minutes
-        return (self.correct_chars / 5.0) / elapsed_minutes
+        Returns:
+            float: Rolling WPM
+        """
+        return self.engine.calculate_rolling_wpm()
+
+    def calculate_burst_wpm(self):
+        """
+        Peak speed over any 50 consecutive correct characters.
+
+        Returns:
+            float: Burst WPM
+        """
+        return self.engine.calculate_burst_wpm()
 
     def calculate_accuracy(self):
         """
@@ -101,29 +149,18 @@ class TypingSession(QObject):
         Returns:
             float: Accuracy percentage (100 if no keystrokes)
         """
-        if self.total_keystrokes == 0:
-            return 100.0
-
-        return (self.correct_chars / self.total_keystrokes) * 100.0
+        return self.engine.calculate_accuracy()
 
     def _finish_session(self):
         """Complete the session and check if user passed."""
-        wpm = self.calculate_wpm()
-        accuracy = self.calculate_accuracy()
-
-        # Pass criteria: target WPM + 95% accuracy
-        passed = wpm >= self.target_wpm and accuracy >= 95.0
-
-        self.session_complete.emit(passed)
+        wpm = self.engine.calculate_wpm()
+        accuracy = self.engine.calculate_accuracy()
+        self.session_complete.emit(self.engine.has_passed(wpm, accuracy))
 
     def get_current_char(self):
         """Get the current character to type."""
-        if self.current_index < len(self.text):
-            return self.text[self.current_index]
-        return ''
+        return self.engine.get_current_char()
 
     def get_next_char(self):
         """Get the next character after current."""
-        if self.current_index + 1 < len(self.text):
-            return self.text[self.current_index + 1]
-        return ''
+        return self.engine.get_next_char()
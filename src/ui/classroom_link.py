@@ -0,0 +1,37 @@
+"""
+Bridge from the main window's typing sessions to a classroom client.
+"""
+from PySide6.QtCore import QObject
+
+
+class ClassroomLink(QObject):
+    """Forwards each session's stats and completion to a ClassroomClient."""
+
+    def __init__(self, window, client):
+        super().__init__(window)
+        self.client = client
+        window.session_started.connect(self._on_session_started)
+
+    def _on_session_started(self, session, level_num):
+        """
+        Follow a newly loaded session.
+
+        The handlers are bound to this session rather than swapped on the next
+        one: finishing a lesson loads the next before every slot of
+        session_complete has run, and the old session is discarded anyway.
+        """
+        session.stats_updated.connect(
+            lambda wpm, accuracy, char_count: self._on_stats_updated(
+                session, level_num, wpm, accuracy, char_count))
+        session.session_complete.connect(
+            lambda passed: self._on_session_complete(session, level_num, passed))
+        self.client.post_stats(level_num, 0.0, 100.0, 0, session.text_length)
+
+    def _on_stats_updated(self, session, level_num, wpm, accuracy, char_count):
+        """Hand the latest stats to the client (it sends at most one per batch)."""
+        self.client.post_stats(level_num, wpm, accuracy, char_count, session.text_length)
+
+    def _on_session_complete(self, session, level_num, passed):
+        """Queue the finished session for the server."""
+        self.client.post_complete(level_num, session.calculate_wpm(),
+                                  session.calculate_accuracy(), passed)
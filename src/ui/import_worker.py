@@ -0,0 +1,80 @@
+"""
+Background import of custom practice texts.
+"""
+from PySide6.QtCore import QObject, Signal
+from text_import import import_text, ImportCancelled, LessonFileNames
+from level_catalog import lesson_metadata, text_sha1
+
+# Lessons whose metadata is handed to the LevelManager at once
+METADATA_BATCH = 500
+
+
+class ImportWorker(QObject):
+    """
+    Runs text_import.import_text on a worker thread, reporting progress.
+
+    Given a LevelManager, it also computes each lesson's metadata as the
+    lesson is written and caches it there in batches of METADATA_BATCH,
+    so listing or summarizing the new level reads no lesson back.
+    """
+
+    progress = Signal(int)  # percent of source bytes read
+    finished = Signal(str, object)  # lesson directory, import info
+    failed = Signal(str)  # error message
+    cancelled = Signal()
+
+    def __init__(self, source_path, dest_dir, supported_chars, metadata=None, level_manager=None):
+        super().__init__()
+        self.source_path = source_path
+        self.dest_dir = dest_dir
+        self.supported_chars = frozenset(supported_chars)
+        self.metadata = metadata
+        self.level_manager = level_manager
+        self._cancel_requested = False
+        self._last_percent = -1
+
+    def run(self):
+        """Import the file; emits exactly one of finished, failed or cancelled."""
+        lessons = []
+        on_lesson = None
+        if self.level_manager is not None:
+            scorer = self.level_manager.metadata_scorer()
+
+            def on_lesson(file_name, text):
+                lessons.append((file_name, text_sha1(text), lesson_metadata(text, scorer)))
+                if len(lessons) >= METADATA_BATCH:
+                    self.level_manager.record_import_metadata(self.dest_dir, lessons)
+                    lessons.clear()
+        try:
+            info = import_text(self.source_path, self.dest_dir, self.supported_chars,
+                               progress=self._report_progress, metadata=self.metadata,
+                               on_lesson=on_lesson)
+        except ImportCancelled:
+            self._discard_metadata()
+            self.cancelled.emit()
+        except (OSError, UnicodeError) as e:
+            self._discard_metadata()
+            self.failed.emit(str(e))
+        else:
+            if self.level_manager is not None:
+                self.level_manager.record_import_metadata(self.dest_dir, lessons)
+                self.level_manager.finish_import_metadata(info.get('level'), self.dest_dir,
+                                                          LessonFileNames(info['lessons']))
+            self.finished.emit(self.dest_dir, info)
+
+    def _discard_metadata(self):
+        if self.level_manager is not None:
+            self.level_manager.discard_import_metadata(self.dest_dir)
+
+    def cancel(self):
+        """Ask the import to stop at the next chunk (safe from any thread)."""
+        self._cancel_requested = True
+
+    def _report_progress(self, done, total):
+        """Progress callback: emit only when the percentage changes."""
+        if self._cancel_requested:
+            raise ImportCancelled()
+        percent = int(done * 100 / total) if total else 100
+        if percent != self._last_percent:
+            self._last_percent = percent
+            self.progress.emit(percent)
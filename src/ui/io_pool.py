@@ -0,0 +1,100 @@
+"""
+Blocking file work run off the GUI thread.
+
+Reads (lessons, the keyboard layout, key statistics) run on a small thread
+pool. Writes (progress, history, key statistics, ghosts) run one at a time,
+in the order they were submitted, on a single-thread lane, so a later save
+never lands before an earlier one. Results come back through a queued signal, so every
+callback runs on the GUI thread.
+"""
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+
+READ_THREADS = 2
+
+
+class _IoTask(QRunnable):
+    """Runs one function on a pool thread and reports back through a signal."""
+
+    def __init__(self, finished, fn, args, on_done, on_error):
+        super().__init__()
+        self.finished = finished
+        self.fn = fn
+        self.args = args
+        self.on_done = on_done
+        self.on_error = on_error
+
+    def run(self):
+        try:
+            result, error = self.fn(*self.args), None
+        except Exception as e:
+            # Anything the work raises belongs to the caller, not this thread
+            result, error = None, e
+        self.finished.emit(self, result, error)
+
+
+class IoPool(QObject):
+    """
+    Thread pools for blocking file reads and ordered writes.
+
+    on_done receives the function's result and on_error the exception it
+    raised; both are called on the GUI thread. A failed write without an
+    on_error is reported as a warning.
+    """
+
+    _finished = Signal(object, object, object)  # _IoTask, result, exception or None
+
+    def __init__(self, parent=None, read_threads=READ_THREADS):
+        super().__init__(parent)
+        self.pending = 0
+
+        self._reads = QThreadPool(self)
+        self._reads.setMaxThreadCount(read_threads)
+        self._writes = QThreadPool(self)
+        self._writes.setMaxThreadCount(1)
+        # Emitted on a pool thread, delivered on this object's thread
+        self._finished.connect(self._on_finished)
+
+    def read(self, fn, *args, on_done=None, on_error=None):
+        """
+        Run a read on the read pool (reads may run concurrently).
+
+        Args:
+            fn: Function to call on a pool thread
+            *args: Arguments for fn
+            on_done: Called with fn's result
+            on_error: Called with the exception if fn raised one
+        """
+        self._start(self._reads, fn, args, on_done, on_error)
+
+    def write(self, fn, *args, on_done=None, on_error=None):
+        """
+        Queue a write on the write lane, after every write queued before it.
+
+        Args:
+            fn: Function to call on the write thread
+            *args: Arguments for fn (pass copies of anything the GUI thread
+                keeps changing)
+            on_done: Called with fn's result
+            on_error: Called with the exception if fn raised one
+        """
+        self._start(self._writes, fn, args, on_done, on_error)
+
+    def _start(self, pool, fn, args, on_done, on_error):
+        self.pending += 1
+        pool.start(_IoTask(self._finished, fn, args, on_done, on_error))
+
+    def _on_finished(self, task, result, error):
+        self.pending -= 1
+        if error is None:
+            if task.on_done is not None:
+                task.on_done(result)
+        elif task.on_error is not None:
+            task.on_error(error)
+        else:
+            print(f"Warning: Background file operation failed: {error}")
+
+    def shutdown(self):
+        """Drop queued reads and wait for running reads and every queued write."""
+        self._reads.clear()
+        self._reads.waitForDone()
+        self._writes.waitForDone()
@@ -0,0 +1,82 @@
+"""
+On-screen overlay with live input-to-paint latency percentiles.
+"""
+from PySide6.QtWidgets import QLabel
+from PySide6.QtCore import Qt, QTimer
+from PySide6.QtGui import QFont
+from latency_trace import (INPUT_TO_PAINT, KEY_EVENT, QUEUE_WAIT, HANDLERS,
+                           HIGHLIGHT, KEYBOARD_PAINT, FRAME)
+
+REFRESH_MS = 500
+MARGIN = 8
+
+# Rows shown in the overlay: (stage, label)
+_ROWS = (
+    (INPUT_TO_PAINT, 'input→paint'),
+    (KEY_EVENT, 'key event'),
+    (QUEUE_WAIT, 'frame wait'),
+    (HANDLERS, 'handlers'),
+    (HIGHLIGHT, 'highlight'),
+    (KEYBOARD_PAINT, 'kbd paint'),
+    (FRAME, 'repaint'),
+)
+
+
+class LatencyHud(QLabel):
+    """
+    Semi-transparent panel in the window's top-right corner.
+
+    It refreshes on its own timer rather than per keystroke, so it adds only
+    one small repaint every REFRESH_MS to what it measures.
+    """
+
+    def __init__(self, window, tracer):
+        super().__init__(window)
+        self.main_window = window
+        self.tracer = tracer
+        self.setFont(QFont("Courier New", 9))
+        self.setStyleSheet("background-color: rgba(0, 0, 0, 170); color: #E8E4D9; padding: 6px;")
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.setFocusPolicy(Qt.NoFocus)
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(REFRESH_MS)
+        self._timer.timeout.connect(self.refresh)
+        self._shown_inputs = None
+        self.hide()
+
+    def set_active(self, active):
+        """Show and start refreshing, or hide and stop."""
+        if active:
+            self._shown_inputs = None
+            self.refresh()
+            self.show()
+            self.raise_()
+            self._timer.start()
+        else:
+            self._timer.stop()
+            self.hide()
+
+    def refresh(self):
+        """Redraw the percentiles if new keystrokes were measured."""
+        if self.tracer.inputs == self._shown_inputs:
+            return
+        self._shown_inputs = self.tracer.inputs
+
+        lines = [f"{'ms':<12}{'p50':>7}{'p99':>7}{'max':>7}"]
+        summary = self.tracer.summary()
+        for stage, label in _ROWS:
+            figures = summary.get(stage)
+            if figures is None:
+                lines.append(f"{label:<12}{'-':>7}{'-':>7}{'-':>7}")
+            else:
+                lines.append(f"{label:<12}{figures['p50_ms']:>7.2f}{figures['p99_ms']:>7.2f}"
+                             f"{figures['max_ms']:>7.1f}")
+        lines.append(f"{self.tracer.inputs} keys")
+        self.setText('\n'.join(lines))
+        self.adjustSize()
+        self.place()
+
+    def place(self):
+        """Keep the panel in the top-right corner of the window."""
+        self.move(self.main_window.width() - self.width() - MARGIN, MARGIN)
@@ -0,0 +1,104 @@
+"""
+Background prefetch of upcoming lessons.
+"""
+from collections import namedtuple
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+from line_index import LineIndex
+
+# A lesson read ahead of time, with its line index already built
+PrefetchedLesson = namedtuple('PrefetchedLesson', ['file_name', 'text', 'line_index'])
+
+
+class _PrefetchTask(QRunnable):
+    """Reads one lesson on a pool thread and reports back through a signal."""
+
+    def __init__(self, loaded, level_num, file_name, reader):
+        super().__init__()
+        self.loaded = loaded
+        self.level_num = level_num
+        self.file_name = file_name
+        self.reader = reader
+
+    def run(self):
+        try:
+            text = self.reader()
+            lesson = PrefetchedLesson(self.file_name, text, LineIndex(text))
+        except (OSError, ValueError, UnicodeError) as e:
+            print(f"Warning: Could not prefetch lesson {self.file_name}: {e}")
+            lesson = None
+        self.loaded.emit(self.level_num, self.file_name, lesson)
+
+
+class LessonPrefetcher(QObject):
+    """
+    Keeps the next lesson of a few levels read and indexed in memory.
+
+    Reads run one at a time on a private thread pool; take() hands a
+    finished lesson over so loading it needs no disk access. At most one
+    lesson is kept per level.
+    """
+
+    _loaded = Signal(object, str, object)  # level number, file name, PrefetchedLesson or None
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._lessons = {}  # level number -> PrefetchedLesson
+        self._pending = {}  # level number -> file name being read
+        self.hits = 0
+        self.misses = 0
+
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+        # Emitted on the pool thread, delivered on this object's thread
+        self._loaded.connect(self._on_loaded)
+
+    def request(self, level_num, file_name, reader):
+        """
+        Read a lesson ahead unless it is already held or on its way.
+
+        Args:
+            level_num: Level the lesson belongs to
+            file_name: Lesson file name
+            reader: Function returning the text (called on a pool thread)
+        """
+        held = self._lessons.get(level_num)
+        if (held is not None and held.file_name == file_name) or self._pending.get(level_num) == file_name:
+            return
+        self._lessons.pop(level_num, None)
+        self._pending[level_num] = file_name
+        self._pool.start(_PrefetchTask(self._loaded, level_num, file_name, reader))
+
+    def take(self, level_num, file_name):
+        """
+        Hand over a prefetched lesson.
+
+        Returns:
+            PrefetchedLesson: The lesson, or None if it isn't ready (the
+            caller reads it itself)
+        """
+        lesson = self._lessons.get(level_num)
+        if lesson is None or lesson.file_name != file_name:
+            self.misses += 1
+            return None
+        del self._lessons[level_num]
+        self.hits += 1
+        return lesson
+
+    def retain(self, level_nums):
+        """Drop prefetched lessons of every level not listed."""
+        for level_num in list(self._lessons):
+            if level_num not in level_nums:
+                del self._lessons[level_num]
+
+    def _on_loaded(self, level_num, file_name, lesson):
+        # Ignore reads that a newer request for the level superseded
+        if self._pending.get(level_num) != file_name:
+            return
+        del self._pending[level_num]
+        if lesson is not None:
+            self._lessons[level_num] = lesson
+
+    def shutdown(self):
+        """Drop queued reads and wait for the one in progress."""
+        self._pool.clear()
+        self._pool.waitForDone()
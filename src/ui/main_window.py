@@ -1,25 +1,131 @@
 """
 Main application window.
 """
+import os
+import json
+import time
+from functools import partial
 from PySide6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-                                QComboBox, QTextEdit, QLabel, QPushButton,
-                                QMessageBox, QScrollArea)
-from PySide6.QtCore import Qt
-from PySide6.QtGui import QFont, QTextCharFormat, QColor, QTextCursor
+                                QComboBox, QTextEdit, QLabel, QPushButton, QCheckBox,
+                                QMessageBox, QScrollArea, QFileDialog, QProgressBar, QSpinBox)
+from PySide6.QtCore import Qt, QEvent, QThread, QTimer, Signal
+from PySide6.QtGui import QFont
 from keyboard_widget import KeyboardWidget
+from ui.text_highlighter import TextHighlighter
+from ui.update_scheduler import UpdateScheduler
+from ui.lesson_prefetcher import LessonPrefetcher
+from ui.io_pool import IoPool
+from ui.read_ahead import ReadAhead
+from line_index import LineIndex
+from level_manager import get_imports_dir, get_user_data_dir
+from key_analytics import METRIC_LATENCY, METRIC_ERRORS
+from latency_trace import LatencyTracer, KEY_EVENT, PROCESS_KEYSTROKE, HIGHLIGHT
+from ghost_race import GhostRace, GhostRun, GhostStore, GHOSTS_DIR
+from marathon import MarathonEngine
+
+LATENCY_TRACE_FILE = 'latency_trace.json'
+
+# Pause after the last Max difficulty step before the lesson list is rebuilt
+LESSON_FILTER_DELAY_MS = 250
+
+# Lesson list orderings: (label, metadata field, largest first)
+LESSON_SORTS = (
+    ("Easiest First", 'difficulty', False),
+    ("Hardest First", 'difficulty', True),
+    ("Most Finger Travel", 'finger_travel', True),
+    ("Most Symbols", 'symbol_density', True),
+    ("Shortest First", 'chars', False),
+)
+
+
+def _read_indexed(reader):
+    """Read a lesson and index its lines (runs on an I/O pool thread)."""
+    text = reader()
+    return text, LineIndex(text)
+
+
+def _append_line(path, line):
+    """Append one line to a text file (runs on an I/O pool thread)."""
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(line)
 
 
 class MainWindow(QMainWindow):
     """Main application window."""
 
+    # Emitted once the deferred startup work is done and typing is accepted
+    startup_finished = Signal()
+    # Emitted with (TypingSession, level number) whenever a lesson is loaded
+    session_started = Signal(object, int)
+
     def __init__(self, level_manager):
         super().__init__()
+        # Input-to-paint latency tracing (off until enable_latency_tracing());
+        # set first because event() reads it for every event, child events included
+        self.latency_tracer = None
+        self.latency_hud = None
+        self.latency_trace_path = None
+
+        # UI-thread stall reporting (off until enable_stall_detection())
+        self.stall_detector = None
+        self.stall_report_path = None
+        self._stall_timer = None
+
         self.level_manager = level_manager
         self.current_session = None
 
+        # Blocking file reads and saves run on worker threads
+        self.io_pool = IoPool(self)
+        level_manager.io = self.io_pool
+        # Queued ahead of every save, so the journal is read before it grows
+        self.io_pool.write(level_manager.read_progress, on_done=self._on_progress_loaded,
+                           on_error=lambda e: print(f"Warning: Could not read progress: {e}"))
+
+        # Lesson being read for _load_level() and whether typing waits for it
+        self._load_serial = 0
+        self._between_lessons = True
+        self._startup_lesson = True  # startup_finished is due with the first lesson
+        # Lessons are dealt once the schedule is read on the I/O pool
+        self._lessons_loaded = False
+
+        # Session signals are applied at most once per display frame
+        self.update_scheduler = UpdateScheduler(self)
+
+        # Lifetime per-key/bigram statistics (loaded after the first paint)
+        self.analytics = level_manager.analytics
+
+        # Ghost race against the lesson's best recorded runs
+        self.ghost_store = GhostStore(os.path.join(get_user_data_dir(), GHOSTS_DIR))
+        self.ghost_race = None
+        self._ghost_place = None
+        self.ghost_timer = QTimer(self)
+        self.ghost_timer.setTimerType(Qt.PreciseTimer)
+        self.ghost_timer.setInterval(max(1, round(self.update_scheduler.frame_interval * 1000)))
+        self.ghost_timer.timeout.connect(self._advance_ghosts)
+
+        # Next lessons read ahead on a worker thread
+        self.lesson_prefetcher = LessonPrefetcher(self)
+
+        # Text import running on a worker thread
+        self._layout_loaded = False  # Imports wait for the keyboard layout
+        self._import_thread = None
+        self._import_worker = None
+
+        # Levels whose tooltip summaries were asked of the I/O pool
+        self._summaries_requested = set()
+
+        # Lesson list being worked out on the I/O pool, and the level listed
+        self._lesson_list_serial = 0
+        self._lesson_list_level = None
+
+        # Level of the marathon in progress (None when not in a marathon)
+        self.marathon_level = None
+
         # Text chunking variables
         self.full_text = ""
-        self.text_lines = []
+        self.text_offset = 0  # Position of full_text[0] (non-zero once a marathon moves on)
+        self._window_shifts = 0  # MarathonEngine.window_shifts when full_text was taken
+        self.line_index = None  # Line start offsets of full_text
         self.current_chunk_start_line = 0
         self.lines_per_chunk = 10
         self.chunk_char_offset = 0  # Character offset of current chunk in full text
@@ -29,9 +135,13 @@ class MainWindow(QMainWindow):
 
         # Enable keyboard focus for the main window
         self.setFocusPolicy(Qt.StrongFocus)
+        # Composed text (accents, CJK input) arrives as input method commits
+        self.setAttribute(Qt.WA_InputMethodEnabled)
 
         self._setup_ui()
-        self._load_level(1)  # Start with level 1
+
+        # The keyboard layout and first lesson are loaded after the first paint
+        self._startup_pending = True
 
         # Grab keyboard focus immediately
         self.setFocus()
@@ -60,8 +170,57 @@ class MainWindow(QMainWindow):
 
         level_layout.addWidget(level_label)
         level_layout.addWidget(self.level_combo, 1)
+
+        # Heatmap selector
+        self.heatmap_combo = QComboBox()
+        self.heatmap_combo.addItem("Heatmap: Off", None)
+        self.heatmap_combo.addItem("Heatmap: Slow Keys", METRIC_LATENCY)
+        self.heatmap_combo.addItem("Heatmap: Error Keys", METRIC_ERRORS)
+        self.heatmap_combo.setFocusPolicy(Qt.NoFocus)
+        self.heatmap_combo.currentIndexChanged.connect(self._update_heatmap)
+        level_layout.addWidget(self.heatmap_combo)
+
+        # Ghost race toggle
+        self.ghost_checkbox = QCheckBox("Race Ghosts")
+        self.ghost_checkbox.setFocusPolicy(Qt.NoFocus)
+        self.ghost_checkbox.toggled.connect(self._start_ghost_race)
+        level_layout.addWidget(self.ghost_checkbox)
+
+        # Endless text from the level, shown through a sliding window
+        self.marathon_checkbox = QCheckBox("Marathon")
+        self.marathon_checkbox.setFocusPolicy(Qt.NoFocus)
+        self.marathon_checkbox.toggled.connect(self._reset_session)
+        level_layout.addWidget(self.marathon_checkbox)
+
         layout.addLayout(level_layout)
 
+        # Lesson selector, filled from cached lesson metadata once a level loads
+        lesson_layout = QHBoxLayout()
+        self.lesson_combo = QComboBox()
+        self.lesson_combo.setFocusPolicy(Qt.NoFocus)
+        self.lesson_combo.currentIndexChanged.connect(self._on_lesson_changed)
+        self.lesson_sort_combo = QComboBox()
+        for label, field, descending in LESSON_SORTS:
+            self.lesson_sort_combo.addItem(label, (field, descending))
+        self.lesson_sort_combo.setFocusPolicy(Qt.NoFocus)
+        self.lesson_sort_combo.currentIndexChanged.connect(self._refresh_lesson_combo)
+        self.max_difficulty_spin = QSpinBox()
+        self.max_difficulty_spin.setRange(0, 100)
+        self.max_difficulty_spin.setValue(100)
+        self.max_difficulty_spin.setPrefix("Max difficulty: ")
+        self.max_difficulty_spin.setFocusPolicy(Qt.NoFocus)
+        # Stepping through values rebuilds the list once, after the last step
+        self._lesson_filter_timer = QTimer(self)
+        self._lesson_filter_timer.setSingleShot(True)
+        self._lesson_filter_timer.setInterval(LESSON_FILTER_DELAY_MS)
+        self._lesson_filter_timer.timeout.connect(self._refresh_lesson_combo)
+        self.max_difficulty_spin.valueChanged.connect(lambda _: self._lesson_filter_timer.start())
+        lesson_layout.addWidget(QLabel("Lesson:"))
+        lesson_layout.addWidget(self.lesson_combo, 1)
+        lesson_layout.addWidget(self.lesson_sort_combo)
+        lesson_layout.addWidget(self.max_difficulty_spin)
+        layout.addLayout(lesson_layout)
+
         # Practice text display
         text_label = QLabel("Practice Text:")
         layout.addWidget(text_label)
@@ -76,6 +235,7 @@ class MainWindow(QMainWindow):
         # Prevent text display from accepting keyboard focus or events
         self.text_display.setFocusPolicy(Qt.NoFocus)
         self.text_display.setTextInteractionFlags(Qt.NoTextInteraction)
+        self.highlighter = TextHighlighter(self.text_display)
         layout.addWidget(self.text_display)
 
         # Keyboard widget
@@ -88,7 +248,7 @@ class MainWindow(QMainWindow):
         scroll_area.setHorizontalScrollBarPolicy(Qt.ScrollBarAsNeeded)
         scroll_area.setVerticalScrollBarPolicy(Qt.ScrollBarAsNeeded)
 
-        self.keyboard_widget = KeyboardWidget()
+        self.keyboard_widget = KeyboardWidget(deferred=True)
         scroll_area.setWidget(self.keyboard_widget)
         scroll_area.setMinimumHeight(300)
         layout.addWidget(scroll_area)
@@ -98,6 +258,9 @@ class MainWindow(QMainWindow):
         self.wpm_label = QLabel("WPM: 0")
         self.wpm_label.setFont(QFont("Arial", 14, QFont.Bold))
 
+        self.live_wpm_label = QLabel("Live: 0")
+        self.live_wpm_label.setFont(QFont("Arial", 14, QFont.Bold))
+
         self.accuracy_label = QLabel("Accuracy: 100%")
         self.accuracy_label.setFont(QFont("Arial", 14, QFont.Bold))
 
@@ -106,6 +269,8 @@ class MainWindow(QMainWindow):
 
         stats_layout.addWidget(self.wpm_label)
         stats_layout.addWidget(QLabel(" | "))
+        stats_layout.addWidget(self.live_wpm_label)
+        stats_layout.addWidget(QLabel(" | "))
         stats_layout.addWidget(self.accuracy_label)
         stats_layout.addWidget(QLabel(" | "))
         stats_layout.addWidget(self.progress_label)
@@ -116,85 +281,427 @@ class MainWindow(QMainWindow):
         self.reset_button.clicked.connect(self._reset_session)
         stats_layout.addWidget(self.reset_button)
 
+        # Import button
+        self.import_button = QPushButton("Import Text...")
+        self.import_button.clicked.connect(self._choose_import_file)
+        # Imports keep only characters the layout can type and need a level
+        # number no earlier import uses; wait until both are read
+        self.import_button.setEnabled(False)
+        stats_layout.addWidget(self.import_button)
+
         layout.addLayout(stats_layout)
 
+        # Import progress lives in the status bar
+        self.import_progress = QProgressBar()
+        self.import_progress.setMaximumWidth(200)
+        self.import_progress.hide()
+        self.statusBar().addPermanentWidget(self.import_progress)
+
+        # Place in the current ghost race
+        self.ghost_label = QLabel()
+        self.ghost_label.hide()
+        self.statusBar().addPermanentWidget(self.ghost_label)
+
+    def event(self, event):
+        """Time each repaint of the window when latency tracing is on."""
+        tracer = self.latency_tracer
+        if tracer is None or event.type() != QEvent.UpdateRequest:
+            return super().event(event)
+        # Every dirty widget in the window is painted while this event is handled
+        start = tracer.now()
+        handled = super().event(event)
+        tracer.frame_painted(start)
+        return handled
+
+    def resizeEvent(self, event):
+        """Keep the latency HUD in its corner."""
+        super().resizeEvent(event)
+        if self.latency_hud is not None:
+            self.latency_hud.place()
+
+    def paintEvent(self, event):
+        """Schedule the deferred startup work once the window has been painted."""
+        super().paintEvent(event)
+        if self._startup_pending:
+            self._startup_pending = False
+            QTimer.singleShot(0, self._finish_startup)
+
+    def _finish_startup(self):
+        """Load everything the first frame didn't need (startup_finished follows the first lesson)."""
+        self.io_pool.read(self.keyboard_widget.read_default_layout, on_done=self._on_layout_loaded)
+        self.io_pool.read(self.analytics.read, on_done=self._on_analytics_loaded)
+        self.io_pool.read(self.level_manager.read_imported_levels, on_done=self._on_imported_levels_loaded)
+        self.io_pool.read(self.level_manager.load_lessons, on_done=self._on_lessons_loaded,
+                          on_error=self._on_lessons_loaded)
+        self._refresh_lesson_combo()
+        self._update_level_tooltips()
+
+    def _on_lessons_loaded(self, _outcome):
+        """
+        Load the chosen level (level 1 at startup) once lessons can be dealt.
+
+        Also called if load_lessons() failed; the first load then reads what it missed.
+        """
+        self._lessons_loaded = True
+        self._reset_session()
+
+    def _on_layout_loaded(self, keyboard_layout):
+        """Show the keyboard layout read on the I/O pool."""
+        self.keyboard_widget.load_default_layout(keyboard_layout)
+        self._layout_loaded = True
+        self._enable_import()
+        if self.heatmap_combo.currentData() is not None:
+            self._update_heatmap()
+        if self.ghost_race is not None:
+            self._show_ghosts()
+
+    def _on_imported_levels_loaded(self, levels):
+        """List the imported texts discovered on the I/O pool."""
+        self.level_manager.set_imported_levels(levels)
+        self._refresh_level_combo()
+        self._enable_import()
+
+    def _enable_import(self):
+        """Allow imports once the keyboard layout and the imported levels are read."""
+        self.import_button.setEnabled(self._layout_loaded and self.level_manager.imported_levels_loaded)
+
+    def _on_analytics_loaded(self, totals):
+        """Take over the key statistics read on the I/O pool."""
+        unsaved = bool(self.analytics.keys)
+        self.analytics.set_totals(totals)
+        if unsaved:
+            # Sessions finished meanwhile weren't saved; the file now gets them
+            self._save_analytics()
+        if self.heatmap_combo.currentData() is not None:
+            self._update_heatmap()
+
+    def _on_progress_loaded(self, progress):
+        """Show the best scores read on the I/O pool."""
+        self.level_manager.set_progress(progress)
+        self._refresh_level_combo()
+
     def _load_level(self, level_num):
-        """Load a specific level."""
+        """
+        Load a specific level.
+
+        A lesson that wasn't prefetched is read on the I/O pool, as is a
+        marathon's text; typing is ignored until it arrives.
+        """
+        if not self._lessons_loaded:
+            # _on_lessons_loaded() loads whichever level is chosen by then
+            return
+        self._end_marathon()
+        self._load_serial += 1
         try:
             level_info = self.level_manager.get_level_info(level_num)
-            text = self.level_manager.get_level_text(level_num)
+            if self.marathon_checkbox.isChecked():
+                serial = self._load_serial
+                source = ReadAhead(self.io_pool, self.level_manager.marathon_readers(level_num),
+                                   on_error=partial(self._on_marathon_failed, serial))
+                self._between_lessons = True
+                source.when_ready(lambda: self._on_marathon_read(serial, level_num, source))
+                return
+            if level_info.get('drill'):
+                reader = self.level_manager.drill_reader()
+            else:
+                file_name = self.lesson_combo.currentData() or self.level_manager.next_lesson(level_num)
+                prefetched = self.lesson_prefetcher.take(level_num, file_name)
+                if prefetched is not None:
+                    self._start_lesson(level_num, prefetched.text, prefetched.line_index)
+                    return
+                reader = self.level_manager.lesson_reader(level_num, file_name)
+        except (ValueError, FileNotFoundError) as e:
+            self._on_lesson_failed(self._load_serial, e)
+            return
+
+        self._between_lessons = True
+        serial = self._load_serial
+        self.io_pool.read(_read_indexed, reader,
+                          on_done=lambda lesson: self._on_lesson_read(serial, level_num, lesson),
+                          on_error=partial(self._on_lesson_failed, serial))
+
+    def _on_lesson_read(self, serial, level_num, lesson):
+        """Start a lesson read on the I/O pool unless a newer load replaced it."""
+        if serial == self._load_serial:
+            text, line_index = lesson
+            self._start_lesson(level_num, text, line_index)
+
+    def _on_marathon_read(self, serial, level_num, source):
+        """Start a marathon once its first pieces are read, unless a newer load replaced it."""
+        if serial != self._load_serial:
+            return
+        try:
+            engine = MarathonEngine(source, self.level_manager.get_level_info(level_num)['target_wpm'],
+                                    on_retire=self._retire_keystrokes)
+        except (ValueError, FileNotFoundError) as e:
+            self._on_lesson_failed(serial, e)
+            return
+        self._start_lesson(level_num, engine.text, LineIndex(engine.text), engine)
 
-            # Import here to avoid circular dependency
-            from typing_session import TypingSession
+    def _on_marathon_failed(self, serial, error):
+        """End a marathon (or its start) whose text couldn't be read."""
+        if serial != self._load_serial:
+            return
+        self._end_marathon()
+        self._between_lessons = True
+        # Its pending reads (and a start waiting for them) no longer apply
+        self._load_serial += 1
+        self._on_lesson_failed(self._load_serial, error)
+
+    def _on_lesson_failed(self, serial, error):
+        """Report a lesson that couldn't be loaded."""
+        if serial != self._load_serial:
+            return
+        QMessageBox.critical(self, "Error", f"Failed to load level: {error}")
+        self._announce_startup()
 
-            self.current_session = TypingSession(text, level_info['target_wpm'])
-            self.current_session.char_changed.connect(self._on_char_changed)
-            self.current_session.stats_updated.connect(self._on_stats_updated)
-            self.current_session.session_complete.connect(self._on_session_complete)
+    def _announce_startup(self):
+        """Emit startup_finished once, when the first lesson is in."""
+        if self._startup_lesson:
+            self._startup_lesson = False
+            self.startup_finished.emit()
 
-            # Initialize text chunking
-            self.full_text = text
-            self.text_lines = text.split('\n')
-            self.current_chunk_start_line = 0
-            self.chunk_char_offset = 0
+    def _start_lesson(self, level_num, text, line_index, engine=None):
+        """
+        Start a session on a loaded lesson.
 
-            # Display first chunk
-            self._update_text_chunk()
-            self._highlight_text(0)
+        Args:
+            level_num: Level number
+            text: Lesson text
+            line_index: LineIndex of text
+            engine: MarathonEngine for a marathon (None for a plain lesson)
+        """
+        level_info = self.level_manager.get_level_info(level_num)
+        # Import here to avoid circular dependency
+        from typing_session import TypingSession
+
+        # Updates queued for the previous session must not land on this one
+        self.update_scheduler.cancel()
+
+        self.current_session = TypingSession(text, level_info['target_wpm'], engine)
+        if engine is not None:
+            self.marathon_level = level_num
+            self._window_shifts = engine.window_shifts
+        self.current_session.char_changed.connect(self._queue_char_changed)
+        self.current_session.stats_updated.connect(self._queue_stats_updated)
+        self.current_session.session_complete.connect(self._on_session_complete)
+        self.session_started.emit(self.current_session, level_num)
+
+        # Initialize text chunking
+        self.full_text = text
+        self.text_offset = 0
+        self.line_index = line_index
+        self.current_chunk_start_line = 0
+        self.chunk_char_offset = 0
 
-            # Update keyboard to show first character
-            if len(text) > 0:
-                first_char = text[0]
-                next_char = text[1] if len(text) > 1 else ''
-                self.keyboard_widget.set_current_char(first_char, next_char)
+        # Display first chunk
+        self._update_text_chunk()
+        self._highlight_text(0)
+        self._start_ghost_race()
 
-            # Update stats
-            self.wpm_label.setText("WPM: 0")
-            self.accuracy_label.setText("Accuracy: 100%")
-            self.progress_label.setText(f"Progress: 0/{len(text)}")
+        # Update keyboard to show first character
+        if len(text) > 0:
+            first_char = text[0]
+            next_char = text[1] if len(text) > 1 else ''
+            self.keyboard_widget.set_current_char(first_char, next_char)
 
-            # Set window title
-            self.setWindowTitle(f"Typing Tutor - {level_info['name']}")
+        # Update stats
+        self.wpm_label.setText("WPM: 0")
+        self.live_wpm_label.setText("Live: 0")
+        self.accuracy_label.setText("Accuracy: 100%")
+        self.progress_label.setText(self._progress_text(0))
 
-            # Grab focus so typing works immediately
-            self.setFocus()
+        # Set window title
+        self.setWindowTitle(f"Typing Tutor - {level_info['name']}")
 
-        except (ValueError, FileNotFoundError) as e:
-            QMessageBox.critical(self, "Error", f"Failed to load level: {e}")
+        # Grab focus so typing works immediately
+        self.setFocus()
+
+        self._between_lessons = False
+        self._prefetch_upcoming(level_num)
+        self._announce_startup()
+
+    def _retire_keystrokes(self, text, offset, log):
+        """Fold keystrokes leaving a marathon's window into the key statistics."""
+        self.analytics.add_keystrokes(text, log, offset)
+
+    def _end_marathon(self):
+        """
+        Record a marathon that is being left (by reset, level change or exit).
+
+        Its speed and accuracy go into the session history and its remaining
+        keystrokes into the key statistics; best scores are left alone.
+        """
+        level_num = self.marathon_level
+        self.marathon_level = None
+        if level_num is None or self.current_session is None or not self.current_session.correct_chars:
+            return
+        session = self.current_session
+        wpm = session.calculate_wpm()
+        accuracy = session.calculate_accuracy()
+        self._record_history(level_num, wpm, accuracy, session.calculate_burst_wpm(),
+                             session.engine.has_passed(wpm, accuracy))
+        self._record_analytics()
+
+    def _sync_text_window(self):
+        """Follow a marathon's window after it slid, keeping the shown chunk in place."""
+        engine = self.current_session.engine
+        self._window_shifts = engine.window_shifts
+        chunk_start = self.chunk_char_offset
+        self.full_text = engine.text
+        self.text_offset = engine.text_offset
+        self.line_index = LineIndex(self.full_text)
+        if chunk_start < self.text_offset:
+            chunk_start = engine.current_index
+        self.current_chunk_start_line = self.line_index.line_of(chunk_start - self.text_offset)
+        self._update_text_chunk()
+
+    def _progress_text(self, char_count):
+        """Progress label text for a position in the current session."""
+        if self.marathon_level is not None:
+            return f"Marathon: {char_count} chars"
+        return f"Progress: {char_count}/{self.current_session.text_length}"
+
+    def _prefetch_upcoming(self, level_num):
+        """
+        Read ahead what the next load will need: this level's next lesson
+        (for a reset or completion) and those of the neighbouring levels.
+        """
+        index = self.level_combo.findData(level_num)
+        neighbours = [self.level_combo.itemData(i) for i in (index - 1, index + 1)
+                      if 0 <= i < self.level_combo.count()]
+        wanted = [level_num] + neighbours
+        self.lesson_prefetcher.retain(wanted)
+        for wanted_level in wanted:
+            if wanted_level == level_num and self.lesson_combo.currentData():
+                file_name = self.lesson_combo.currentData()
+            else:
+                file_name = self.level_manager.peek_lesson(wanted_level)
+            if file_name is None:
+                continue
+            try:
+                reader = self.level_manager.lesson_reader(wanted_level, file_name)
+            except ValueError:
+                continue
+            self.lesson_prefetcher.request(wanted_level, file_name, reader)
 
     def _on_level_changed(self, index):
         """Handle level selection change."""
         level_num = self.level_combo.itemData(index)
+        self._refresh_lesson_combo()
         self._load_level(level_num)
 
+    def _on_lesson_changed(self, index):
+        """Start the chosen lesson (or a random one)."""
+        self._reset_session()
+
+    def _refresh_lesson_combo(self):
+        """
+        List the current level's lessons, filtered and sorted by difficulty.
+
+        The lessons are looked up (and any the metadata cache lacks scored)
+        on the I/O pool. A new level's list starts with just Random lesson
+        until they arrive.
+        """
+        self._lesson_filter_timer.stop()
+        self._lesson_list_serial += 1
+        level_num = self.level_combo.currentData()
+        field, descending = self.lesson_sort_combo.currentData()
+        if level_num != self._lesson_list_level:
+            # The old level's lessons can't be chosen for this one
+            self._lesson_list_level = level_num
+            self._show_lessons(self._lesson_list_serial, [])
+        serial = self._lesson_list_serial
+        find = partial(self.level_manager.find_lessons, [level_num],
+                       max_difficulty=self.max_difficulty_spin.value(),
+                       sort_by=field, descending=descending)
+        self.io_pool.read(find, on_done=lambda lessons: self._show_lessons(serial, lessons))
+
+    def _show_lessons(self, serial, lessons):
+        """
+        Fill the lesson list, unless a newer refresh replaced this one.
+
+        The chosen lesson stays selected if it is still listed.
+        """
+        if serial != self._lesson_list_serial:
+            return
+        chosen = self.lesson_combo.currentData()
+        self.lesson_combo.blockSignals(True)
+        self.lesson_combo.clear()
+        self.lesson_combo.addItem("Random lesson", None)
+        self.lesson_combo.insertItems(1, [
+            f"{file_name}  (difficulty {metadata['difficulty']:.0f}, {metadata['chars']} chars)"
+            for _, file_name, metadata in lessons])
+        for index, (_, file_name, metadata) in enumerate(lessons, 1):
+            self.lesson_combo.setItemData(index, file_name)
+            self.lesson_combo.setItemData(
+                index,
+                f"Finger travel {metadata.get('finger_travel', 0):.2f} keys/char\n"
+                f"Same-finger bigrams {metadata.get('same_finger_bigrams', 0):.1%}\n"
+                f"Row jumps {metadata.get('row_jumps', 0):.1%}\n"
+                f"Shifted {metadata['shift_ratio']:.1%}, symbols {metadata.get('symbol_density', 0):.1%}",
+                Qt.ToolTipRole)
+        self.lesson_combo.setCurrentIndex(max(0, self.lesson_combo.findData(chosen)))
+        self.lesson_combo.setEnabled(len(lessons) > 0)
+        self.lesson_combo.blockSignals(False)
+
     def _reset_session(self):
         """Reset the current session."""
         current_index = self.level_combo.currentIndex()
         level_num = self.level_combo.itemData(current_index)
         self._load_level(level_num)
 
+    def _chunk_span(self, start_line):
+        """
+        Character range of the chunk beginning at a line.
+
+        Returns:
+            tuple: (start, end) offsets into full_text
+        """
+        end_line = min(start_line + self.lines_per_chunk, self.line_index.line_count)
+        return self.line_index.span(start_line, end_line)
+
     def _update_text_chunk(self):
         """Update the displayed text chunk based on current position."""
-        # Get lines for current chunk
-        end_line = min(self.current_chunk_start_line + self.lines_per_chunk, len(self.text_lines))
-        chunk_lines = self.text_lines[self.current_chunk_start_line:end_line]
-        chunk_text = '\n'.join(chunk_lines)
-
-        # Calculate character offset of this chunk in full text
-        if self.current_chunk_start_line > 0:
-            preceding_lines = self.text_lines[:self.current_chunk_start_line]
-            # +1 for each newline character
-            self.chunk_char_offset = sum(len(line) + 1 for line in preceding_lines)
-        else:
-            self.chunk_char_offset = 0
+        # Only the visible lines are ever handed to the text display
+        start, end = self._chunk_span(self.current_chunk_start_line)
+        self.chunk_char_offset = self.text_offset + start
+        self.highlighter.set_text(self.full_text[start:end])
+        if self.ghost_race is not None:
+            self._show_ghosts()
+
+    def _next_chunk_start_line(self, char_count):
+        """
+        Find the chunk to display once the typist is past 80% of the current one.
+
+        Coalesced updates can move several chunks at once, so keep advancing
+        while the threshold is passed.
 
-        # Display the chunk
-        self.text_display.setPlainText(chunk_text)
+        Returns:
+            int: First line of the chunk to display
+        """
+        start_line = self.current_chunk_start_line
+        position = char_count - self.text_offset
+        while start_line + self.lines_per_chunk < self.line_index.line_count:
+            start, end = self._chunk_span(start_line)
+            chunk_length = end - start
+            if chunk_length <= 0 or position - start <= chunk_length * 0.8:
+                break
+            start_line += self.lines_per_chunk
+        return start_line
 
     def _get_position_in_chunk(self, absolute_position):
         """Convert absolute text position to position within current chunk."""
         return absolute_position - self.chunk_char_offset
 
+    def _queue_char_changed(self, current_char, next_char):
+        """Defer a character change to the next frame."""
+        self.update_scheduler.post('char', self._on_char_changed, current_char, next_char)
+
+    def _queue_stats_updated(self, wpm, accuracy, char_count):
+        """Defer a statistics update to the next frame."""
+        self.update_scheduler.post('stats', self._on_stats_updated, wpm, accuracy, char_count)
+
     def _on_char_changed(self, current_char, next_char):
         """Handle character change signal."""
         # Update keyboard highlighting
@@ -203,52 +710,391 @@ class MainWindow(QMainWindow):
     def _on_stats_updated(self, wpm, accuracy, char_count):
         """Handle statistics update."""
         self.wpm_label.setText(f"WPM: {wpm:.1f}")
+        self.live_wpm_label.setText(f"Live: {self.current_session.calculate_rolling_wpm():.1f}")
         self.accuracy_label.setText(f"Accuracy: {accuracy:.1f}%")
-        self.progress_label.setText(f"Progress: {char_count}/{len(self.current_session.text)}")
-
-        # Check if we need to advance to next chunk
-        chunk_end_offset = self.chunk_char_offset + len(self.text_display.toPlainText())
+        self.progress_label.setText(self._progress_text(char_count))
+        if self.marathon_level is not None and self.current_session.engine.window_shifts != self._window_shifts:
+            self._sync_text_window()
 
         # If we're past 80% of current chunk, load next chunk
-        chunk_progress = char_count - self.chunk_char_offset
-        chunk_length = len(self.text_display.toPlainText())
-
-        if chunk_length > 0 and chunk_progress > chunk_length * 0.8:
-            # Check if there are more lines to show
-            if self.current_chunk_start_line + self.lines_per_chunk < len(self.text_lines):
-                self.current_chunk_start_line += self.lines_per_chunk
-                self._update_text_chunk()
+        start_line = self._next_chunk_start_line(char_count)
+        if start_line != self.current_chunk_start_line:
+            self.current_chunk_start_line = start_line
+            self._update_text_chunk()
 
         # Update text highlighting with position relative to current chunk
         position_in_chunk = self._get_position_in_chunk(char_count)
         self._highlight_text(position_in_chunk)
 
+        if self.ghost_race is not None:
+            self._update_ghost_place()
+
     def _on_session_complete(self, passed):
         """Handle session completion."""
+        # Show the final state before the dialog blocks the event loop
+        self.update_scheduler.flush()
+
         wpm = self.current_session.calculate_wpm()
         accuracy = self.current_session.calculate_accuracy()
+        burst = self.current_session.calculate_burst_wpm()
+
+        # A marathon that ran out of text is recorded here, not when it is
+        # left, and like a marathon that is left it keeps the best scores
+        marathon = self.marathon_level is not None
+        self.marathon_level = None
+        # Nothing can be typed past the end of the text
+        self._between_lessons = True
 
-        # Save progress
+        # Save progress (the saves themselves run on the I/O pool)
         current_index = self.level_combo.currentIndex()
         level_num = self.level_combo.itemData(current_index)
-        self.level_manager.save_progress(level_num, wpm, accuracy, passed)
+        if not marathon:
+            self.level_manager.save_progress(level_num, wpm, accuracy, passed)
+        self._record_history(level_num, wpm, accuracy, burst, passed)
+        self._record_analytics()
+        serial = self._load_serial
+        self._record_ghost(lambda ghost_note: self._show_completion(
+            serial, level_num, passed, wpm, accuracy, burst, ghost_note))
+
+    def _show_completion(self, serial, level_num, passed, wpm, accuracy, burst, ghost_note):
+        """Show the completion message, then start a new lesson (unless one was chosen meanwhile)."""
+        if serial != self._load_serial:
+            return
 
         # Show completion message
         if passed:
-            message = f"Congratulations! You passed!\n\nWPM: {wpm:.1f}\nAccuracy: {accuracy:.1f}%"
+            message = f"Congratulations! You passed!\n\nWPM: {wpm:.1f} (Burst: {burst:.1f})\nAccuracy: {accuracy:.1f}%{ghost_note}"
             QMessageBox.information(self, "Level Complete", message)
         else:
             level_info = self.level_manager.get_level_info(level_num)
             target = level_info['target_wpm']
-            message = f"Good effort! Keep practicing.\n\nWPM: {wpm:.1f} (Target: {target})\nAccuracy: {accuracy:.1f}% (Target: 95%)"
+            message = f"Good effort! Keep practicing.\n\nWPM: {wpm:.1f} (Target: {target}, Burst: {burst:.1f})\nAccuracy: {accuracy:.1f}% (Target: 95%){ghost_note}"
             QMessageBox.information(self, "Level Complete", message)
 
-        # Refresh level combo to show completion status
+        # Refresh level combo to show completion status, then start a new lesson
+        self._refresh_level_combo()
+        self._reset_session()
+
+    def _record_history(self, level_num, wpm, accuracy, burst, passed):
+        """Store the finished session in the history database."""
+        engine = self.current_session.engine
+        self.level_manager.record_session(level_num, {
+            'wpm': wpm,
+            'accuracy': accuracy,
+            'burst_wpm': burst,
+            'duration_s': engine.duration_seconds(),
+            'chars': engine.current_index,
+            'keystrokes': engine.total_keystrokes,
+            'errors': engine.total_keystrokes - engine.correct_chars,
+            'passed': passed,
+        })
+
+    def _record_analytics(self):
+        """Fold the finished session into the key statistics."""
+        engine = self.current_session.engine
+        if isinstance(engine, MarathonEngine):
+            # Earlier keystrokes were folded in as they left the window
+            text, offset, log = engine.remaining_keystrokes()
+            self.analytics.add_session(text, log, offset)
+        else:
+            self.analytics.add_session(engine.text, engine.keystrokes)
+        # Until the saved totals are in, saving would overwrite them
+        if self.analytics.loaded:
+            self._save_analytics()
+        self._update_heatmap()
+
+    def _save_analytics(self):
+        """Save the key statistics on the write lane."""
+        self.io_pool.write(self.analytics.save, self.analytics.snapshot(),
+                           on_error=lambda e: print(f"Warning: Could not save key statistics: {e}"))
+
+    def _record_ghost(self, then):
+        """
+        Keep the finished run as a ghost if it is among the lesson's fastest.
+
+        Args:
+            then: Called with the line to add to the completion message (may
+                be empty) once the ghost is saved
+        """
+        self.ghost_timer.stop()
+        engine = self.current_session.engine
+        run = GhostRun.from_engine(engine) if not isinstance(engine, MarathonEngine) else None
+        if run is None:
+            then("")
+            return
+
+        def saved(rank):
+            if rank == 1:
+                then("\nNew best run - saved as this lesson's lead ghost!")
+            elif rank:
+                then(f"\nSaved as ghost #{rank} for this lesson.")
+            else:
+                then("")
+
+        def failed(error):
+            print(f"Warning: Could not save ghost: {error}")
+            then("")
+
+        self.io_pool.write(self.ghost_store.add, engine.text, run, on_done=saved, on_error=failed)
+
+    def _start_ghost_race(self):
+        """Load the current lesson's ghosts if racing is on."""
+        self.ghost_timer.stop()
+        self.ghost_race = None
+        self._ghost_place = None
+        self.highlighter.set_ghosts(())
+        self.keyboard_widget.set_ghost_chars(())
+        self.ghost_label.hide()
+
+        if self.ghost_checkbox.isChecked() and self.marathon_level is not None:
+            self.statusBar().showMessage("Ghosts don't run in marathons", 5000)
+        elif self.ghost_checkbox.isChecked() and self.current_session is not None:
+            # On the write lane, so a ghost still being saved for this lesson is in
+            session = self.current_session
+            self.io_pool.write(self.ghost_store.load, self.full_text,
+                               on_done=lambda runs: self._on_ghosts_loaded(session, runs))
+        self.setFocus()
+
+    def _on_ghosts_loaded(self, session, runs):
+        """Start the race against ghosts read on the I/O pool, if still wanted."""
+        if session is not self.current_session or not self.ghost_checkbox.isChecked():
+            return
+        if runs:
+            self.ghost_race = GhostRace(runs)
+            self.ghost_label.show()
+            self._show_ghosts()
+            self.ghost_timer.start()
+            self.statusBar().showMessage(
+                f"Racing {len(runs)} ghost(s); fastest {runs[0].wpm:.1f} WPM - they start with your first key", 5000)
+        else:
+            self.statusBar().showMessage("No ghosts for this lesson yet - finish it to record one", 5000)
+
+    def _advance_ghosts(self):
+        """Move the ghosts to the current race time (runs once per frame)."""
+        start_ns = self.current_session.start_ns
+        if start_ns is None:
+            # The race clock starts with the typist's first keystroke
+            return
+        elapsed_ms = (time.perf_counter_ns() - start_ns) // 1_000_000
+        if self.ghost_race.update(elapsed_ms):
+            self._show_ghosts()
+
+    def _show_ghosts(self):
+        """Draw the ghost cursors in the text and on the keyboard."""
+        positions = self.ghost_race.positions
+        offset = self.chunk_char_offset
+        self.highlighter.set_ghosts([position - offset for position in positions])
+        text = self.full_text
+        self.keyboard_widget.set_ghost_chars(text[position] for position in positions
+                                             if position < len(text))
+        self._update_ghost_place()
+
+    def _update_ghost_place(self):
+        """Show the typist's place among the ghosts."""
+        place = self.ghost_race.place(self.current_session.current_index)
+        if place != self._ghost_place:
+            self._ghost_place = place
+            self.ghost_label.setText(f"Ghost race: place {place} of {len(self.ghost_race.runs) + 1}")
+
+    def _update_heatmap(self):
+        """Show the selected heatmap on the keyboard, with the slowest transitions."""
+        metric = self.heatmap_combo.currentData()
+        if metric is None:
+            self.keyboard_widget.set_heatmap(None)
+            self.statusBar().clearMessage()
+            self.setFocus()
+            return
+
+        heat = self.analytics.key_heat(self.keyboard_widget.keyboard_layout, metric)
+        self.keyboard_widget.set_heatmap(heat)
+        slowest = self.analytics.slowest_bigrams()
+        if slowest:
+            transitions = ", ".join(f"{bigram!r} {mean:.0f} ms" for bigram, mean in slowest)
+            self.statusBar().showMessage(f"Slowest transitions: {transitions}")
+        elif not heat:
+            self.statusBar().showMessage("Not enough typing recorded for a heatmap yet", 3000)
+        self.setFocus()
+
+    def _choose_import_file(self):
+        """Ask for a text file to import, or cancel the running import."""
+        if self._import_thread is not None:
+            # Cancel the running import; one that is shutting down ignores it
+            self._import_worker.cancel()
+            return
+
+        path, _ = QFileDialog.getOpenFileName(self, "Import Practice Text", "",
+                                              "Text files (*.txt *.md *.py *.rst);;All files (*)")
+        if path:
+            self._start_import(path)
+        self.setFocus()
+
+    def _start_import(self, path):
+        """
+        Import a file into lessons on a worker thread.
+
+        Args:
+            path: Source file to import
+        """
+        # Import here so the import pipeline isn't loaded at startup
+        from text_import import import_dir_name
+        from ui.import_worker import ImportWorker
+
+        level_num = self.level_manager.next_imported_level()
+        dest_dir = os.path.join(get_imports_dir(), f"{level_num}_{import_dir_name(path)}")
+        supported_chars = self.keyboard_widget.keyboard_layout.char_index.keys()
+
+        self._import_thread = QThread(self)
+        self._import_worker = ImportWorker(path, dest_dir, supported_chars, {'level': level_num},
+                                           self.level_manager)
+        self._import_worker.moveToThread(self._import_thread)
+
+        self._import_thread.started.connect(self._import_worker.run)
+        self._import_thread.finished.connect(self._import_worker.deleteLater)
+        self._import_thread.finished.connect(self._on_import_thread_finished)
+        self._import_worker.progress.connect(self.import_progress.setValue)
+        self._import_worker.finished.connect(self._on_import_finished)
+        self._import_worker.failed.connect(self._on_import_failed)
+        self._import_worker.cancelled.connect(self._on_import_cancelled)
+
+        self.import_progress.setValue(0)
+        self.import_progress.show()
+        self.import_button.setText("Cancel Import")
+        self.statusBar().showMessage(f"Importing {os.path.basename(path)}...")
+        self._import_thread.start()
+
+    def _end_import(self):
+        """Let the import thread wind down and restore the idle UI."""
+        # run() has returned; the thread exits its event loop and cleans up.
+        # The worker is released with the thread, not here: dropping the last
+        # reference would delete it on this thread while its own still runs.
+        self._import_thread.quit()
+        self.import_progress.hide()
+        self.import_button.setText("Import Text...")
+
+    def _on_import_thread_finished(self):
+        """Release the import thread and its worker once the thread has fully stopped."""
+        self._import_thread.deleteLater()
+        self._import_thread = None
+        self._import_worker = None
+
+    def _on_import_finished(self, directory, info):
+        """Register the imported lessons as a level and switch to it."""
+        self._end_import()
+        level_num = self.level_manager.add_imported_level(directory, info)
+        self.statusBar().showMessage(f"Imported {info['lessons']} lessons from {info['name']}", 5000)
         self._refresh_level_combo()
+        self.level_combo.setCurrentIndex(self.level_combo.findData(level_num))
+
+    def _on_import_failed(self, message):
+        """Report an import error."""
+        self._end_import()
+        self.statusBar().clearMessage()
+        QMessageBox.warning(self, "Import Failed", f"Could not import text: {message}")
+
+    def _on_import_cancelled(self):
+        """Acknowledge a cancelled import."""
+        self._end_import()
+        self.statusBar().showMessage("Import cancelled", 3000)
+
+    def closeEvent(self, event):
+        """Record a marathon and stop background work before the window goes away."""
+        self._end_marathon()
+        if self._import_worker is not None:
+            self._import_worker.cancel()
+        if self._import_thread is not None:
+            self._import_thread.quit()
+            self._import_thread.wait()
+        self.lesson_prefetcher.shutdown()
+        if self.stall_detector is not None:
+            self._stall_timer.stop()
+            self.stall_detector.stop()
+        # Queued saves (including the marathon's above) must reach the disk
+        self.io_pool.shutdown()
+        if self.latency_tracer is not None and self.latency_trace_path:
+            self.export_latency_trace()
+        super().closeEvent(event)
+
+    def enable_latency_tracing(self, trace_path=None, show_hud=False):
+        """
+        Start timing every keystroke from key event to repaint.
+
+        Args:
+            trace_path: Chrome trace file written on Shift+F12 and on close
+                (default: latency_trace.json in the user data folder, on Shift+F12 only)
+            show_hud: Show the latency overlay right away
+        """
+        if self.latency_tracer is None:
+            # Import here so the overlay isn't loaded unless it is used
+            from ui.latency_hud import LatencyHud
+            self.latency_tracer = LatencyTracer()
+            self.latency_hud = LatencyHud(self, self.latency_tracer)
+            self.update_scheduler.latency_tracer = self.latency_tracer
+            self.keyboard_widget.latency_tracer = self.latency_tracer
+        if trace_path:
+            self.latency_trace_path = trace_path
+        if show_hud:
+            self.latency_hud.set_active(True)
+
+    def enable_stall_detection(self, report_path=None):
+        """
+        Report every UI-thread block longer than a frame (16 ms).
+
+        Stalls are printed as warnings with the code that was running.
+
+        Args:
+            report_path: File each stall is also appended to as a JSON line
+        """
+        if self.stall_detector is None:
+            # Import here so the watchdog thread isn't loaded unless it is used
+            from stall_detector import StallDetector
+            self.stall_detector = StallDetector(on_stall=self._report_stall)
+            self._stall_timer = QTimer(self)
+            self._stall_timer.setTimerType(Qt.PreciseTimer)
+            self._stall_timer.setInterval(max(1, round(self.stall_detector.interval_ns / 1e6)))
+            self._stall_timer.timeout.connect(self.stall_detector.heartbeat)
+            self.stall_detector.start()
+            self._stall_timer.start()
+        if report_path:
+            self.stall_report_path = report_path
+
+    def _report_stall(self, stall):
+        """Print a stall and queue it for the report file."""
+        from stall_detector import stall_location
+        where = stall_location(stall)
+        print(f"Warning: UI thread blocked for {stall.duration_ms:.0f} ms at {where}")
+        if self.stall_report_path:
+            line = json.dumps({'start_ns': stall.start_ns, 'duration_ms': round(stall.duration_ms, 3),
+                               'where': where, 'stack': stall.stack}) + '\n'
+            self.io_pool.write(_append_line, self.stall_report_path, line,
+                               on_error=lambda e: print(f"Warning: Could not write stall report: {e}"))
+
+    def toggle_latency_hud(self):
+        """Show or hide the latency overlay (F12), enabling tracing if needed."""
+        if self.latency_hud is None:
+            self.enable_latency_tracing(show_hud=True)
+        else:
+            self.latency_hud.set_active(not self.latency_hud.isVisible())
+
+    def export_latency_trace(self):
+        """Write the recorded spans as a Chrome trace (Shift+F12)."""
+        if self.latency_tracer is None:
+            self.statusBar().showMessage("Latency tracing is off; press F12 to start it", 3000)
+            return
+        path = self.latency_trace_path or os.path.join(get_user_data_dir(), LATENCY_TRACE_FILE)
+        try:
+            self.latency_tracer.export(path)
+        except OSError as e:
+            print(f"Warning: Could not write latency trace: {e}")
+            return
+        self.statusBar().showMessage(f"Latency trace written to {path}", 5000)
 
     def _refresh_level_combo(self):
         """Refresh the level combo box to show updated completion status."""
         current_index = self.level_combo.currentIndex()
+
+        # Rebuilding emits index changes (including -1 on clear) that must
+        # not load levels
+        self.level_combo.blockSignals(True)
         self.level_combo.clear()
 
         for level_num, level_info in self.level_manager.get_all_levels():
@@ -258,6 +1104,34 @@ class MainWindow(QMainWindow):
             self.level_combo.addItem(label, level_num)
 
         self.level_combo.setCurrentIndex(current_index)
+        self.level_combo.blockSignals(False)
+        self._update_level_tooltips()
+
+    def _update_level_tooltips(self):
+        """
+        Describe each level's lessons in its tooltip.
+
+        Levels not summarized yet get their summaries worked out once on the
+        I/O pool (reading any lessons the metadata cache lacks); their
+        tooltips are filled in when that is done.
+        """
+        missing = []
+        for index in range(self.level_combo.count()):
+            level_num = self.level_combo.itemData(index)
+            level_info = self.level_manager.get_level_info(level_num)
+            summary = self.level_manager.get_level_summary(level_num, cached_only=True)
+            if summary is None and level_num not in self._summaries_requested:
+                missing.append(level_num)
+            lines = [level_info['description']] if level_info.get('description') else []
+            if summary is not None:
+                lines.append(f"{summary['lessons']} lessons, about {summary['avg_chars']:.0f} characters each")
+                lines.append(f"Difficulty {summary['avg_difficulty']:.0f}/100 "
+                             f"(range {summary['min_difficulty']:.0f}-{summary['max_difficulty']:.0f})")
+            self.level_combo.setItemData(index, '\n'.join(lines), Qt.ToolTipRole)
+        if missing:
+            self._summaries_requested.update(missing)
+            self.io_pool.read(self.level_manager.load_level_summaries, missing,
+                              on_done=lambda _: self._update_level_tooltips())
 
     def _highlight_text(self, position):
         """
@@ -266,45 +1140,28 @@ class MainWindow(QMainWindow):
         Args:
             position: Current character position within the chunk
         """
-        # Get current chunk text length
-        chunk_text = self.text_display.toPlainText()
-        chunk_length = len(chunk_text)
-
-        cursor = self.text_display.textCursor()
-        cursor.select(QTextCursor.Document)
-
-        # Reset formatting
-        normal_format = QTextCharFormat()
-        cursor.setCharFormat(normal_format)
-
-        # Highlight completed text (blue background, white text) within this chunk
-        if position > 0 and position <= chunk_length:
-            cursor.setPosition(0)
-            cursor.setPosition(min(position, chunk_length), QTextCursor.KeepAnchor)
-            completed_format = QTextCharFormat()
-            completed_format.setBackground(QColor("#2196F3"))  # Blue
-            completed_format.setForeground(QColor("#FFFFFF"))  # White text
-            cursor.setCharFormat(completed_format)
-
-        # Highlight current character (white background, blue text)
-        if position >= 0 and position < chunk_length:
-            cursor.setPosition(position)
-            cursor.setPosition(position + 1, QTextCursor.KeepAnchor)
-            current_format = QTextCharFormat()
-            current_format.setBackground(QColor("#FFFFFF"))  # White background
-            current_format.setForeground(QColor("#2196F3"))  # Blue text
-            cursor.setCharFormat(current_format)
-
-        # Reset cursor to beginning (no selection)
-        cursor.setPosition(0)
-        cursor.clearSelection()
-        self.text_display.setTextCursor(cursor)
+        tracer = self.latency_tracer
+        if tracer is None:
+            self.highlighter.highlight(position)
+            return
+        start = tracer.now()
+        self.highlighter.highlight(position)
+        tracer.span(HIGHLIGHT, start)
 
     def keyPressEvent(self, event):
         """Handle key press events."""
-        if self.current_session is None:
+        if event.key() == Qt.Key_F12:
+            if event.modifiers() & Qt.ShiftModifier:
+                self.export_latency_trace()
+            else:
+                self.toggle_latency_hud()
             return
 
+        if self.current_session is None or self._between_lessons:
+            return
+
+        start = self.latency_tracer.now() if self.latency_tracer is not None else 0
+
         # Get the typed character
         text = event.text()
 
@@ -317,5 +1174,37 @@ class MainWindow(QMainWindow):
             # Ignore other special keys (arrows, etc.)
             return
 
-        # Process the keystroke
-        self.current_session.process_keystroke(text)
+        self._process_typed(text, start)
+
+    def inputMethodEvent(self, event):
+        """Type an input method's committed text as one run of keystrokes."""
+        commit = event.commitString()
+        if self.current_session is None or self._between_lessons or not commit:
+            event.accept()
+            return
+        start = self.latency_tracer.now() if self.latency_tracer is not None else 0
+        self._process_typed(commit.replace('\r\n', '\n').replace('\r', '\n'), start)
+        event.accept()
+
+    def _process_typed(self, text, start):
+        """
+        Feed typed text to the session, timing it when tracing.
+
+        Args:
+            text: One character from a key press, or a run from an input method
+            start: perf_counter_ns when the input event arrived (0 when not tracing)
+        """
+        tracer = self.latency_tracer
+        if tracer is not None:
+            tracer.input_started(start)
+            process_start = tracer.now()
+
+        # A run goes through the batch path: one pass and one UI update
+        if len(text) == 1:
+            self.current_session.process_keystroke(text)
+        else:
+            self.current_session.process_keystrokes(text)
+
+        if tracer is not None:
+            tracer.span(PROCESS_KEYSTROKE, process_start)
+            tracer.span(KEY_EVENT, start)
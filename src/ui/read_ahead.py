@@ -0,0 +1,97 @@
+"""
+Reading a stream of text pieces ahead of the one asking for them.
+"""
+from collections import deque
+from concurrent.futures import Future
+from functools import partial
+
+READ_AHEAD = 6
+
+
+def _read(future, reader):
+    """Run a reader on a pool thread, keeping its result or exception for the asker."""
+    try:
+        future.set_result(reader())
+    except Exception as e:
+        future.set_exception(e)
+
+
+class ReadAhead:
+    """
+    Iterator over the results of a stream of reader functions.
+
+    The stream itself is advanced on the calling thread; each reader runs
+    on the I/O pool's read threads, up to depth of them ahead of the piece
+    last asked for. Asking for a piece that is still being read waits for
+    it, and a reader's exception is raised when its piece is asked for;
+    callers that must not wait check ready() first. on_error, if given, is
+    called (on the GUI thread) with a reader's exception as soon as the
+    read fails.
+    """
+
+    def __init__(self, io_pool, readers, depth=READ_AHEAD, on_error=None):
+        self.io_pool = io_pool
+        self.depth = depth
+        self.on_error = on_error
+        self._readers = iter(readers)
+        self._futures = deque()  # Started reads, in stream order
+        self._reading = 0  # Reads whose completion the GUI thread hasn't seen yet
+        self._on_ready = None
+        self._fill()
+
+    def when_ready(self, callback):
+        """
+        Call back (on the GUI thread) once the reads started so far are done.
+
+        Args:
+            callback: Called without arguments; at once if nothing is being read
+        """
+        if self._reading:
+            self._on_ready = callback
+        else:
+            callback()
+
+    def ready(self):
+        """
+        Check whether the next piece can be had without waiting.
+
+        Returns:
+            bool: True if the next piece is read or the stream has ended;
+            False while it is being read or if its read failed
+        """
+        self._fill()
+        if not self._futures:
+            return True
+        future = self._futures[0]
+        return future.done() and future.exception() is None
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        self._fill()
+        if not self._futures:
+            raise StopIteration
+        future = self._futures.popleft()
+        # Start the replacement before waiting, so reads stay depth ahead
+        self._fill()
+        return future.result()
+
+    def _fill(self):
+        while len(self._futures) < self.depth:
+            try:
+                reader = next(self._readers)
+            except StopIteration:
+                return
+            future = Future()
+            self._futures.append(future)
+            self._reading += 1
+            self.io_pool.read(_read, future, reader, on_done=partial(self._on_read, future))
+
+    def _on_read(self, future, _result):
+        self._reading -= 1
+        if future.exception() is not None and self.on_error is not None:
+            self.on_error(future.exception())
+        if not self._reading and self._on_ready is not None:
+            callback, self._on_ready = self._on_ready, None
+            callback()
@@ -0,0 +1,130 @@
+"""
+Incremental highlighting of the practice text display.
+"""
+from PySide6.QtGui import QTextCharFormat, QColor, QTextCursor
+
+
+class TextHighlighter:
+    """
+    Applies completed/current character formats to a QTextEdit document.
+
+    Only the characters whose state changed since the previous call are
+    reformatted, so the per-keystroke cost does not depend on chunk size.
+    """
+
+    def __init__(self, text_edit):
+        self.text_edit = text_edit
+        self.document = text_edit.document()
+        # Formatting is not user editing; keep it off the undo stack
+        self.document.setUndoRedoEnabled(False)
+        self.cursor = QTextCursor(self.document)
+
+        self.normal_format = QTextCharFormat()
+
+        # Completed text: blue background, white text
+        self.completed_format = QTextCharFormat()
+        self.completed_format.setBackground(QColor("#2196F3"))
+        self.completed_format.setForeground(QColor("#FFFFFF"))
+
+        # Current character: white background, blue text
+        self.current_format = QTextCharFormat()
+        self.current_format.setBackground(QColor("#FFFFFF"))
+        self.current_format.setForeground(QColor("#2196F3"))
+
+        # Ghost cursors are merged over the base formats: shaded while a
+        # ghost is ahead of the typist, underlined once it has been passed
+        self.ghost_ahead_format = QTextCharFormat()
+        self.ghost_ahead_format.setBackground(QColor("#FFCC80"))
+        self.ghost_ahead_format.setFontUnderline(True)
+        self.ghost_ahead_format.setUnderlineColor(QColor("#E65100"))
+        self.ghost_behind_format = QTextCharFormat()
+        self.ghost_behind_format.setFontUnderline(True)
+        self.ghost_behind_format.setUnderlineColor(QColor("#FF9800"))
+
+        self.chunk_length = 0
+        self.position = None  # None until something has been highlighted
+        self.ghosts = set()  # Chunk positions marked as ghost cursors
+
+    def set_text(self, chunk_text):
+        """
+        Replace the displayed chunk; the new document starts unformatted.
+
+        Args:
+            chunk_text: Plain text of the chunk to display
+        """
+        self.text_edit.setPlainText(chunk_text)
+        self.chunk_length = len(chunk_text)
+        self.position = None
+        self.ghosts = set()
+
+    def highlight(self, position):
+        """
+        Move the highlight to a position within the current chunk.
+
+        Args:
+            position: Current character position within the chunk
+        """
+        if position < 0:
+            # Typist hasn't reached this chunk yet
+            return
+        position = min(position, self.chunk_length)
+        previous = self.position
+        if position == previous:
+            return
+
+        if previous is None:
+            previous = 0
+        elif position < previous:
+            # Moving backwards (never happens while typing) - start over
+            self._format_range(0, self.chunk_length, self.normal_format)
+            previous = 0
+
+        # Everything from the old current character up to the new one is done
+        self._format_range(previous, position, self.completed_format)
+        self._format_range(position, position + 1, self.current_format)
+        self.position = position
+
+        # Ghost marks in the reformatted range were overwritten
+        for ghost in self.ghosts:
+            if previous <= ghost <= position:
+                self._mark_ghost(ghost)
+
+    def set_ghosts(self, positions):
+        """
+        Move the ghost cursors.
+
+        Args:
+            positions: Ghost positions within the chunk (others are ignored)
+        """
+        ghosts = {position for position in positions if 0 <= position < self.chunk_length}
+        for position in self.ghosts - ghosts:
+            self._format_range(position, position + 1, self._base_format(position))
+        for position in ghosts - self.ghosts:
+            self._mark_ghost(position)
+        self.ghosts = ghosts
+
+    def _base_format(self, position):
+        """Format a character has without ghost marks."""
+        if self.position is None or position > self.position:
+            return self.normal_format
+        if position == self.position:
+            return self.current_format
+        return self.completed_format
+
+    def _mark_ghost(self, position):
+        """Merge the ghost mark into a character (the typist's cursor wins)."""
+        if position == self.position:
+            return
+        ahead = self.position is None or position > self.position
+        self.cursor.setPosition(position)
+        self.cursor.setPosition(position + 1, QTextCursor.KeepAnchor)
+        self.cursor.mergeCharFormat(self.ghost_ahead_format if ahead else self.ghost_behind_format)
+
+    def _format_range(self, start, end, char_format):
+        """Apply a character format to [start, end) clipped to the chunk."""
+        end = min(end, self.chunk_length)
+        if start >= end:
+            return
+        self.cursor.setPosition(start)
+        self.cursor.setPosition(end, QTextCursor.KeepAnchor)
+        self.cursor.setCharFormat(char_format)
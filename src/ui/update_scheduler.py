@@ -0,0 +1,87 @@
+"""
+Frame-paced coalescing of UI updates.
+"""
+import time
+from PySide6.QtCore import Qt, QObject, QTimer
+from PySide6.QtGui import QGuiApplication
+from latency_trace import HANDLERS
+
+DEFAULT_REFRESH_RATE = 60.0
+
+
+class UpdateScheduler(QObject):
+    """
+    Collects UI updates and applies them at most once per display frame.
+
+    Updates are posted under a key; posting again before the next frame
+    replaces the pending arguments, so only the latest state for each key is
+    applied. Counters record how many posts were applied versus coalesced.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._pending = {}  # key -> (callback, args), in first-posted order
+        self._last_flush = 0.0
+
+        screen = QGuiApplication.primaryScreen()
+        refresh_rate = screen.refreshRate() if screen else 0
+        self.frame_interval = 1.0 / (refresh_rate or DEFAULT_REFRESH_RATE)
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setTimerType(Qt.PreciseTimer)
+        self._timer.timeout.connect(self.flush)
+
+        self.posted = 0
+        self.applied = 0
+        self.coalesced = 0
+
+        # Optional LatencyTracer timing each frame's handlers
+        self.latency_tracer = None
+
+    def post(self, key, callback, *args):
+        """
+        Queue an update for the next frame.
+
+        Args:
+            key: Identifies the update; a newer post replaces a pending one
+            callback: Function to call when the frame is applied
+            *args: Arguments for the callback
+        """
+        self.posted += 1
+        if key in self._pending:
+            self.coalesced += 1
+        self._pending[key] = (callback, args)
+
+        if not self._timer.isActive():
+            # Apply on the next event loop pass if a frame has already elapsed,
+            # otherwise wait out the remainder of the current frame
+            remaining = self.frame_interval - (time.perf_counter() - self._last_flush)
+            self._timer.start(max(0, int(remaining * 1000)))
+
+    def flush(self):
+        """Apply all pending updates now."""
+        self._timer.stop()
+        pending = self._pending
+        self._pending = {}
+        self._last_flush = time.perf_counter()
+        tracer = self.latency_tracer
+        if tracer is not None:
+            start = tracer.now()
+            tracer.frame_applied(start)
+        for callback, args in pending.values():
+            self.applied += 1
+            callback(*args)
+        if tracer is not None:
+            tracer.span(HANDLERS, start)
+
+    def cancel(self):
+        """Drop pending updates without applying them."""
+        self._timer.stop()
+        self._pending = {}
+        if self.latency_tracer is not None:
+            self.latency_tracer.discard_pending()
+
+    def has_pending(self):
+        """Return True if updates are waiting for the next frame."""
+        return bool(self._pending)
@@ -7,10 +7,9 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[
-        ('data\\levels\\*.txt', 'data\\levels'),
-        ('data\\levels\\*.py', 'data\\levels'),
-        ('data\\levels\\*.md', 'data\\levels'),
         ('data\\keyboard_layout.json', 'data'),
+        ('data\\levels.json', 'data'),
+        ('data\\levels.corpus', 'data'),
     ],
     hiddenimports=[],
     hookspath=[],